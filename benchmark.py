@@ -0,0 +1,54 @@
+# general libs
+import os
+import sys
+import argparse
+
+# own files
+from src.Data import cData
+from src.Benchmark import cBenchmark, WriteResults, ReadResults, CompareResults
+
+
+#the bundled tables are used by default
+Folder = os.path.dirname( os.path.abspath( __file__ ) )
+
+Parser = argparse.ArgumentParser( usage = "python " + sys.argv[0] + " [--sizes N ...] [--benchmarks NAME ...] [--repeats N] [--imf-solver NAME] [--sn-solver NAME] [--output FILE] [--compare FILE]" )
+Parser.add_argument( "--sizes", type = int, nargs = "+", default = [ 10, 100 ], help = "the numbers of GCs of the synthetic catalogues, larger catalogues take about a second per GC with the default solvers (default: 10 100)" )
+Parser.add_argument( "--benchmarks", nargs = "+", default = None, help = "the benchmarks to run (default: all): ProcessData IMFFromToday MfinFromMassFunct SNWalk SNExplodes Ejecta PlotBarcodes" )
+Parser.add_argument( "--repeats", type = int, default = 3, help = "the number of times every benchmark is timed, the best time is compared (default: 3)" )
+Parser.add_argument( "--seed", type = int, default = 0, help = "the seed of the synthetic catalogues (default: 0)" )
+Parser.add_argument( "--imf-solver", choices = [ "cluster", "catalogue" ], default = "cluster", help = "solve for the initial masses of one GC after the other (cluster) or of all GCs at once (catalogue) (default: cluster)" )
+Parser.add_argument( "--sn-solver", choices = [ "walk", "prefix" ], default = "walk", help = "find the last SN by walking through the stars (walk) or from the cumulative iron production (prefix) (default: walk)" )
+Parser.add_argument( "--tables", nargs = 3, default = [ Folder + "/SNe_W18.dat", Folder + "/Ejecta_W18.dat", Folder + "/RemnantData.dat" ], metavar = ( "SN_file", "Ejecta_file", "Remnant_file" ), help = "the star tables (default: the bundled tables of Sukhbold et al. (2016))" )
+Parser.add_argument( "--output", default = "benchmark.json", help = "the JSON file the results are written to (default: benchmark.json)" )
+Parser.add_argument( "--compare", default = None, help = "a result file of an earlier run, benchmarks whose best time got slower by more than the tolerance are listed and the exit code is 1" )
+Parser.add_argument( "--tolerance", type = float, default = 0.2, help = "the relative slow down accepted by --compare (default: 0.2)" )
+
+Args = Parser.parse_args()
+
+Benchmark = cBenchmark( cData( None, *Args.tables ), Args.repeats, Args.seed, Args.imf_solver, Args.sn_solver )
+
+if not Args.benchmarks is None:
+    for Name in Args.benchmarks:
+        if not Name in Benchmark.GetNames():
+            Parser.error( "unknown benchmark '" + Name + "'" )
+
+#the reference is read first, so that a missing file is noticed before the benchmarks run
+Reference = None if Args.compare is None else ReadResults( Args.compare )
+
+Results = []
+
+for NGCs in Args.sizes:
+    for Result in Benchmark.Run( [ NGCs ], Args.benchmarks ):
+        print( "{:<18} {:>7} GCs  best {:10.4f} s  median {:10.4f} s  {:10.3e} s/GC".format( Result["benchmark"], Result["gcs"], Result["best_s"], Result["median_s"], Result["best_per_gc_s"] ) )
+        Results.append( Result )
+
+WriteResults( Results, Args.output, { "sizes": Args.sizes, "repeats": Args.repeats, "seed": Args.seed, "imf_solver": Args.imf_solver, "sn_solver": Args.sn_solver, "tables": [ os.path.basename( File ) for File in Args.tables ] } )
+
+if not Reference is None:
+    Regressions = CompareResults( Reference, Results, Args.tolerance )
+    
+    for Name, NGCs, Before, After, Ratio in Regressions:
+        print( "Regression: " + Name + " with " + str( NGCs ) + " GCs took {:.4f} s instead of {:.4f} s ({:.2f}x)".format( After, Before, Ratio ) )
+    
+    if len( Regressions ) > 0:
+        sys.exit( 1 )
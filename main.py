@@ -1,5 +1,8 @@
 # general libs
 import sys
+import argparse
+import contextlib
+import importlib.util
 
 # own files
 from src.Data import cData
@@ -7,20 +10,63 @@ from src.DataProcessor import cDataProcessor
 from src.DataWriter import cDataWriter
 
 
+#read the options, the input and output files are given as positional arguments
+Parser = argparse.ArgumentParser( usage = "python " + sys.argv[0] + " [--workers N] [--barcodes FORMAT] [--no-plots] [--chunk-size N] [--format FORMAT] [--table-cache FOLDER] [--profile] <GC_property_file> <SN_file> <Ejecta_file> <Remnant_file> <output_folder>" )
+Parser.add_argument( "files", nargs = "*" )
+Parser.add_argument( "--workers", type = int, default = 1, help = "the number of processes the GCs are split across and the barcodes are drawn with (default: 1)" )
+Parser.add_argument( "--barcodes", choices = [ "png", "npz", "csv", "none" ], default = "png", help = "write the barcodes as one plot per GC (png), as intervals of all GCs in one file (npz, csv) or not at all (default: png)" )
+Parser.add_argument( "--no-plots", action = "store_true", help = "do not plot the barcodes, barcodes written into one file with --barcodes are still written" )
+Parser.add_argument( "--format", choices = [ "dat", "csv", "npz", "hdf5", "parquet" ], default = "dat", help = "the format of the GC data, an aligned text table (dat) or a file with all columns at full precision (csv, npz, hdf5, parquet) (default: dat)" )
+Parser.add_argument( "--table-cache", default = None, help = "a folder to cache the parsed input tables in, later runs with unchanged input files map the cached tables instead of parsing the files again" )
+Parser.add_argument( "--profile", action = "store_true", help = "record the time of the processing stages, of every GC and of writing the output as well as counters of the hot paths into 'Profile.json' in the output folder" )
+Parser.add_argument( "--chunk-size", type = int, default = None, help = "read, process and write the GCs in chunks of this many GCs, so that large catalogues do not need to fit into memory" )
+
+Args = Parser.parse_args()
+
+if Args.no_plots and "png" == Args.barcodes:
+    Args.barcodes = "none"
+
+if not Args.chunk_size is None and "npz" == Args.barcodes:
+    Parser.error( "the barcodes cannot be written into a npz file chunk by chunk, please use --barcodes csv" )
+
+if not Args.chunk_size is None and not Args.format in [ "dat", "csv" ]:
+    Parser.error( "the GC data can only be written chunk by chunk in the formats dat and csv" )
+
+#the optional packages of the binary formats are checked before the GCs are processed
+if "hdf5" == Args.format and importlib.util.find_spec( "h5py" ) is None:
+    Parser.error( "writing HDF5 files needs the package h5py" )
+
+if "parquet" == Args.format and importlib.util.find_spec( "pyarrow" ) is None and importlib.util.find_spec( "fastparquet" ) is None:
+    Parser.error( "writing parquet files needs the package pyarrow or fastparquet" )
+
 #check that all input files are there and read in data and create data struct
-if 4 == len( sys.argv ):
-    data = cData( sys.argv[1], sys.argv[2], sys.argv[2], sys.argv[2] )
-    DataWriter = cDataWriter( sys.argv[3] )
-elif 6 <= len( sys.argv ):
-    data = cData( sys.argv[1], sys.argv[2], sys.argv[3], sys.argv[4] )
-    DataWriter = cDataWriter( sys.argv[5] )
+if 3 == len( Args.files ):
+    data = cData( Args.files[0], Args.files[1], Args.files[1], Args.files[1], Args.chunk_size, Args.table_cache )
+    DataWriter = cDataWriter( Args.files[2] )
+elif 5 <= len( Args.files ):
+    data = cData( Args.files[0], Args.files[1], Args.files[2], Args.files[3], Args.chunk_size, Args.table_cache )
+    DataWriter = cDataWriter( Args.files[4] )
 else:
     print( "Missing parameter.\nUsage: python " + sys.argv[0] + " <GC_property_file> <SN_file> <Ejecta_file> <Remnant_file> <output_folder>\nor: python " + sys.argv[0] + " <GC_property_file> <Remnant_file> <output_folder>\nMore information in the documentation." )
     sys.exit()
 
-#process the data
-Processor = cDataProcessor()
-Processor.ProcessData( data )
+Processor = cDataProcessor( Instrument = Args.profile )
+
+#writing the output is timed as a stage of its own
+Write = ( lambda: Processor.GetInstrumentation().Time( "Write" ) ) if Args.profile else contextlib.nullcontext
+
+#process the data and write the output data, chunk by chunk if a chunk size is given
+if Args.chunk_size is None:
+    Processor.ProcessData( data, Args.workers )
+    
+    with Write():
+        DataWriter.WriteAllData( data, Args.workers, Args.barcodes, Args.format )
+else:
+    for Chunk in data.IterGCChunks():
+        Processor.ProcessData( Chunk, Args.workers )
+        
+        with Write():
+            DataWriter.WriteChunk( Chunk, Args.workers, Args.barcodes, Args.format )
 
-#write the output data
-DataWriter.WriteAllData( data )
+if Args.profile:
+    DataWriter.WriteProfile( Processor.GetInstrumentation() )
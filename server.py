@@ -0,0 +1,43 @@
+# general libs
+import sys
+import argparse
+
+# own files
+from src.Data import cData
+from src.Server import cQueryServer
+
+
+#the table sets are given as NAME=SN_file,Ejecta_file,Remnant_file or NAME=Combined_file
+Parser = argparse.ArgumentParser( usage = "python " + sys.argv[0] + " --tables NAME=<SN_file>,<Ejecta_file>,<Remnant_file> [--tables ...] [--port N | --socket PATH]" )
+Parser.add_argument( "--tables", action = "append", required = True, help = "a table set as NAME=SN_file,Ejecta_file,Remnant_file or NAME=Combined_file, can be given several times, the first set is the default" )
+Parser.add_argument( "--host", default = "127.0.0.1", help = "the address to listen on (default: 127.0.0.1)" )
+Parser.add_argument( "--port", type = int, default = 8080, help = "the TCP port to listen on (default: 8080)" )
+Parser.add_argument( "--socket", default = None, help = "the path of a Unix socket to listen on instead of the TCP port" )
+Parser.add_argument( "--table-cache", default = None, help = "a folder to cache the parsed input tables in (see main.py)" )
+Parser.add_argument( "--imf-solver", choices = [ "cluster", "catalogue" ], default = "cluster", help = "the method used to find the initial masses (default: cluster)" )
+
+Args = Parser.parse_args()
+
+#load every table set once
+TableSets = {}
+
+for TableSet in Args.tables:
+    Name, Sep, Files = TableSet.partition( "=" )
+    Files = Files.split( "," )
+    
+    if not "=" == Sep or not len( Files ) in [ 1, 3 ] or Name in TableSets:
+        Parser.error( "invalid table set '" + TableSet + "'" )
+    
+    if 1 == len( Files ):
+        Files = Files * 3
+    
+    TableSets[ Name ] = cData( None, Files[0], Files[1], Files[2], CacheFolder = Args.table_cache )
+
+Server = cQueryServer( TableSets, Args.host, Args.port, Args.socket, IMFSolver = Args.imf_solver )
+
+print( "Serving table sets " + ", ".join( TableSets ) + " on " + str( Server.GetAddress() ) )
+
+try:
+    Server.Serve()
+except KeyboardInterrupt:
+    Server.Shutdown()
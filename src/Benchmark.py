@@ -0,0 +1,303 @@
+#general libs
+import gc
+import json
+import time
+import shutil
+import platform
+import tempfile
+import numpy as np
+
+#own libs
+from src.DataProcessor import cDataProcessor
+from src.DataWriter import cDataWriter
+from src.IMFGenerator import cIMFGenerator
+
+
+#the version of the format of the result files
+_ResultVersion = 1
+
+
+def MakeCatalogue( NGCs, Seed = 0 ):
+    """creates a synthetic GC catalogue spanning the ranges of the properties of the Milky Way GCs
+    NGCs: the number of GCs
+    Seed: the seed of the random numbers, the same seed gives the same catalogue
+    returns a lib of columns with the column headers of the GC property file"""
+    
+    Random = np.random.default_rng( Seed )
+    
+    #masses, orbits and iron spreads are spread evenly in log space, the metallicities are given with the precision of the catalogues
+    Rapos = np.power( 10.0, Random.uniform( 0.15, 2.0, NGCs ) )
+    
+    return { "Name": [ "GC" + str( nGC ) for nGC in range( NGCs ) ],
+             "Mass": np.power( 10.0, Random.uniform( 4.0, 6.5, NGCs ) ),
+             "R_a": Rapos,
+             "R_p": Rapos * Random.uniform( 0.03, 0.75, NGCs ),
+             "SFE": np.full( NGCs, 0.3 ),
+             "Fe-H": np.round( Random.uniform( -2.5, -0.1, NGCs ), 2 ),
+             "FeSpread": np.power( 10.0, Random.uniform( -2.0, -0.5, NGCs ) ),
+             "Age": Random.uniform( 10.0, 13.5, NGCs ) }
+
+
+class cBenchmark():
+    """times the hot paths of the processing on synthetic catalogues
+    Every benchmark is run on catalogues of the given sizes, the processed catalogue of the benchmark 'ProcessData' is used to set up the others, so only the hot path itself is timed."""
+    
+    def __init__( self, StarData, Repeats = 3, Seed = 0, IMFSolver = "cluster", SNSolver = "walk" ):
+        """Constructor
+        StarData: a cData holding the star tables the catalogues are processed with
+        Repeats: the number of times every benchmark is timed, the best and the median time are kept
+        Seed: the seed of the synthetic catalogues (see MakeCatalogue)
+        IMFSolver: the method used to find the initial masses, see cDataProcessor
+        SNSolver: the method used to find the last SN before SF ends, see cDataProcessor"""
+        
+        if Repeats < 1:
+            raise ValueError( "cBenchmark: The number of repeats needs to be at least 1!" )
+        
+        #unknown solvers are reported by the processor before anything is run
+        cDataProcessor( SNSolver = SNSolver, IMFSolver = IMFSolver )
+        
+        self.__IMFSolver = IMFSolver
+        self.__SNSolver = SNSolver
+        self.__StarData = StarData
+        self.__Repeats = Repeats
+        self.__Seed = Seed
+        
+        #the benchmarks in the order they are run, each one returns the function to time
+        self.__Benchmarks = { "IMFFromToday": self.__SetupIMFFromToday,
+                              "MfinFromMassFunct": self.__SetupMfinFromMassFunct,
+                              "SNWalk": self.__SetupSNWalk,
+                              "SNExplodes": self.__SetupSNExplodes,
+                              "Ejecta": self.__SetupEjecta,
+                              "PlotBarcodes": self.__SetupPlotBarcodes }
+    
+    
+    def GetNames( self ):
+        """returns the names of all benchmarks"""
+        
+        return [ "ProcessData" ] + list( self.__Benchmarks )
+    
+    
+    def Run( self, Sizes, Names = None ):
+        """runs the benchmarks
+        Sizes: the numbers of GCs of the catalogues
+        Names: the names of the benchmarks to run (default: all, see GetNames)
+        returns a list with a lib of the results of every benchmark and catalogue size"""
+        
+        if Names is None:
+            Names = self.GetNames()
+        
+        for Name in Names:
+            if not Name in self.GetNames():
+                raise ValueError( "cBenchmark: Unknown benchmark '" + str( Name ) + "'!" )
+        
+        Results = []
+        
+        for NGCs in Sizes:
+            data = self.__StarData.WithGCData( MakeCatalogue( NGCs, self.__Seed ) )
+            Processor = cDataProcessor( SNSolver = self.__SNSolver, IMFSolver = self.__IMFSolver )
+            
+            #processing the catalogue is needed by all other benchmarks, so it is always done
+            Times = self.__Time( lambda: Processor.ProcessData( data ), self.__Repeats if "ProcessData" in Names else 1 )
+            
+            if "ProcessData" in Names:
+                Results.append( self.__MakeResult( "ProcessData", NGCs, Times ) )
+            
+            for Name, Setup in self.__Benchmarks.items():
+                if not Name in Names:
+                    continue
+                
+                Function, Cleanup = Setup( data, Processor )
+                
+                try:
+                    Results.append( self.__MakeResult( Name, NGCs, self.__Time( Function, self.__Repeats ) ) )
+                finally:
+                    Cleanup()
+        
+        return Results
+    
+    
+    def __Time( self, Function, Repeats ):
+        """times a function like timeit does, with the garbage collector switched off
+        Function: the function to time, called without arguments
+        Repeats: the number of times the function is called
+        returns a list of the times of all calls [s]"""
+        
+        Times = []
+        
+        Enabled = gc.isenabled()
+        gc.disable()
+        
+        try:
+            for nRepeat in range( Repeats ):
+                Start = time.perf_counter()
+                Function()
+                Times.append( time.perf_counter() - Start )
+        finally:
+            if Enabled:
+                gc.enable()
+        
+        return Times
+    
+    
+    def __MakeResult( self, Name, NGCs, Times ):
+        """returns the lib of the results of a benchmark
+        Name: the name of the benchmark
+        NGCs: the number of GCs of the catalogue
+        Times: the times of all calls [s]"""
+        
+        return { "benchmark": Name,
+                 "gcs": NGCs,
+                 "repeats": len( Times ),
+                 "best_s": min( Times ),
+                 "median_s": float( np.median( Times ) ),
+                 "best_per_gc_s": min( Times ) / NGCs if NGCs > 0 else float( "NaN" ) }
+    
+    
+    def __GetRemnantCalculators( self, data, Processor ):
+        """returns the remnant calculators of the GCs, GCs with the same metallicity share one"""
+        
+        RemCalcs = {}
+        
+        for FH in data.AccessGCData( "Fe-H" ):
+            if not FH in RemCalcs:
+                RemCalcs[ FH ] = Processor.GetRemnantCalculatorCache().GetRemnantCalculator( FH + 0.3 )
+        
+        return [ RemCalcs[ FH ] for FH in data.AccessGCData( "Fe-H" ) ]
+    
+    
+    def __GetConverged( self, data ):
+        """returns the indices of the GCs whose IMF was found, the others have no IMF to time"""
+        
+        return [ nGC for nGC, Converged in enumerate( data.AccessGCData( "IMFConverged" ) ) if Converged ]
+    
+    
+    def __GetLadders( self, data ):
+        """returns the masses of all stars that might explode for every GC with an IMF"""
+        
+        IMFs = data.AccessGCData( "IMF" )
+        
+        return [ IMFs[ nGC ].GetStarMasses( 8.0 ) for nGC in self.__GetConverged( data ) ]
+    
+    
+    def __SetupIMFFromToday( self, data, Processor ):
+        """returns the function computing the initial mass of every GC one after the other and the function cleaning up afterwards
+        data: the processed catalogue
+        Processor: the processor that processed the catalogue"""
+        
+        RemCalcs = self.__GetRemnantCalculators( data, Processor )
+        Columns = [ data.AccessGCData( Name ) for Name in [ "Mass", "Age", "R_a", "R_p", "SFE" ] ]
+        
+        def Function():
+            for nGC in range( len( RemCalcs ) ):
+                cIMFGenerator( RemCalcs[ nGC ] ).ComputeIMFFromToday( *[ Column[ nGC ] for Column in Columns ] )
+        
+        return Function, lambda: None
+    
+    
+    def __SetupMfinFromMassFunct( self, data, Processor ):
+        """returns the function computing the mass left in every GC with an IMF after 1 Gyr, as cIMFGenerator does, and the function cleaning up afterwards, see __SetupIMFFromToday"""
+        
+        RemCalcs = self.__GetRemnantCalculators( data, Processor )
+        IMFs = data.AccessGCData( "IMF" )
+        Converged = self.__GetConverged( data )
+        
+        def Function():
+            for nGC in Converged:
+                RemCalcs[ nGC ].GetMfinFromMassFunct( IMFs[ nGC ], 1.0 )
+        
+        return Function, lambda: None
+    
+    
+    def __SetupSNWalk( self, data, Processor ):
+        """returns the function searching for the last SN of every GC again and the function cleaning up afterwards, see __SetupIMFFromToday"""
+        
+        return lambda: Processor.ComputeSNe( data ), lambda: None
+    
+    
+    def __SetupSNExplodes( self, data, Processor ):
+        """returns the function looking up whether the stars of every GC explode and the function cleaning up afterwards, see __SetupIMFFromToday"""
+        
+        Ladders = self.__GetLadders( data )
+        
+        def Function():
+            for Masses in Ladders:
+                data.SNExplodes( Masses )
+        
+        return Function, lambda: None
+    
+    
+    def __SetupEjecta( self, data, Processor ):
+        """returns the function looking up the iron the stars of every GC eject and the function cleaning up afterwards, see __SetupIMFFromToday"""
+        
+        Ladders = self.__GetLadders( data )
+        
+        def Function():
+            for Masses in Ladders:
+                data.Ejecta( Masses )
+        
+        return Function, lambda: None
+    
+    
+    def __SetupPlotBarcodes( self, data, Processor ):
+        """returns the function drawing the barcodes of all GCs and the function removing them afterwards, see __SetupIMFFromToday"""
+        
+        #the barcodes are drawn into a temporary folder that is removed afterwards
+        Folder = tempfile.mkdtemp( prefix = "SFDE_benchmark_" )
+        Writer = cDataWriter( Folder + "/Output" )
+        
+        return lambda: Writer.PlotBarcodes( data ), lambda: shutil.rmtree( Folder )
+
+
+def WriteResults( Results, FileName, Settings = None ):
+    """writes the results of a benchmark run into a JSON file together with the versions of python, numpy and the platform
+    Results: the results returned by cBenchmark.Run
+    FileName: the name of the file
+    Settings: a lib of further settings of the run to store in the file"""
+    
+    Report = { "version": _ResultVersion,
+               "created": time.strftime( "%Y-%m-%dT%H:%M:%S" ),
+               "python": platform.python_version(),
+               "numpy": np.__version__,
+               "platform": platform.platform(),
+               "settings": {} if Settings is None else Settings,
+               "results": Results }
+    
+    with open( FileName, "w" ) as File:
+        json.dump( Report, File, indent = 1 )
+
+
+def ReadResults( FileName ):
+    """reads the results written by WriteResults
+    FileName: the name of the file
+    returns the list of results"""
+    
+    with open( FileName ) as File:
+        Report = json.load( File )
+    
+    if not _ResultVersion == Report.get( "version" ):
+        raise ValueError( "ReadResults: Unknown version of the result file '" + FileName + "'!" )
+    
+    return Report["results"]
+
+
+def CompareResults( Reference, Results, Tolerance = 0.2 ):
+    """finds the benchmarks that got slower than a reference run, only benchmarks with the same catalogue size in both runs are compared
+    Reference: the results of the reference run
+    Results: the results of the new run
+    Tolerance: the relative increase of the best time that is accepted
+    returns a list with the benchmark, the catalogue size, the reference time, the new time and their ratio of every regression"""
+    
+    ReferenceTimes = { ( Result["benchmark"], Result["gcs"] ): Result["best_s"] for Result in Reference }
+    
+    Regressions = []
+    
+    for Result in Results:
+        Key = ( Result["benchmark"], Result["gcs"] )
+        
+        if not Key in ReferenceTimes:
+            continue
+        
+        if Result["best_s"] > ( 1.0 + Tolerance ) * ReferenceTimes[ Key ]:
+            Regressions.append( ( Key[0], Key[1], ReferenceTimes[ Key ], Result["best_s"], Result["best_s"] / ReferenceTimes[ Key ] ) )
+    
+    return Regressions
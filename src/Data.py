@@ -1,43 +1,137 @@
 #general modules
+import io
+import copy
+import warnings
 import numpy as np
 
 #own module
 from src.common import IsNumber
 from src.DataReader import cDataReader
+from src.massfunction import cMassFunction
+from src.RemnantGrid import cRemnantGrid
+from src.SharedTables import cSharedTables
+
+
+#the columns the GC file needs to contain
+_GCColumns = ["Name", "Mass", "R_a", "R_p", "SFE", "Fe-H", "FeSpread", "Age"]
+
+#the number of lines WriteGCDataPrinteable puts together before writing them
+_PrinteableBatchSize = 4096
+
+
+def _GetColumns( Table, ExpectedColumns ):
+    """turns a table in memory into a lib of columns in the form cDataReader.GetData gives
+    Table: a pandas sheet or a lib of columns (lists, tuples or arrays)
+    ExpectedColumns: column headers that need to be in the table. If one column header is missing a NameError is raised"""
+    
+    if hasattr( Table, "columns" ):
+        Columns = { header: tuple( Table[header] ) for header in Table.columns.values.tolist() }
+    else:
+        Columns = { header: tuple( Column.tolist() ) if isinstance( Column, np.ndarray ) else tuple( Column ) for header, Column in Table.items() }
+    
+    for Name in ExpectedColumns:
+        if not Name in Columns:
+            raise NameError( "cData: Error importing data. Column '" + Name + "' missing!" )
+    
+    if len( set( len( Column ) for Column in Columns.values() ) ) > 1:
+        raise ValueError( "cData: All columns of a table need to have the same length!" )
+    
+    return Columns
 
 
 class cData:
     """A class to hold all the data used by the program"""
     
-    def __init__( self, GCFile, SNFile, EjectaFile, RemnantFile ):
+    def __init__( self, GCFile, SNFile, EjectaFile, RemnantFile, ChunkSize = None, CacheFolder = None ):
         """Constructor
-        GCFile: a file that holds general information about the GCs
+        GCFile: a file that holds general information about the GCs, None to only read the star data (the GCs can be set with WithGCData)
         SNFile: a file that holds information about which stars explode in SNe
-        EjectaFile: a file that contains the amount of iron produced by exploding stars depending on their mass"""
+        EjectaFile: a file that contains the amount of iron produced by exploding stars depending on their mass
+        ChunkSize: if given, the GC file is not read in here but chunk by chunk with this number of GCs per chunk by IterGCChunks
+        CacheFolder: if given, the parsed tables are cached in this folder (see cDataReader), the GC file is not cached if it is read chunk by chunk"""
+        
+        self.__GCFile = GCFile
+        self.__ChunkSize = ChunkSize
         
         #import the GC data
-        GCData = cDataReader( GCFile, ["Name", "Mass", "R_a", "R_p", "SFE", "Fe-H", "FeSpread", "Age"] )
-        self.__GCData = GCData.GetData()
+        if GCFile is None:
+            self.__GCData = {}
+        
+        elif ChunkSize is None:
+            GCData = cDataReader( GCFile, _GCColumns, CacheFolder )
+            self.__GCData = GCData.GetData()
+        
+        elif ChunkSize < 1:
+            raise ValueError( "cData: The chunk size needs to be at least 1!" )
+        
+        else:
+            self.__GCData = {}
         
         #if the last three files are the same I only need to read in the data once
         if SNFile == EjectaFile == RemnantFile:
-            StarData = cDataReader( SNFile, ["mass[Msun]", "SN", "Fe[Msun]"] )
-
-            self.__SNData = StarData.GetData()
-            self.__EjectaData = self.__SNData
+            SNData = cDataReader( SNFile, ["mass[Msun]", "SN", "Fe[Msun]"], CacheFolder ).GetData()
+            EjectaData = SNData
             
         else:
             #import the SN data
-            SNData = cDataReader( SNFile, ["mass[Msun]", "SN"] )
-            self.__SNData = SNData.GetData()
-        
+            SNData = cDataReader( SNFile, ["mass[Msun]", "SN"], CacheFolder ).GetData()
+            
             #import the ejecta data
-            EjectaData = cDataReader( EjectaFile, ["mass[Msun]", "Fe[Msun]"] )
-            self.__EjectaData = EjectaData.GetData()
+            EjectaData = cDataReader( EjectaFile, ["mass[Msun]", "Fe[Msun]"], CacheFolder ).GetData()
         
         #import the remnant data
-        RemnantData = cDataReader( RemnantFile, ["mass[Msun]"] )
-        self.__RemnantData = RemnantData.GetData()
+        RemnantData = cDataReader( RemnantFile, ["mass[Msun]"], CacheFolder ).GetData()
+        
+        self.__SetStarData( SNData, EjectaData, RemnantData )
+    
+    
+    @staticmethod
+    def FromTables( GCData, SNData, EjectaData = None, RemnantData = None ):
+        """creates the data from tables in memory instead of files, the tables are checked the same way as the files
+        GCData: the properties of the GCs, a pandas sheet or a lib of columns (lists, tuples or arrays)
+        SNData: the table of which stars explode in SNe, a pandas sheet or a lib of columns
+        EjectaData: the table of the iron ejecta, the SN table is used if not given (like a combined file)
+        RemnantData: the table of the life times and remnant masses, the SN table is used if not given (like a combined file)"""
+        
+        data = cData.__new__( cData )
+        
+        data.__GCFile = None
+        data.__ChunkSize = None
+        data.__GCData = _GetColumns( GCData, _GCColumns )
+        
+        SNColumns = [ "mass[Msun]", "SN", "Fe[Msun]" ] if EjectaData is None else [ "mass[Msun]", "SN" ]
+        SNData = _GetColumns( SNData, SNColumns )
+        
+        EjectaData = SNData if EjectaData is None else _GetColumns( EjectaData, [ "mass[Msun]", "Fe[Msun]" ] )
+        RemnantData = SNData if RemnantData is None else _GetColumns( RemnantData, [ "mass[Msun]" ] )
+        
+        data.__SetStarData( SNData, EjectaData, RemnantData )
+        
+        return data
+    
+    
+    def WithGCData( self, GCData ):
+        """returns a copy of the data holding other GCs, the star data is shared with this object
+        GCData: the properties of the GCs, a pandas sheet or a lib of columns (lists, tuples or arrays)"""
+        
+        Copy = copy.copy( self )
+        
+        Copy.__GCFile = None
+        Copy.__ChunkSize = None
+        Copy.__GCData = _GetColumns( GCData, _GCColumns )
+        
+        return Copy
+    
+    
+    def __SetStarData( self, SNData, EjectaData, RemnantData ):
+        """checks the star tables and prepares them for the lookups
+        SNData: a lib of the columns of the SN table
+        EjectaData: a lib of the columns of the ejecta table
+        RemnantData: a lib of the columns of the remnant table"""
+        
+        self.__SNData = SNData
+        self.__EjectaData = EjectaData
+        self.__RemnantData = RemnantData
         
         #make sure the SN data is not empty
         if 0 == len( self.__SNData["mass[Msun]"] ):
@@ -70,6 +164,25 @@ class cData:
         if 0 == len( self.__RemnantData["mass[Msun]"] ):
             raise ValueError( "cData: Empty Remnant data. Please check your Remnant file." )
         
+        #prepare the grid of remnant masses and life times
+        self.__RemnantGrid = cRemnantGrid( self.__RemnantData )
+        
+        #prepare sorted arrays of the SN and ejecta tables for fast lookups
+        SNOrder = np.argsort( np.asarray( self.__SNData["mass[Msun]"], dtype = float ), kind = "stable" )
+        self.__SNMasses = np.asarray( self.__SNData["mass[Msun]"], dtype = float )[ SNOrder ]
+        self.__SNFlags = np.asarray( self.__SNData["SN"] )[ SNOrder ].astype( bool )
+        
+        EjectaOrder = np.argsort( np.asarray( self.__EjectaData["mass[Msun]"], dtype = float ), kind = "stable" )
+        self.__EjectaMasses = np.asarray( self.__EjectaData["mass[Msun]"], dtype = float )[ EjectaOrder ]
+        self.__EjectaFe = np.asarray( self.__EjectaData["Fe[Msun]"], dtype = float )[ EjectaOrder ]
+        
+        #the star tables are only shared between processes by copies made with ShareStarTables
+        self.__SharedTables = None
+        
+        #the number of calls of SNExplodes and Ejecta (see GetLookupCalls)
+        self.__SNExplodesCalls = 0
+        self.__EjectaCalls = 0
+    
         
     def AccessGCData( self, ColumnName ):
         """return a single column from the GC data
@@ -78,40 +191,186 @@ class cData:
         return self.__GCData[ ColumnName ]
     
     
-    def AccessGCDataPrinteable( self ):
-        """returns a string of the GC data for printing"""
+    def AccessGCDataPrinteable( self, Header = True ):
+        """returns a string of the GC data for printing
+        Header: whether the string starts with a line of column names, the lines of several chunks can be appended to the first chunk with a header"""
         
-        Header = ""
-        lines = [ "" for Elem in self.__GCData["Name"] ]
+        Output = io.StringIO()
         
-        for Name in self.__GCData:
-            if not type(self.__GCData[ Name ][0]  ) in [ str, int, float, np.float64 ]:
+        self.WriteGCDataPrinteable( Output, Header )
+        
+        return Output.getvalue()
+    
+    
+    def WriteGCDataPrinteable( self, File, Header = True ):
+        """writes the GC data in printable form (see AccessGCDataPrinteable) into a file line by line
+        File: the open text file to write to
+        Header: whether to start with a line of column names
+        Every column is padded to its longest entry plus four spaces, every element is converted to a string only once.
+        The widths are found column by column first, then the lines are put together and written in batches, so that the whole table is never held as one string."""
+        
+        Names = []
+        Strings = []
+        Widths = []
+        
+        for Name, Column in self.__GCData.items():
+            if not type( Column[0] ) in [ str, int, float, bool, np.float64 ]:
                 continue
             
-            #find maximum length
-            length = len( str( Name ) )
-            for Elem in self.__GCData[ Name ]:
-                newlen = len( str( Elem ) )
+            #str per element rather than numpy's astype( str ), which is slower and prints columns mixing ints and NaN as floats
+            Names.append( Name )
+            Strings.append( [ str( Elem ) for Elem in Column ] )
+            Widths.append( max( len( str( Name ) ), max( map( len, Strings[-1] ) ) ) + 4 )
+        
+        if Header:
+            File.write( "".join( Name.ljust( Width ) for Name, Width in zip( Names, Widths ) ) + "\n" )
+        
+        NumGCs = len( self.__GCData["Name"] )
+        
+        for Start in range( 0, NumGCs, _PrinteableBatchSize ):
+            Stop = min( Start + _PrinteableBatchSize, NumGCs )
+            
+            if 0 == len( Strings ):
+                File.write( "\n" * ( Stop - Start ) )
+                continue
+            
+            File.writelines( "".join( String.ljust( Width ) for String, Width in zip( Row, Widths ) ) + "\n" for Row in zip( *[ Column[ Start:Stop ] for Column in Strings ] ) )
+    
+    
+    def GetGCArrays( self, MFBounds = None ):
+        """returns the columns of the GC data as arrays with one row per GC
+        MFBounds: a lib with the number of boundaries for the columns of mass functions, so that every chunk of GCs gives the same arrays also if it has no mass function (default: the most boundaries of the mass functions of every column holding one)
+        A column of mass functions is split into the columns 'Name_Mtot', 'Name_bounds' and 'Name_alphas', the latter two with one column per boundary or slope (padded with NaN).
+        Missing mass functions (None) give rows of NaN. Columns that cannot be converted are skipped with a warning."""
+        
+        MFBounds = {} if MFBounds is None else MFBounds
+        
+        Arrays = {}
+        
+        for Name, Column in self.__GCData.items():
+            if Name in MFBounds or any( isinstance( Elem, cMassFunction ) for Elem in Column ):
+                MFs = [ Elem if isinstance( Elem, cMassFunction ) else None for Elem in Column ]
+                nBounds = MFBounds[ Name ] if Name in MFBounds else max( len( MF.Getbounds() ) for MF in MFs if not MF is None )
                 
-                if newlen > length:
-                    length = newlen
+                if any( len( MF.Getbounds() ) > nBounds for MF in MFs if not MF is None ):
+                    raise ValueError( "cData: A mass function of column '" + Name + "' has more than " + str( nBounds ) + " boundaries!" )
+                
+                Arrays[ Name + "_Mtot" ] = np.array( [ np.nan if MF is None else MF.GetMtot() for MF in MFs ], dtype = float )
+                Arrays[ Name + "_bounds" ] = np.array( [ np.full( nBounds, np.nan ) if MF is None else np.pad( np.asarray( MF.Getbounds(), dtype = float ), ( 0, nBounds - len( MF.Getbounds() ) ), constant_values = np.nan ) for MF in MFs ] )
+                Arrays[ Name + "_alphas" ] = np.array( [ np.full( nBounds - 1, np.nan ) if MF is None else np.pad( np.asarray( MF.Getalphas(), dtype = float ), ( 0, nBounds - 1 - len( MF.Getalphas() ) ), constant_values = np.nan ) for MF in MFs ] )
+                continue
             
-            length += 4
+            try:
+                Array = np.asarray( Column )
+            except ValueError:
+                Array = np.asarray( Column, dtype = object )
             
-            Header += Name.ljust(length)
+            if not Array.dtype.kind in "biufU" or Array.ndim > 2:
+                warnings.warn( "cData: Column '" + Name + "' cannot be converted into an array and is skipped!" )
+                continue
             
-            for nElem in range( len( self.__GCData[ Name ] ) ):
-                lines[nElem] += str( self.__GCData[ Name ][nElem] ).ljust( length )
-                
-        ReturnString = Header
+            Arrays[ Name ] = Array
         
-        for line in lines:
-            ReturnString += "\n"
-            ReturnString += line
-            
-        ReturnString += "\n"
+        return Arrays
+    
+    
+    def IterGCChunks( self ):
+        """yields the GCs chunk by chunk as copies of the data holding only the GCs of the chunk, the star data is shared with this object
+        Without a chunk size (see the constructor) the data itself is the only chunk."""
+        
+        if self.__ChunkSize is None:
+            yield self
+            return
+        
+        for GCData in cDataReader.ReadChunks( self.__GCFile, _GCColumns, self.__ChunkSize ):
+            Chunk = copy.copy( self )
+            Chunk.__GCData = GCData
             
-        return ReturnString
+            yield Chunk
+    
+    
+    def GetGCColumnNames( self ):
+        """returns the names of all columns of the GC data"""
+        
+        return list( self.__GCData )
+    
+    
+    def ShareStarTables( self, Folder = None ):
+        """returns a copy of the data whose star tables (SN, ejecta and remnant data) are frozen into one cSharedTables
+        Folder: the folder for the file of the tables (see cSharedTables)
+        Pickling the copy (or a subset of its GCs) only passes the GC data and the name of the file, other processes map the tables from this file instead of holding their own copies.
+        The file is removed by ReleaseStarTables, which needs to be called once all processes are done."""
+        
+        Tables = { "SNMasses": self.__SNMasses, "SNFlags": self.__SNFlags, "EjectaMasses": self.__EjectaMasses, "EjectaFe": self.__EjectaFe }
+        
+        for Name, Table in self.__RemnantGrid.GetTables().items():
+            Tables[ "Grid:" + Name ] = Table
+        
+        for Heading, Column in self.__RemnantData.items():
+            Tables[ "Remnant:" + Heading ] = np.asarray( Column, dtype = float )
+        
+        Shared = copy.copy( self )
+        Shared.__SharedTables = cSharedTables( Tables, Folder )
+        Shared.__AttachStarTables()
+        
+        return Shared
+    
+    
+    def __AttachStarTables( self ):
+        """replaces the star tables by the read-only views of the shared tables, the raw SN and ejecta data are not kept"""
+        
+        Shared = self.__SharedTables
+        
+        self.__SNData = None
+        self.__EjectaData = None
+        
+        self.__SNMasses = Shared.GetTable( "SNMasses" )
+        self.__SNFlags = Shared.GetTable( "SNFlags" )
+        self.__EjectaMasses = Shared.GetTable( "EjectaMasses" )
+        self.__EjectaFe = Shared.GetTable( "EjectaFe" )
+        
+        self.__RemnantGrid = cRemnantGrid.FromTables( { Name[5:]: Shared.GetTable( Name ) for Name in Shared.GetNames() if "Grid:" == Name[:5] } )
+        self.__RemnantData = { Name[8:]: Shared.GetTable( Name ) for Name in Shared.GetNames() if "Remnant:" == Name[:8] }
+    
+    
+    def ReleaseStarTables( self ):
+        """removes the file of the shared star tables (if this data was made by ShareStarTables)"""
+        
+        if not self.__SharedTables is None:
+            self.__SharedTables.Close()
+    
+    
+    def __getstate__( self ):
+        if self.__SharedTables is None:
+            return self.__dict__
+        
+        #the star tables are mapped from the shared file again when unpickled
+        return { "GCData": self.__GCData, "SharedTables": self.__SharedTables }
+    
+    
+    def __setstate__( self, State ):
+        if not "SharedTables" in State:
+            self.__dict__.update( State )
+            return
+        
+        self.__GCData = State["GCData"]
+        self.__SharedTables = State["SharedTables"]
+        
+        #the lookups of the copy in another process are counted from zero
+        self.__SNExplodesCalls = 0
+        self.__EjectaCalls = 0
+        
+        self.__AttachStarTables()
+    
+    
+    def GetGCSubset( self, Indices ):
+        """returns a copy of the data holding only some of the GCs, the star data is shared with this object
+        Indices: the indices of the GCs to keep (in the order they are given)"""
+        
+        Subset = copy.copy( self )
+        Subset.__GCData = { Name: type( Column )( Column[ nGC ] for nGC in Indices ) for Name, Column in self.__GCData.items() }
+        
+        return Subset
     
     
     def AddGCData( self, ColumnName, data ):
@@ -127,63 +386,99 @@ class cData:
     
     def SNExplodes( self, mass ):
         """returns whether or not a star of a certain mass is going to explode in a SNe
-        mass: the mass of the star
-        returns True if the star explodes and False if it doesn't"""
+        mass: the mass of the star, a single value or an array of masses
+        returns True if the star explodes and False if it doesn't (an array of booleans if an array of masses was given)
+        The value of the closest mass in the SN table is used. If the mass is exactly in the middle between two masses, the lower one is used."""
         
-        #find the SN value corresponding to the given mass in the table
-        if mass <= self.__SNData["mass[Msun]"][0]:
-            return bool( self.__SNData["SN"][0] )
+        self.__SNExplodesCalls += 1
         
-        if mass > self.__SNData["mass[Msun]"][-1]:
-            return bool( self.__SNData["SN"][-1] )
-
-        for nIndex in range( len( self.__SNData["mass[Msun]"] ) - 1 ):
-            if mass <= self.__SNData["mass[Msun]"][nIndex + 1]:
-                if self.__SNData["mass[Msun]"][nIndex + 1] - mass < mass - self.__SNData["mass[Msun]"][nIndex]:
-                    return bool( self.__SNData["SN"][nIndex + 1] )
-                else:
-                    return bool( self.__SNData["SN"][nIndex] )
+        masses = np.asarray( mass, dtype = float )
+        
+        #index of the first table entry with a mass >= the given mass
+        Upper = np.clip( np.searchsorted( self.__SNMasses, masses, side = "left" ), 1, len( self.__SNMasses ) - 1 ) if len( self.__SNMasses ) > 1 else np.zeros( masses.shape, dtype = int )
+        Lower = np.maximum( Upper - 1, 0 )
+        
+        Index = np.where( self.__SNMasses[ Upper ] - masses < masses - self.__SNMasses[ Lower ], Upper, Lower )
+        
+        #the ends of the table
+        Index = np.where( masses <= self.__SNMasses[0], 0, Index )
+        Index = np.where( masses > self.__SNMasses[-1], len( self.__SNMasses ) - 1, Index )
+        
+        Explodes = self.__SNFlags[ Index ]
+        
+        if 0 == Explodes.ndim:
+            return bool( Explodes )
+        
+        return Explodes
                     
     
+    def GetLookupCalls( self ):
+        """returns the number of calls of SNExplodes and Ejecta so far as a lib with the keys 'SNExplodes' and 'Ejecta', a call with an array of masses counts once"""
+        
+        return { "SNExplodes": self.__SNExplodesCalls, "Ejecta": self.__EjectaCalls }
+    
+    
+    def GetSNIntervals( self, mmin, mmax ):
+        """returns the mass intervals between two masses in which either all or no stars explode in SNe
+        mmin: the low-mass end of the mass range
+        mmax: the high-mass end of the mass range
+        returns the boundaries of the intervals (starting at mmin and ending at mmax) and for every interval whether its stars explode (see SNExplodes)
+        With the closest mass of the SN table being used, the stars can only change from exploding to not exploding halfway between two masses of the table."""
+        
+        #the masses halfway between two table entries with different flags
+        Changes = np.flatnonzero( self.__SNFlags[1:] != self.__SNFlags[:-1] )
+        Transitions = 0.5 * ( self.__SNMasses[ Changes ] + self.__SNMasses[ Changes + 1 ] )
+        
+        Bounds = np.concatenate( ( [ mmin ], Transitions[ ( Transitions > mmin ) & ( Transitions < mmax ) ], [ mmax ] ) )
+        
+        return Bounds, np.array( self.SNExplodes( 0.5 * ( Bounds[1:] + Bounds[:-1] ) ), dtype = bool, ndmin = 1 )
+    
+    
     def Ejecta( self, mass ):
         """returns the amount of iron produced by a star of the given mass. This function assumes all stars explode.
-        mass: the mass of the star
-        returns the amount of iron produced [Msun]"""
-        
-        #if only one value is known return this one value
-        if 1 == len( self.__EjectaData["mass[Msun]"] ):
-            Ejecta = self.__EjectaData["Fe[Msun]"][0]
+        mass: the mass of the star, a single value or an array of masses
+        returns the amount of iron produced [Msun] (an array if an array of masses was given)
+        The ejecta are linearly interpolated between the masses in the table and linearly extrapolated beyond its ends, negative values are set to 0."""
         
-        #check the ends of the ejecta table and extrapolate if neccesary
-        elif mass == self.__EjectaData["mass[Msun]"][0]:
-            Ejecta = self.__EjectaData["Fe[Msun]"][0]
+        self.__EjectaCalls += 1
         
-        elif mass < self.__EjectaData["mass[Msun]"][0]:
-            Ejecta = ( self.__EjectaData["Fe[Msun]"][0] - self.__EjectaData["Fe[Msun]"][1] ) / ( self.__EjectaData["mass[Msun]"][0] - self.__EjectaData["mass[Msun]"][1] ) * ( mass - self.__EjectaData["mass[Msun]"][0] ) + self.__EjectaData["Fe[Msun]"][0]
+        masses = np.asarray( mass, dtype = float )
         
-        elif mass > self.__EjectaData["mass[Msun]"][-1]:
-            Ejecta = ( self.__EjectaData["Fe[Msun]"][-1] - self.__EjectaData["Fe[Msun]"][-2] ) / ( self.__EjectaData["mass[Msun]"][-1] - self.__EjectaData["mass[Msun]"][-2] ) * ( mass - self.__EjectaData["mass[Msun]"][-1] ) + self.__EjectaData["Fe[Msun]"][-1]
+        #if only one value is known return this one value
+        if 1 == len( self.__EjectaMasses ):
+            Ejecta = np.full( masses.shape, self.__EjectaFe[0] )
         
         else:
-            for nIndex in range( len( self.__EjectaData["mass[Msun]"] ) - 1 ):
-                if mass == self.__EjectaData["mass[Msun]"][nIndex + 1]:
-                    Ejecta = self.__EjectaData["Fe[Msun]"][nIndex + 1]
-                    
-                    break
-                
-                if mass < self.__EjectaData["mass[Msun]"][nIndex + 1]:
-                    Ejecta = ( self.__EjectaData["Fe[Msun]"][nIndex] - self.__EjectaData["Fe[Msun]"][nIndex + 1] ) / ( self.__EjectaData["mass[Msun]"][nIndex] - self.__EjectaData["mass[Msun]"][nIndex + 1] ) * ( mass - self.__EjectaData["mass[Msun]"][nIndex] ) + self.__EjectaData["Fe[Msun]"][nIndex]
-                    
-                    break
+            #the two table entries used for inter- or extrapolation (the first and last pair outside of the table)
+            Upper = np.clip( np.searchsorted( self.__EjectaMasses, masses, side = "left" ), 1, len( self.__EjectaMasses ) - 1 )
+            Lower = Upper - 1
+            
+            #extrapolation beyond the high-mass end uses the last entry as anchor
+            Anchor = np.where( masses > self.__EjectaMasses[-1], Upper, Lower )
+            
+            with np.errstate( divide = "ignore", invalid = "ignore" ):
+                Ejecta = ( self.__EjectaFe[ Lower ] - self.__EjectaFe[ Upper ] ) / ( self.__EjectaMasses[ Lower ] - self.__EjectaMasses[ Upper ] ) * ( masses - self.__EjectaMasses[ Anchor ] ) + self.__EjectaFe[ Anchor ]
+            
+            #masses found in the table are not interpolated
+            Ejecta = np.where( masses == self.__EjectaMasses[ Upper ], self.__EjectaFe[ Upper ], Ejecta )
+            Ejecta = np.where( masses == self.__EjectaMasses[ Lower ], self.__EjectaFe[ Lower ], Ejecta )
                 
         #the amount of iron ejected cannot be negative
-        if Ejecta < 0.0:
-            Ejecta = 0.0
+        Ejecta = np.maximum( Ejecta, 0.0 )
+        
+        if 0 == Ejecta.ndim:
+            return float( Ejecta )
             
         return Ejecta
     
     
     def GetRemnantData( self ):
-        """returns a copy of the complete remnant data"""
+        """returns a copy of the complete remnant data (the columns are shared read-only arrays for data made by ShareStarTables)"""
         
         return self.__RemnantData.copy()
+    
+    
+    def GetRemnantGrid( self ):
+        """returns the grid of remnant masses and life times (cRemnantGrid) prepared from the remnant data"""
+        
+        return self.__RemnantGrid
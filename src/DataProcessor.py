@@ -1,33 +1,191 @@
 # general libs
+import warnings
+import contextlib
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 
 # own libs
 from src.common import *
 from src.IMFGenerator import cIMFGenerator
-from src.RemnantCalculator import cRemnantCalculator
-from src.StarExtractor import cStarExtractor
+from src.IMFGeneratorBatch import cIMFGeneratorBatch
+from src.Instrumentation import cInstrumentation
+from src.RemnantCalculatorBatch import cRemnantCalculatorBatch
+from src.RemnantCalculatorCache import cRemnantCalculatorCache
+
+
+#the diagnostics of the solvers for the IMF added as columns for every GC
+_DiagnosticsColumns = [ "MiniIterations", "MFIterations", "MiniResidual", "MFResidual", "IMFConverged" ]
+
+#the columns added by the processing in the order they are added
+_ResultColumns = [ "IMF", "Mini" ] + _DiagnosticsColumns + [ "ProducedIron", "NSN", "NSNPos", "mlast", "SFD" ]
 
 
 class cDataProcessor():
     """class responsible for the main data processing"""
     
-    def __init__( self ):
-        pass
+    def __init__( self, SNSolver = "walk", CacheSize = 32, IMFSolver = "cluster", Instrument = False ):
+        """Constructor
+        SNSolver: the method used to find the last SN before SF ends
+            "walk": walks through the stars from the most to the least massive one
+            "prefix": uses the cumulative iron production of all stars to find the last SN without a loop over the stars
+        CacheSize: the maximum number of remnant calculators (one per metallicity) kept while processing the data
+        IMFSolver: the method used to find the initial masses
+            "cluster": solves for the initial mass of one GC after the other
+            "catalogue": solves for the initial masses of all GCs at once (much faster for large catalogues)
+        Instrument: record the time of the processing stages and of every GC as well as counters of the hot paths (see GetInstrumentation)"""
+        
+        if not SNSolver in [ "walk", "prefix" ]:
+            raise ValueError( "cDataProcessor: Unknown SN solver '" + str( SNSolver ) + "'!" )
+        
+        if not IMFSolver in [ "cluster", "catalogue" ]:
+            raise ValueError( "cDataProcessor: Unknown IMF solver '" + str( IMFSolver ) + "'!" )
+        
+        self.__SNSolver = SNSolver
+        self.__IMFSolver = IMFSolver
+        self.__CacheSize = CacheSize
+        self.__RemCalcCache = None
+        
+        self.__Instrumentation = cInstrumentation() if Instrument else None
     
     
-    def ProcessData( self, data ):
+    def ProcessData( self, data, Workers = 1 ):
         """performs the data processing on the data
-        data: the data to work on"""
+        data: the data to work on
+        Workers: the number of processes the GCs are split across (1 processes all GCs in this process)
+        In parallel mode every process works on parts of the catalogue with the same routines and the results are written back in the order of the GCs, so that they are identical to the serial ones.
+        If processing a GC fails in parallel mode, its results are set to NaN (None for the IMF, False for IMFConverged) and a warning is issued, the other GCs are not affected."""
+        
+        if Workers < 1:
+            raise ValueError( "cDataProcessor: The number of workers needs to be at least 1!" )
+        
+        with self.__Time( "ProcessData" ):
+            if Workers > 1:
+                self.__RemCalcCache = None
+                self.__ProcessDataParallel( data, Workers )
+                return
+            
+            #the remnant calculators are shared by all processing steps
+            self.__RemCalcCache = cRemnantCalculatorCache( data, self.__CacheSize )
+            
+            try:
+                with self.__Time( "IMF" ):
+                    self.__ComputeIMF( data )
+                
+                with self.__Time( "Iron" ):
+                    self.__ComputeIron( data )
+                
+                with self.__Time( "SNe" ):
+                    self.__ComputeSNe( data )
+            
+            finally:
+                #the GCs are also recorded if processing them failed, so that the times stay in the order of the GCs
+                if not self.__Instrumentation is None:
+                    self.__Instrumentation.AddClusters( data.AccessGCData( "Name" ) )
+    
+    
+    def ComputeSNe( self, data ):
+        """computes the SN columns again for data processed before by ProcessData, so that this step can be timed on its own
+        data: the data to work on, holding the columns 'IMF' and 'ProducedIron'"""
+        
+        if self.__RemCalcCache is None:
+            self.__RemCalcCache = cRemnantCalculatorCache( data, self.__CacheSize )
+        
+        try:
+            with self.__Time( "SNe" ):
+                self.__ComputeSNe( data )
+        
+        finally:
+            if not self.__Instrumentation is None:
+                self.__Instrumentation.AddClusters( data.AccessGCData( "Name" ) )
+    
+    
+    def GetInstrumentation( self ):
+        """returns the recordings of all calls of ProcessData (cInstrumentation), None if the processor was created without Instrument
+        The stages are 'ProcessData' (the whole call), 'IMF', 'Iron' and 'SNe', the latter are summed over all processes in parallel mode.
+        The counters are 'ComputeMF' (the mass functions requested from the IMF generators), 'MassFunctions' (the cMassFunctions created), 'SNExplodes' and 'Ejecta' (the calls of these functions of the data) and 'StarsWalked' (the stars the search for the last SN went through).
+        The GCs are timed in the stages 'IMF' (only with the IMF solver 'cluster') and 'SNe'."""
+        
+        return self.__Instrumentation
+    
+    
+    def __Time( self, Stage ):
+        """returns a context timing a stage if the processor is instrumented, else a context doing nothing
+        Stage: the name of the stage"""
+        
+        if self.__Instrumentation is None:
+            return contextlib.nullcontext()
         
-        self.__ComputeIMF( data )
-        self.__ComputeIron( data )
-        self.__ComputeSNe( data )
+        return self.__Instrumentation.Time( Stage )
+    
+    
+    def __MapClusters( self, Stage, Function, NClusters ):
+        """calls a function for every GC, the calls are timed if the processor is instrumented (see cInstrumentation.MapClusters)
+        Stage: the name of the stage
+        Function: the function computing a GC, called with the index of the GC
+        NClusters: the number of GCs
+        returns the list of the results of the function"""
+        
+        if self.__Instrumentation is None:
+            return [ Function( nCluster ) for nCluster in range( NClusters ) ]
+        
+        return self.__Instrumentation.MapClusters( Stage, Function, NClusters )
+    
+    
+    def GetRemnantCalculatorCache( self ):
+        """returns the cache of remnant calculators used during the last call of ProcessData (None before the first call and after processing in parallel)"""
+        
+        return self.__RemCalcCache
+    
+    
+    def GetSettings( self ):
+        """returns the arguments of the constructor as a lib"""
+        
+        return { "SNSolver": self.__SNSolver, "CacheSize": self.__CacheSize, "IMFSolver": self.__IMFSolver, "Instrument": not self.__Instrumentation is None }
+    
+    
+    def __ProcessDataParallel( self, data, Workers ):
+        """processes the data with a pool of processes, see ProcessData
+        data: the data to work on (needs to provide ShareStarTables, GetGCSubset and GetGCColumnNames)
+        Workers: the number of processes
+        The star tables are shared with the processes through a memory-mapped file, only the GCs of each chunk are sent to the processes."""
+        
+        Names = data.AccessGCData( "Name" )
+        
+        #several chunks per process balance the load
+        Chunks = [ Chunk.tolist() for Chunk in np.array_split( np.arange( len( Names ) ), min( len( Names ), 4 * Workers ) ) ] if len( Names ) > 0 else []
+        
+        Shared = data.ShareStarTables()
+        
+        try:
+            with ProcessPoolExecutor( max_workers = Workers, initializer = _InitWorker, initargs = ( self.GetSettings(), ) ) as Pool:
+                Results = list( Pool.map( _ProcessGCs, [ Shared.GetGCSubset( Chunk ) for Chunk in Chunks ] ) )
+        finally:
+            Shared.ReleaseStarTables()
+        
+        #the columns are added in the order of the serial processing, also if all GCs failed
+        for ColumnName in _ResultColumns:
+            Column = []
+            
+            for Chunk, ( Columns, Errors, Report ) in zip( Chunks, Results ):
+                Column += Columns.get( ColumnName, [ None ] * len( Chunk ) )
+            
+            data.AddGCData( ColumnName, [ _GetFailedResult( ColumnName ) if Elem is None else Elem for Elem in Column ] )
+        
+        for Chunk, ( Columns, Errors, Report ) in zip( Chunks, Results ):
+            for Position, Message in Errors.items():
+                warnings.warn( "cDataProcessor: Processing GC '" + str( Names[ Chunk[ Position ] ] ) + "' failed: " + Message )
+            
+            #the stages are summed over the processes, the whole processing is timed here
+            if not Report is None:
+                Report["stages"].pop( "ProcessData", None )
+                self.__Instrumentation.Merge( Report )
     
     
     def __ComputeIMF( self, data ):
         """computes all the IMF's and initial masses
         data: the data to work on
-        This function adds the columns 'IMF' and 'Mini' to the data"""
+        This function adds the columns 'IMF' and 'Mini' to the data and the diagnostics of the solvers (see cIMFGenerator.GetSolverDiagnostics)
+        GCs for which the solvers did not converge get None as IMF and NaN as Mini, so that all their results are NaN"""
         
         #extract the required columns
         FHs = data.AccessGCData( "Fe-H" )
@@ -40,13 +198,36 @@ class cDataProcessor():
         SFEs = data.AccessGCData( "SFE" )
         
         #do the computation
-        RemCalcs = [ cRemnantCalculator( data.GetRemnantData(), ZH ) for ZH in ZHs ]
-        IMFGenerators = [ cIMFGenerator( RemCalc ) for RemCalc in RemCalcs ]
-        IMFs = [ IMFGenerators[ nElem ].ComputeIMFFromToday( Ms[ nElem ], Ages[ nElem ], Rapos[ nElem ], Rperis[ nElem ], SFEs[ nElem ] ) for nElem in range( len( Ms ) ) ]
+        if "catalogue" == self.__IMFSolver:
+            IMFGenerator = cIMFGeneratorBatch( cRemnantCalculatorBatch( data.GetRemnantGrid(), ZHs ) )
+            MFs, Converged = IMFGenerator.ComputeIMFsFromToday( Ms, Ages, Rapos, Rperis, SFEs )
+            
+            IMFs = [ MFs.GetMassFunction( nElem ) if Converged[ nElem ] else None for nElem in range( MFs.GetSize() ) ]
+            
+            Diagnostics = { Name: IMFGenerator.GetSolverDiagnostics()[ Name ].tolist() for Name in _DiagnosticsColumns }
+            
+            IMFGenerators = [ IMFGenerator ]
+            NewMFs = int( np.sum( Converged ) )
+        else:
+            RemCalcs = [ self.__RemCalcCache.GetRemnantCalculator( ZH ) for ZH in ZHs ]
+            IMFGenerators = [ cIMFGenerator( RemCalc ) for RemCalc in RemCalcs ]
+            IMFs = self.__MapClusters( "IMF", lambda nElem: IMFGenerators[ nElem ].ComputeIMFFromToday( Ms[ nElem ], Ages[ nElem ], Rapos[ nElem ], Rperis[ nElem ], SFEs[ nElem ] ), len( Ms ) )
+            
+            Diagnostics = { Name: [ Generator.GetSolverDiagnostics()[ Name ] for Generator in IMFGenerators ] for Name in _DiagnosticsColumns }
+            
+            #every mass function solved for is a new cMassFunction
+            NewMFs = sum( Generator.GetMFSolves() for Generator in IMFGenerators )
         
-        #write the results into the data
+        if not self.__Instrumentation is None:
+            self.__Instrumentation.Count( "ComputeMF", sum( Generator.GetMFCalls() for Generator in IMFGenerators ) )
+            self.__Instrumentation.Count( "MassFunctions", NewMFs )
+        
+        #write the results into the data, GCs that did not converge have no IMF
         data.AddGCData( "IMF", IMFs )
-        data.AddGCData( "Mini", [ IMF.GetMtot() for IMF in IMFs ] )
+        data.AddGCData( "Mini", [ float( "NaN" ) if IMF is None else IMF.GetMtot() for IMF in IMFs ] )
+        
+        for Name in _DiagnosticsColumns:
+            data.AddGCData( Name, Diagnostics[ Name ] )
     
     
     def __ComputeIron( self, data ):
@@ -84,39 +265,174 @@ class cDataProcessor():
         SFDs = []       #the star formation duration
         NSNePos = []    #the number of SNe the cluster can produce
         
-        for nIMF in range( len( IMFs )):
-            StarExtractor = cStarExtractor( IMFs[nIMF] )
-            ProducedIron = ProducedIrons[nIMF]
-            RemCalc = cRemnantCalculator( data.GetRemnantData(), ZHs[nIMF] )
+        #the lookups are counted by the data
+        if not self.__Instrumentation is None:
+            LookupCalls = data.GetLookupCalls()
+        
+        StarsWalked = 0 #the stars of all ladders
+        
+        def ComputeSN( nIMF ):
+            """finds the last SN of a GC"""
             
-            NSN = 0
+            if IMFs[nIMF] is None:
+                return float( "NaN" ), float( "NaN" ), float( "NaN" ), float( "NaN" ), 0
             
-            NSNe.append( float( "NaN" ) )
-            mlasts.append( float( "NaN" ) )
-            SFDs.append( float( "NaN" ) )
+            #all stars that might explode from the most to the least massive one, one cluster at a time to keep the memory bounded
+            Masses = IMFs[nIMF].GetStarMasses( 8.0 )
             
-            nextMass = StarExtractor.GetNextMostMassiveStar()
+            RemCalc = self.__RemCalcCache.GetRemnantCalculator( ZHs[nIMF] )
             
-            lastSNfound = False
+            Explodes = data.SNExplodes( Masses )
+            Ejecta = data.Ejecta( Masses )
             
-            while nextMass > 8.0:
-                
-                if data.SNExplodes( nextMass ):
-                    ProducedIron -= data.Ejecta( nextMass )
-                    NSN += 1
-                    
-                if ProducedIron <= 0 and not lastSNfound:
-                    NSNe[-1] = NSN
-                    mlasts[-1] = nextMass
-                    SFDs[-1] = RemCalc.GetTimeFromMass( nextMass )
-                    lastSNfound = True
-                    
-                nextMass = StarExtractor.GetNextMostMassiveStar()
-            
-            NSNePos.append( NSN )
+            if "prefix" == self.__SNSolver:
+                NSN, NSNPos, mlast = self.__FindLastSNPrefix( Masses, Explodes, Ejecta, ProducedIrons[nIMF] )
+            else:
+                NSN, NSNPos, mlast = self.__FindLastSNWalk( Masses, Explodes, Ejecta, ProducedIrons[nIMF] )
+            
+            return NSN, NSNPos, mlast, float( "NaN" ) if np.isnan( mlast ) else RemCalc.GetTimeFromMass( mlast ), len( Masses )
+        
+        for NSN, NSNPos, mlast, SFD, NStars in self.__MapClusters( "SNe", ComputeSN, len( IMFs ) ):
+            NSNe.append( NSN )
+            NSNePos.append( NSNPos )
+            mlasts.append( mlast )
+            SFDs.append( SFD )
+            StarsWalked += NStars
+        
+        if not self.__Instrumentation is None:
+            for Lookup, Calls in data.GetLookupCalls().items():
+                self.__Instrumentation.Count( Lookup, Calls - LookupCalls[ Lookup ] )
+            
+            self.__Instrumentation.Count( "StarsWalked", StarsWalked )
             
         # add columns to data
         data.AddGCData( "NSN", NSNe )
         data.AddGCData( "NSNPos", NSNePos )
         data.AddGCData( "mlast", mlasts )
         data.AddGCData( "SFD", SFDs )
+    
+    
+    def __FindLastSNWalk( self, Masses, Explodes, Ejecta, ProducedIron ):
+        """finds the last SN to explode before SF ends by walking through the stars one by one
+        Masses: the masses of the stars sorted from the most to the least massive one
+        Explodes: for each star whether or not it explodes
+        Ejecta: for each star the amount of iron it produces if it explodes
+        ProducedIron: the amount of iron that needs to be produced
+        returns the number of SNe before SF ends, the total number of SNe and the mass of the last star before SF ends (NaN if the iron cannot be produced)"""
+        
+        NSN = 0
+        NSNLast = float( "NaN" )
+        mlast = float( "NaN" )
+        
+        lastSNfound = False
+        
+        for nStar in range( len( Masses ) ):
+            if Explodes[nStar]:
+                ProducedIron -= Ejecta[nStar]
+                NSN += 1
+                
+            if ProducedIron <= 0 and not lastSNfound:
+                NSNLast = NSN
+                mlast = Masses[nStar]
+                lastSNfound = True
+        
+        return NSNLast, NSN, mlast
+    
+    
+    def __FindLastSNPrefix( self, Masses, Explodes, Ejecta, ProducedIron ):
+        """finds the last SN to explode before SF ends from the cumulative iron production of all stars
+        Masses: the masses of the stars sorted from the most to the least massive one
+        Explodes: for each star whether or not it explodes
+        Ejecta: for each star the amount of iron it produces if it explodes
+        ProducedIron: the amount of iron that needs to be produced
+        returns the number of SNe before SF ends, the total number of SNe and the mass of the last star before SF ends (NaN if the iron cannot be produced)"""
+        
+        if 0 == len( Masses ):
+            return float( "NaN" ), 0, float( "NaN" )
+        
+        NumSNe = np.cumsum( Explodes )
+        
+        #the iron still missing after each star, subtracted in the same order as in the walk
+        MissingIron = np.cumsum( np.concatenate( ( [ ProducedIron ], -np.where( Explodes, Ejecta, 0.0 ) ) ) )[1:]
+        
+        #the missing iron never increases, so the first star to end SF can be found by bisection
+        nLast = np.searchsorted( -MissingIron, 0.0, side = "left" )
+        
+        if nLast == len( Masses ):
+            return float( "NaN" ), int( NumSNe[-1] ), float( "NaN" )
+        
+        return int( NumSNe[ nLast ] ), int( NumSNe[-1] ), Masses[ nLast ]
+
+
+def _GetFailedResult( ColumnName ):
+    """returns the result of a GC that failed in parallel mode
+    ColumnName: the name of the result column (see _ResultColumns)
+    GCs that failed have no IMF, did not converge and have NaN for all other results"""
+    
+    if "IMF" == ColumnName:
+        return None
+    
+    if "IMFConverged" == ColumnName:
+        return False
+    
+    return float( "NaN" )
+
+
+#the settings of the processors of a worker process of the parallel mode
+_WorkerSettings = None
+
+
+def _InitWorker( Settings ):
+    """prepares a worker process of the parallel mode
+    Settings: the arguments of the constructor of cDataProcessor"""
+    
+    global _WorkerSettings
+    
+    _WorkerSettings = Settings
+
+
+def _ProcessGCSubset( Processor, Subset ):
+    """processes some of the GCs in a worker process
+    Processor: the processor to use
+    Subset: the data holding the GCs
+    returns a lib with the columns added by the processing"""
+    
+    Known = Subset.GetGCColumnNames()
+    
+    Processor.ProcessData( Subset )
+    
+    return { ColumnName: list( Subset.AccessGCData( ColumnName ) ) for ColumnName in Subset.GetGCColumnNames() if not ColumnName in Known }
+
+
+def _GetReport( Processor ):
+    """returns the report of the instrumentation of a processor, None if it is not instrumented"""
+    
+    return None if Processor.GetInstrumentation() is None else Processor.GetInstrumentation().GetReport()
+
+
+def _ProcessGCs( Chunk ):
+    """processes a chunk of GCs in a worker process, if this fails the GCs are processed one by one so that only the failing GCs are lost
+    Chunk: the data holding the GCs
+    returns a lib with the columns added by the processing (None for GCs that failed), a lib with the error message for the position of every GC that failed and the report of the instrumentation of the chunk (None if the processing is not instrumented)"""
+    
+    Processor = cDataProcessor( **_WorkerSettings )
+    
+    try:
+        return _ProcessGCSubset( Processor, Chunk.GetGCSubset( range( len( Chunk.AccessGCData( "Name" ) ) ) ) ), {}, _GetReport( Processor )
+    except Exception:
+        pass
+    
+    #the recordings of the failed attempt are dropped
+    Processor = cDataProcessor( **_WorkerSettings )
+    
+    Rows = []
+    Errors = {}
+    
+    for Position in range( len( Chunk.AccessGCData( "Name" ) ) ):
+        try:
+            Rows.append( _ProcessGCSubset( Processor, Chunk.GetGCSubset( [ Position ] ) ) )
+        except Exception as Error:
+            Rows.append( None )
+            Errors[ Position ] = type( Error ).__name__ + ": " + str( Error )
+    
+    return { ColumnName: [ None if Row is None else Row[ ColumnName ][0] for Row in Rows ] for ColumnName in _ResultColumns }, Errors, _GetReport( Processor )
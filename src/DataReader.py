@@ -1,41 +1,162 @@
 #general libs
-import pandas as pd
+import os
+import hashlib
+import tempfile
+import numpy as np
+
+
+#the version of the cached tables, files of other versions are not used
+_CacheVersion = "1"
 
 
 class cDataReader:
     """A class to read in the given datafiles"""
     
-    def __init__( self, FileName, ExpectedColumns ):
+    def __init__( self, FileName, ExpectedColumns, CacheFolder = None ):
         """Constructor
         FileName: The name of the file that contains the GC information
         ExpectedColumns: column headers that need to be in the input file. If one column header is missing a NameError is raised
+        CacheFolder: if given, the parsed table is stored in this folder under the hash of the file's content and mapped from there as long as the file does not change
         The data is expected to be in coloums seperated by spaces."""
         
+        self.__datasheet = None
+        self.__Table = None
+        
+        if CacheFolder is None:
+            self.ReadFile( FileName, ExpectedColumns )
+            return
+        
+        CacheFile = os.path.join( CacheFolder, "SFDE_" + _CacheVersion + "_" + self.__HashFile( FileName ) + ".npy" )
+        
+        if os.path.isfile( CacheFile ):
+            self.__Table = np.load( CacheFile, mmap_mode = "r" )
+            self.__CheckColumns( list( self.__Table.dtype.names ), ExpectedColumns )
+            return
+        
         self.ReadFile( FileName, ExpectedColumns )
+        self.__WriteCache( CacheFolder, CacheFile )
     
     
     def ReadFile( self, FileName, ExpectedColumns ):
         """reads in the data from the given file
         FileName: the file that contains the data"""
         
+        #pandas takes long to import, so it is only imported once a file is read
+        import pandas as pd
+        
         #read in the data
         self.__datasheet = pd.read_table( FileName, sep='\\s+', comment='#' )
+        self.__Table = None
         
-        #check that all columns are present        
-        header = self.__datasheet.columns.values.tolist()
+        #check that all columns are present
+        self.__CheckColumns( self.__datasheet.columns.values.tolist(), ExpectedColumns )
+    
+    
+    def __CheckColumns( self, header, ExpectedColumns ):
+        """raises a NameError if a column is missing
+        header: the names of the columns that were read
+        ExpectedColumns: the names of the columns that need to be present"""
         
         for Name in ExpectedColumns:
             if not Name in header:
                 raise NameError( "cDataReader: Error importing data. Column '" + Name + "' missing!" )
+    
+    
+    def __HashFile( self, FileName ):
+        """returns the hex digest of the SHA-256 hash of a file's content"""
+        
+        Hash = hashlib.sha256()
+        
+        with open( FileName, "rb" ) as File:
+            for Block in iter( lambda: File.read( 1 << 20 ), b"" ):
+                Hash.update( Block )
+        
+        return Hash.hexdigest()
+    
+    
+    def __WriteCache( self, CacheFolder, CacheFile ):
+        """stores the datasheet as a structured array with one field per column, tables with columns other than numbers and strings are not stored
+        CacheFolder: the folder of the cache, it is created if needed
+        CacheFile: the file to store the table in"""
         
+        Columns = {}
+        
+        for header in self.__datasheet.columns.values.tolist():
+            Column = np.asarray( self.__datasheet[header] )
+            
+            if "O" == Column.dtype.kind and all( type( Elem ) == str for Elem in Column ):
+                Column = Column.astype( str )
+            
+            if not Column.dtype.kind in "biufU" or not type( header ) == str:
+                return
+            
+            Columns[header] = Column
+        
+        Table = np.empty( len( self.__datasheet ), dtype = [ ( header, Column.dtype ) for header, Column in Columns.items() ] )
+        
+        for header, Column in Columns.items():
+            Table[header] = Column
+        
+        os.makedirs( CacheFolder, exist_ok = True )
+        
+        #the table is written into a temporary file first, so that other processes never map a partly written file
+        Handle, TempFile = tempfile.mkstemp( suffix = ".npy", dir = CacheFolder )
+        
+        with os.fdopen( Handle, "wb" ) as File:
+            np.save( File, Table )
+        
+        os.chmod( TempFile, 0o644 )
+        os.replace( TempFile, CacheFile )
+    
+    
+    @staticmethod
+    def ReadChunks( FileName, ExpectedColumns, ChunkSize ):
+        """reads in the data from the given file chunk by chunk, so that only one chunk is held in memory at a time
+        FileName: the file that contains the data
+        ExpectedColumns: column headers that need to be in the input file. If one column header is missing a NameError is raised
+        ChunkSize: the maximum number of rows per chunk
+        yields the data of every chunk in the same form as GetData
+        Integer columns of later chunks are turned into floats if the column of the first chunk holds floats, so that all chunks print the same way."""
+        
+        import pandas as pd
+        
+        Types = None
+        
+        with pd.read_table( FileName, sep='\\s+', comment='#', chunksize = ChunkSize ) as Reader:
+            for Sheet in Reader:
+                if Types is None:
+                    header = Sheet.columns.values.tolist()
+                    
+                    for Name in ExpectedColumns:
+                        if not Name in header:
+                            raise NameError( "cDataReader: Error importing data. Column '" + Name + "' missing!" )
+                    
+                    Types = Sheet.dtypes
+                
+                for header in Sheet.columns.values.tolist():
+                    if pd.api.types.is_float_dtype( Types[header] ) and pd.api.types.is_integer_dtype( Sheet[header] ):
+                        Sheet[header] = Sheet[header].astype( Types[header] )
+                
+                yield { header: tuple( Sheet[header] ) for header in Sheet.columns.values.tolist() }
+    
     
     def GetPandasSheet( self ):
         """returns the pandas datasheet"""
         
+        #a table read from the cache is only turned into a datasheet when needed
+        if self.__datasheet is None:
+            import pandas as pd
+            
+            self.__datasheet = pd.DataFrame( { header: np.asarray( self.__Table[header] ) for header in self.__Table.dtype.names } )
+        
         return self.__datasheet
     
     
     def GetData( self ):
         """returns the data in form of a plain python list"""
         
-        return { header: tuple( self.__datasheet[header] ) for header in self.__datasheet.columns.values.tolist() }
+        #both the cached table and the pandas sheet are turned into python values, so that the data does not depend on the cache
+        if not self.__Table is None:
+            return { header: tuple( self.__Table[header].tolist() ) for header in self.__Table.dtype.names }
+        
+        return { header: tuple( self.__datasheet[header].tolist() ) for header in self.__datasheet.columns.values.tolist() }
@@ -1,8 +1,19 @@
 # general libs
 import os
 import sys
-import matplotlib.pyplot as plt
+import warnings
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+
+#the files the GC data is written to by format
+_GCFiles = { "dat": "GCData.dat", "csv": "GCData.csv", "npz": "GCData.npz", "hdf5": "GCData.h5", "parquet": "GCData.parquet" }
+
+#the number of boundaries of the mass functions written chunk by chunk into csv files, so that all chunks have the same columns (the IMFs of cIMFGenerator have four)
+_ChunkMFBounds = { "IMF": 4 }
+
+#the colours of the barcode segments by kind: stars without SN, SNe after and before the end of SF (the stars below and above mlast)
+_BarcodeColours = np.array( [ "black", "grey", "red" ] )
 
 
 class cDataWriter():
@@ -13,6 +24,10 @@ class cDataWriter():
         
         self.__OutputFolder = OutputFolder
         
+        #the number of chunks written by WriteChunk and the columns of the first chunk's table
+        self.__nChunks = 0
+        self.__ChunkColumns = None
+        
         try:
             os.mkdir( OutputFolder )
         except FileExistsError:
@@ -20,32 +35,205 @@ class cDataWriter():
             sys.exit()
     
     
-    def WriteAllData( self, data ):
+    def WriteAllData( self, data, Workers = 1, Barcodes = "png", Format = "dat" ):
         """generates all possible outputdata
-        data: the data to generate the output from"""
+        data: the data to generate the output from
+        Workers: the number of processes the barcodes are drawn with
+        Barcodes: how the barcodes are written, 'png' for one plot per GC, 'npz' or 'csv' for the intervals of all GCs in one file, 'none' for no barcodes
+        Format: the format of the GC data (see WriteGCData)"""
+        
+        if not Barcodes in [ "png", "npz", "csv", "none" ]:
+            raise ValueError( "cDataWriter: Unknown barcode format '" + str( Barcodes ) + "'!" )
         
-        self.WriteGCData( data )
-        self.PlotBarcodes( data )
+        self.WriteGCData( data, Format )
+        
+        if "png" == Barcodes:
+            self.PlotBarcodes( data, Workers )
+        elif "none" != Barcodes:
+            self.WriteBarcodeIntervals( data, Barcodes )
     
     
-    def WriteGCData( self, data ):
+    def WriteChunk( self, data, Workers = 1, Barcodes = "png", Format = "dat" ):
+        """appends the output of one chunk of GCs (see cData.IterGCChunks) to the output of the previous chunks
+        data: the chunk to generate the output from
+        Workers: the number of processes the barcodes are drawn with
+        Barcodes: how the barcodes are written, 'png' for one plot per GC, 'csv' for the intervals of all GCs in one file, 'none' for no barcodes
+        Format: the format of the GC data, 'dat' or 'csv' (see WriteGCData)
+        The columns of GCData.dat are padded to the widths needed by every chunk only, GCData.csv keeps the columns of the first chunk with the mass functions padded to a fixed number of boundaries, columns a later chunk adds are not written with a warning."""
+        
+        if not Barcodes in [ "png", "csv", "none" ]:
+            raise ValueError( "cDataWriter: Barcode format '" + str( Barcodes ) + "' cannot be written chunk by chunk!" )
+        
+        if not Format in [ "dat", "csv" ]:
+            raise ValueError( "cDataWriter: Format '" + str( Format ) + "' cannot be written chunk by chunk!" )
+        
+        Mode = "a" if self.__nChunks > 0 else "w"
+        
+        if "dat" == Format:
+            with open( self.__OutputFolder + "/GCData.dat", Mode ) as GCFile:
+                data.WriteGCDataPrinteable( GCFile, 0 == self.__nChunks )
+        
+        else:
+            Sheet = self.__GetGCSheet( data.GetGCArrays( _ChunkMFBounds ) )
+            
+            if self.__ChunkColumns is None:
+                self.__ChunkColumns = list( Sheet.columns )
+            
+            #the header has been written already, columns missing in the chunk are NaN
+            Extra = [ Name for Name in Sheet.columns if not Name in self.__ChunkColumns ]
+            
+            if len( Extra ) > 0:
+                warnings.warn( "cDataWriter: The columns " + ", ".join( Extra ) + " of chunk " + str( self.__nChunks ) + " are not in GCData.csv and are not written!" )
+            
+            Sheet.reindex( columns = self.__ChunkColumns ).to_csv( self.__OutputFolder + "/GCData.csv", mode = Mode, header = 0 == self.__nChunks, index = False )
+        
+        if "png" == Barcodes:
+            self.PlotBarcodes( data, Workers )
+        elif "csv" == Barcodes:
+            self.__WriteBarcodeCsv( self.__GetBarcodeColumns( data ), Mode )
+        
+        self.__nChunks += 1
+    
+    
+    def WriteGCData( self, data, Format = "dat" ):
         """writes out all of the GCData using the data class
-        data: the object in which all of the data is stored"""
+        data: the object in which all of the data is stored
+        Format: 'dat' for the aligned text table GCData.dat, or 'csv', 'npz', 'hdf5' (needs h5py) or 'parquet' (needs pyarrow or fastparquet) for a file with all columns at full precision
+        Except for 'dat' the columns are written as arrays, columns of mass functions as their parameters (see cData.GetGCArrays)."""
         
-        GCFile = open( self.__OutputFolder + "/GCData.dat", "w" )
+        if not Format in _GCFiles:
+            raise ValueError( "cDataWriter: Unknown format '" + str( Format ) + "'!" )
         
-        GCFile.write( data.AccessGCDataPrinteable() )
+        FileName = self.__OutputFolder + "/" + _GCFiles[ Format ]
         
-        GCFile.close()
+        if "dat" == Format:
+            with open( FileName, "w" ) as GCFile:
+                data.WriteGCDataPrinteable( GCFile )
+            
+            return
+        
+        Columns = data.GetGCArrays()
+        
+        if "npz" == Format:
+            np.savez_compressed( FileName, **Columns )
+        
+        elif "hdf5" == Format:
+            try:
+                import h5py
+            except ImportError:
+                raise ImportError( "cDataWriter: Writing HDF5 files needs the package h5py!" )
+            
+            with h5py.File( FileName, "w" ) as GCFile:
+                for Name, Column in Columns.items():
+                    GCFile.create_dataset( Name, data = np.char.encode( Column, "utf-8" ) if "U" == Column.dtype.kind else Column )
+        
+        elif "csv" == Format:
+            self.__GetGCSheet( Columns ).to_csv( FileName, index = False )
+        
+        else:
+            self.__GetGCSheet( Columns ).to_parquet( FileName, index = False )
+    
+    
+    def __GetGCSheet( self, Columns ):
+        """turns the arrays of the GC data into a pandas sheet, columns with several values per GC are split into columns 'Name_0', 'Name_1', ...
+        Columns: the columns as returned by cData.GetGCArrays"""
+        
+        import pandas as pd
+        
+        Flat = {}
+        
+        for Name, Column in Columns.items():
+            if 1 == Column.ndim:
+                Flat[ Name ] = Column
+                continue
+            
+            for nValue in range( Column.shape[1] ):
+                Flat[ Name + "_" + str( nValue ) ] = Column[ :, nValue ]
+        
+        return pd.DataFrame( Flat )
+    
+    
+    def WriteProfile( self, Instrumentation ):
+        """writes the recordings of an instrumented processing into 'Profile.json'
+        Instrumentation: the recordings (cInstrumentation, see cDataProcessor.GetInstrumentation)"""
+        
+        Instrumentation.WriteReport( self.__OutputFolder + "/Profile.json" )
     
     
-    def PlotBarcodes( self, data ):
+    def PlotBarcodes( self, data, Workers = 1 ):
         """plots the barcodes for the GCs and puts them into dedicated output folders
-        data: the data to work with"""
+        data: the data to work with
+        Workers: the number of processes the barcodes are drawn with (1 draws all barcodes in this process)"""
+        
+        if Workers < 1:
+            raise ValueError( "cDataWriter: The number of workers needs to be at least 1!" )
         
-        #make dedicated output folder
+        #make dedicated output folder, it already exists for later chunks
         OutFolder = self.__OutputFolder + "/Barcodes"
-        os.mkdir( OutFolder )
+        
+        if not os.path.isdir( OutFolder ):
+            os.mkdir( OutFolder )
+        
+        #the segments of all barcodes are computed here, the processes only draw them
+        Barcodes = [ ( OutFolder + "/" + Name + ".png", Masses, _BarcodeColours[ Kinds ], mmax, mlast, SFD ) for Name, Masses, Kinds, mmax, mlast, SFD in self.__ComputeBarcodes( data ) ]
+        
+        if 1 == Workers or len( Barcodes ) < 2:
+            _DrawBarcodes( Barcodes )
+            return
+        
+        with ProcessPoolExecutor( max_workers = Workers ) as Pool:
+            list( Pool.map( _DrawBarcodes, [ Barcodes[ nStart::Workers ] for nStart in range( Workers ) ] ) )
+    
+    
+    def WriteBarcodeIntervals( self, data, Format = "npz" ):
+        """writes the segments of the barcodes of all GCs into one file instead of plotting them, one row per segment
+        data: the data to work with
+        Format: 'npz' for a compressed numpy archive (Barcodes.npz), 'csv' for a text file (Barcodes.csv)
+        The columns are the name of the GC, the lower and upper mass of the segment and its kind (0: no SN, 1: SN after the end of SF, below mlast, 2: SN before the end of SF, above mlast)."""
+        
+        if not Format in [ "npz", "csv" ]:
+            raise ValueError( "cDataWriter: Unknown barcode format '" + str( Format ) + "'!" )
+        
+        Columns = self.__GetBarcodeColumns( data )
+        
+        if "npz" == Format:
+            np.savez_compressed( self.__OutputFolder + "/Barcodes.npz", **Columns )
+            return
+        
+        self.__WriteBarcodeCsv( Columns, "w" )
+    
+    
+    def __GetBarcodeColumns( self, data ):
+        """computes the segments of the barcodes of all GCs as columns with one row per segment (see WriteBarcodeIntervals)
+        data: the data to work with
+        returns a lib with the columns 'Name', 'mlow', 'mhigh' and 'Kind'"""
+        
+        Barcodes = self.__ComputeBarcodes( data )
+        
+        #the empty arrays keep the columns valid without any barcodes
+        return { "Name": np.repeat( np.array( [ Barcode[0] for Barcode in Barcodes ], dtype = str ), [ len( Barcode[2] ) for Barcode in Barcodes ] ),
+                 "mlow": np.concatenate( [ Barcode[1][:-1] for Barcode in Barcodes ] + [ np.empty( 0 ) ] ),
+                 "mhigh": np.concatenate( [ Barcode[1][1:] for Barcode in Barcodes ] + [ np.empty( 0 ) ] ),
+                 "Kind": np.concatenate( [ Barcode[2] for Barcode in Barcodes ] + [ np.empty( 0, dtype = int ) ] ).astype( np.int8 ) }
+    
+    
+    def __WriteBarcodeCsv( self, Columns, Mode ):
+        """writes the segments of barcodes into Barcodes.csv
+        Columns: the columns of the segments (see __GetBarcodeColumns)
+        Mode: 'w' to start a new file with a header, 'a' to append the rows to the file"""
+        
+        with open( self.__OutputFolder + "/Barcodes.csv", Mode ) as File:
+            if "w" == Mode:
+                File.write( "#Kind: 0 no SN, 1 SN after the end of SF (below mlast), 2 SN before the end of SF (above mlast)\n" )
+                File.write( "Name,mlow[Msun],mhigh[Msun],Kind\n" )
+            
+            File.writelines( Name + "," + repr( float( mlow ) ) + "," + repr( float( mhigh ) ) + "," + str( Kind ) + "\n" for Name, mlow, mhigh, Kind in zip( Columns["Name"], Columns["mlow"], Columns["mhigh"], Columns["Kind"] ) )
+    
+    
+    def __ComputeBarcodes( self, data ):
+        """computes the segments of the barcodes of all GCs with a known mlast
+        data: the data to work with
+        returns a list with the name, the boundaries and kinds of the segments, mmax, mlast and the SF duration of every barcode"""
         
         #get required columns
         Names = data.AccessGCData( "Name" )
@@ -53,12 +241,7 @@ class cDataWriter():
         mlasts = data.AccessGCData( "mlast" )
         SFDs = data.AccessGCData( "SFD" )
         
-        # create the colour scheme
-        nSamples = 1000
-        mmin = 8.0
-        
-        fig = plt.figure( num = 0, figsize = [3.5,1.5], dpi = 200)
-        plt.rcParams.update({'font.size': 8})
+        Barcodes = []
         
         for nSC in range( len( Names )):
             if np.isnan( mlasts[nSC] ):
@@ -66,36 +249,82 @@ class cDataWriter():
             
             mmax = IMFs[ nSC ].Getbounds()[-1]
             
-            logDist = ( np.log10( mmax ) - np.log10( mmin )) / nSamples
+            Masses, Kinds = self.__ComputeBarcode( data, mmax, mlasts[nSC] )
+            
+            Barcodes.append( ( Names[nSC], Masses, Kinds, mmax, mlasts[nSC], SFDs[nSC] ) )
+        
+        return Barcodes
+    
+    
+    def __ComputeBarcode( self, data, mmax, mlast ):
+        """computes the segments of a barcode
+        data: the data to work with
+        mmax: the mass of the most massive star
+        mlast: the mass of the last star to contribute to SF
+        returns the boundaries of the segments and the kind of every segment (0: no SN, 1: SN after the end of SF, below mlast, 2: SN before the end of SF, above mlast)
+        The segments are the exact mass intervals of exploding and not exploding stars (see cData.GetSNIntervals), split at mlast."""
+        
+        mmin = 8.0
+        
+        Bounds, Explodes = data.GetSNIntervals( mmin, mmax )
+        
+        #split the interval containing mlast
+        if mmin < mlast and mlast < mmax and not mlast in Bounds:
+            nBound = np.searchsorted( Bounds, mlast )
+            
+            Bounds = np.insert( Bounds, nBound, mlast )
+            Explodes = np.insert( Explodes, nBound - 1, Explodes[ nBound - 1 ] )
+        
+        Kinds = np.where( ~Explodes, 0, np.where( Bounds[1:] <= mlast, 1, 2 ) )
+        
+        return Bounds, Kinds
+
+
+#the figure a process draws the barcodes on
+_BarcodeFigure = None
+
+
+def _DrawBarcodes( Barcodes ):
+    """draws barcodes into png files, every process keeps one figure with its own Agg canvas to draw on
+    Barcodes: a list with the file name, the boundaries and colours of the segments, mmax, mlast and the SF duration of every barcode"""
+    
+    #matplotlib takes long to import, so it is only imported once barcodes are drawn
+    import matplotlib
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.collections import PolyCollection
+    
+    global _BarcodeFigure
+    
+    if _BarcodeFigure is None:
+        _BarcodeFigure = Figure( figsize = [3.5,1.5], dpi = 200 )
+        FigureCanvasAgg( _BarcodeFigure )
+    
+    fig = _BarcodeFigure
+    
+    mmin = 8.0
+    
+    with matplotlib.rc_context( { 'font.size': 8 } ):
+        for FileName, Masses, Colours, mmax, mlast, SFD in Barcodes:
+            fig.clf()
+            ax = fig.add_subplot()
             
-            Masses = [ pow( 10.0, np.log10( mmin ) + i * logDist ) for i in range( nSamples + 1 ) ]
+            #all segments are drawn as one collection of polygons
+            Polygons = np.stack( ( np.column_stack( ( Masses[:-1], np.zeros( len( Colours ) ) ) ), np.column_stack( ( Masses[:-1], np.ones( len( Colours ) ) ) ), np.column_stack( ( Masses[1:], np.ones( len( Colours ) ) ) ), np.column_stack( ( Masses[1:], np.zeros( len( Colours ) ) ) ) ), axis = 1 )
             
-            for nMass in range( 1, len( Masses ) ):
-                if Masses[nMass] > mlasts[nSC]:
-                    Masses.insert( nMass - 1, mlasts[nSC] )
-                    break
+            ax.add_collection( PolyCollection( Polygons, facecolors = Colours, edgecolors = "none" ) )
             
-            for nMass in range( 1, len( Masses ) ):
-                mass = 0.5 * ( Masses[nMass] + Masses[nMass - 1] )
-                if not data.SNExplodes( mass ):
-                    plt.fill( [Masses[nMass - 1], Masses[nMass - 1], Masses[nMass], Masses[nMass]], [0,1,1,0], "black" )
-                elif mass < mlasts[nSC]:
-                    plt.fill( [Masses[nMass - 1], Masses[nMass - 1], Masses[nMass], Masses[nMass]], [0,1,1,0], "grey" )
-                else:
-                    plt.fill( [Masses[nMass - 1], Masses[nMass - 1], Masses[nMass], Masses[nMass]], [0,1,1,0], "red" )
-                    
-            plt.xscale( "log" )
+            ax.set_xscale( "log" )
             
-            plt.xlabel( "$m [M_\\odot]$" )
-            plt.text( mlasts[nSC], 1.05, " $t_{SF} = " + "{:.1f}".format( SFDs[nSC] * 1000.0 ) + "$ Myr ", ha = "left" if mlasts[nSC] < 80 else "right" )
-            plt.arrow( mlasts[nSC], 1.15, 0.0, -0.11, color = "black", lw = 1, clip_on=False, head_width = 0.03 * mlasts[nSC], head_length = 0.03, head_starts_at_zero = False )
+            ax.set_xlabel( "$m [M_\\odot]$" )
+            ax.text( mlast, 1.05, " $t_{SF} = " + "{:.1f}".format( SFD * 1000.0 ) + "$ Myr ", ha = "left" if mlast < 80 else "right" )
+            ax.arrow( mlast, 1.15, 0.0, -0.11, color = "black", lw = 1, clip_on=False, head_width = 0.03 * mlast, head_length = 0.03, head_starts_at_zero = False )
             
-            plt.gca().axes.get_yaxis().set_visible(False)
+            ax.get_yaxis().set_visible(False)
             
-            plt.xlim( xmin = mmin, xmax = mmax )
-            plt.ylim( ymin = 0, ymax = 1 )
+            ax.set_xlim( xmin = mmin, xmax = mmax )
+            ax.set_ylim( ymin = 0, ymax = 1 )
             
-            plt.subplots_adjust(left=0.02, right=0.98, top=0.88, bottom=0.3)
+            fig.subplots_adjust(left=0.02, right=0.98, top=0.88, bottom=0.3)
             
-            plt.savefig( OutFolder + "/" + Names[nSC] + ".png" )
-            plt.clf()
+            fig.savefig( FileName )
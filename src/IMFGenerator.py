@@ -1,6 +1,8 @@
 #general libs
+import math
 import warnings
 import numpy as np
+from collections import OrderedDict
 
 #own packages
 from src.massfunction import cMassFunction
@@ -12,13 +14,34 @@ METAL_IN_SUN = 0.0142
 class cIMFGenerator():
     """a class to generate initial mass functions based on a GC's current chemical and orbital properties"""
     
-    def __init__( self, RemCalc ):
+    def __init__( self, RemCalc, MFCacheSize = 16 ):
         """initialises the generator
-        RemCalc: the remnant calculator (cRemnantCalculator) to use (also contains the metallicity used)"""
+        RemCalc: the remnant calculator (cRemnantCalculator) to use (also contains the metallicity used), the IMFs of many clusters are generated by cIMFGeneratorBatch
+        MFCacheSize: the maximum number of mass functions ComputeMF keeps to return them again for the same Mini (0 disables the cache)"""
+        
+        if MFCacheSize < 0:
+            raise ValueError( "cIMFGenerator: The size of the mass function cache must not be negative!" )
+        
+        if np.ndim( RemCalc.GetZH() ) != 0:
+            raise ValueError( "cIMFGenerator: The remnant calculator needs to hold a single metallicity, use cIMFGeneratorBatch for many clusters!" )
         
         self.__ZH = RemCalc.GetZH()
         self.__RemCalc = RemCalc
         self.__gamma = 0.02
+        
+        #the counters of the mass functions requested and of the solver for m_max
+        self.__MFCalls = 0
+        self.__MFSolves = 0
+        self.__MFIterations = 0
+        
+        #the mass functions computed last, the least recently used one is removed when the cache is full
+        self.__MFCacheSize = MFCacheSize
+        self.__MFCache = OrderedDict()
+        self.__MFCacheHits = 0
+        self.__MFCacheMisses = 0
+        
+        #the diagnostics of the last solve for Mini
+        self.__Diagnostics = None
     
     
     def ComputeAlpha( self, Mini ):
@@ -73,52 +96,149 @@ class cIMFGenerator():
         return MF.Getks()[-1] / ( 1.0 - MF.Getalphas()[-1] ) * ( pow( 150.0, 1.0 - MF.Getalphas()[-1] ) - pow( m_max, 1.0 - MF.Getalphas()[-1] ) ) - 1.0
     
     
-    def ComputeMF( self, Mini ):
+    def ComputeMF( self, Mini, m_max = None ):
         """computes the mass function for a given Mini
-        Mini: the initial mass of the cluster [Msun]"""
+        Mini: the initial mass of the cluster [Msun]
+        m_max: a first guess of the most massive star (default: the approximation by Pflamm-Altenburg et al. 2007), e.g. the m_max of a similar cluster
+        m_max is found with Newton-Raphson steps using the analytic derivative of CheckUpperEnd, a step leaving the bracket of the root bisects the bracket instead
+        mass functions computed before for the same metallicity and Mini are taken from the cache"""
         
-        alpha = self.ComputeAlpha( Mini )
+        self.__MFCalls += 1
+        
+        Key = ( self.__ZH, Mini )
+        
+        if Key in self.__MFCache:
+            self.__MFCacheHits += 1
+            self.__MFCache.move_to_end( Key )
+            
+            return self.__MFCache[ Key ]
+        
+        self.__MFCacheMisses += 1
+        
+        MF = self.__SolveMF( Mini, m_max )
+        
+        if self.__MFCacheSize > 0:
+            self.__MFCache[ Key ] = MF
+            
+            if len( self.__MFCache ) > self.__MFCacheSize:
+                self.__MFCache.popitem( last = False )
+        
+        return MF
+    
+    
+    def GetMFCacheHits( self ):
+        return self.__MFCacheHits
+    
+    
+    def GetMFCacheMisses( self ):
+        return self.__MFCacheMisses
+    
+    
+    def __SolveMF( self, Mini, m_max ):
+        """solves for the m_max of the mass function for a given Mini, see ComputeMF
+        Mini: the initial mass of the cluster [Msun]
+        m_max: a first guess of the most massive star (None for the approximation by Pflamm-Altenburg et al. 2007)"""
         
-        logMini = np.log10( Mini )
+        alpha = self.ComputeAlpha( Mini )
         
-        #PflammAltenburg (2007) approximation
-        m_max = pow( 10.0, 2.56 * logMini * pow( pow( 3.82, 9.17 ) + pow( logMini, 9.17 ), -1.0/9.17 ) - 0.38 )
+        if m_max is None:
+            logMini = np.log10( Mini )
+            
+            #PflammAltenburg (2007) approximation
+            m_max = pow( 10.0, 2.56 * logMini * pow( pow( 3.82, 9.17 ) + pow( logMini, 9.17 ), -1.0/9.17 ) - 0.38 )
         
-        #improve using Newton-Raphson
         epsilon = 1e-6      #allowed error
-        h = 1.0             #step width
         
+        #the number of stars above m_max decreases with m_max, the root lies between the last boundary and 150 Msun (or Mini)
+        Low = 1.0
+        High = min( 150.0, Mini )
+        
+        if not ( Low < m_max and m_max < High ):
+            m_max = 0.5 * ( Low + High )
+        
+        self.__MFSolves += 1
+        
+        #improve using Newton-Raphson steps within the bracket
         for i in range( 100 ):
-            MF = cMassFunction( Mini, [0.08,0.5,1.0,m_max], alpha )
+            self.__MFIterations += 1
             
-            Delta = self.CheckUpperEnd( MF )
+            Delta, Derivative = self.__UpperEnd( Mini, m_max, alpha )
             
             if abs( Delta ) < epsilon:
-                return MF
+                return cMassFunction( Mini, [0.08,0.5,1.0,m_max], alpha )
+            
+            if Delta > 0.0:
+                Low = m_max
+            else:
+                High = m_max
             
-            Derivative = 0.5 * ( self.CheckUpperEnd( cMassFunction( Mini, [0.08,0.5,1.0,m_max + h], alpha ) ) - self.CheckUpperEnd( cMassFunction( Mini, [0.08,0.5,1.0,m_max - h], alpha ) )) / h
+            Newton = m_max - Delta / Derivative if 0.0 != Derivative else float( "NaN" )
             
-            m_max -= Delta / Derivative
+            m_max = Newton if Low < Newton and Newton < High else 0.5 * ( Low + High )
         
         warnings.warn( "cIMFGenerator: ComputeMF: Newton-Raphson did not converge!" )
         
-        return MF
+        return cMassFunction( Mini, [0.08,0.5,1.0,m_max], alpha )
     
     
-    def __HelperComputeMFFromToday( self, M, Age, Rapo, Rperi, SFE, Mini ):
+    def __UpperEnd( self, Mini, m_max, alpha ):
+        """computes CheckUpperEnd and its derivative with respect to m_max without setting up the mass function
+        Mini: the initial mass of the cluster [Msun]
+        m_max: the most massive star
+        alpha: the list of alphas
+        returns int_m_max^150Msun MF - 1.0 and its derivative
+        With the boundaries 0.08, 0.5, 1.0 and m_max the MF is k c_i m^-alpha_i, where c_i only depends on the alphas and k = ( Mini - m_max ) / ( S + c_3 I( m_max ) )"""
+        
+        #int_low^high m^-beta dm
+        PowInt = lambda low, high, beta: math.log( high ) - math.log( low ) if 1.0 == beta else ( pow( high, 1.0 - beta ) - pow( low, 1.0 - beta ) ) / ( 1.0 - beta )
+        
+        c3 = pow( 0.5, -alpha[0] ) / pow( 0.5, -alpha[1] )
+        
+        #the mass below 1 Msun and within the last segment (both without k)
+        Denominator = PowInt( 0.08, 0.5, alpha[0] - 1.0 ) + c3 * PowInt( 0.5, 1.0, alpha[1] - 1.0 ) + c3 * PowInt( 1.0, m_max, alpha[2] - 1.0 )
+        
+        k = ( Mini - m_max ) / Denominator
+        Dk = ( -Denominator - ( Mini - m_max ) * c3 * pow( m_max, 1.0 - alpha[2] ) ) / ( Denominator * Denominator )
+        
+        #the number of stars above m_max (without k)
+        N = PowInt( m_max, 150.0, alpha[2] )
+        
+        return c3 * k * N - 1.0, c3 * ( Dk * N - k * pow( m_max, -alpha[2] ) )
+    
+    
+    def GetMFCalls( self ):
+        """returns the number of mass functions requested from ComputeMF so far"""
+        
+        return self.__MFCalls
+    
+    
+    def GetMFSolves( self ):
+        """returns the number of m_max solved for so far"""
+        
+        return self.__MFSolves
+    
+    
+    def GetMFIterations( self ):
+        """returns the total number of iterations needed to solve for m_max so far"""
+        
+        return self.__MFIterations
+    
+    
+    def __HelperComputeMFFromToday( self, M, Age, Rapo, Rperi, SFE, Mini, m_max = None ):
         """Computes the initial masses of the clusters given in data
         M: the present day mass [Msun]
         Age: the age of the cluster [Gyr]
         Rapo: the apocentre of the clusters orbit [kpc]
         Rperi: the pericentre of the clusters orbit [kpc]
         Mini: a guess of the initial mass
-        returns the error resulting from the given initial mass acoording to Baumgardt and Makino's formula"""
+        m_max: a first guess of the most massive star for ComputeMF
+        returns the error resulting from the given initial mass acoording to Baumgardt and Makino's formula and the m_max of its mass function"""
             
         e = ( Rapo - Rperi ) / ( Rapo + Rperi )
         
         Factor = Rapo * ( 1.0 - e )
         
-        IMF = self.ComputeMF( Mini )
+        IMF = self.ComputeMF( Mini, m_max )
         
         N = IMF.GetTotNumbers()
         
@@ -128,7 +248,7 @@ class cIMFGenerator():
         
         Err = beta * pow( N / np.log( self.__gamma * N ), x ) * Factor * ( 1.0 - M / ( p_SF * Mini )) / ( Age * 1000.0 ) - 1.0
         
-        return Err
+        return Err, IMF.Getbounds()[-1]
     
     
     def ComputeIMFFromToday( self, M, Age, Rapo, Rperi, SFE ):
@@ -136,7 +256,10 @@ class cIMFGenerator():
         M: current mass of the GC
         Age: the current age of the GC [Gyr]
         Rapo: the apocentre of the GC [kpc]
-        Rperi: the pericentre of the GC [kpc]"""
+        Rperi: the pericentre of the GC [kpc]
+        returns the mass function, None if Mini or m_max did not converge (see GetSolverDiagnostics)"""
+        
+        MFIterations = self.__MFIterations
         
         #initial guess
         Mini = 2.0 * M
@@ -147,20 +270,71 @@ class cIMFGenerator():
         #step width
         dM = 1e3
         
-        #iteratively compute Mini
-        for i in range( 100 ):
-            
-            Error = self.__HelperComputeMFFromToday( M, Age, Rapo, Rperi, SFE, Mini )
-            
-            if abs( Error ) < epsilon:
-                return self.ComputeMF( Mini )
-            
-            Derr = 0.5 * ( self.__HelperComputeMFFromToday( M, Age, Rapo, Rperi, SFE, Mini + dM ) - self.__HelperComputeMFFromToday( M, Age, Rapo, Rperi, SFE, Mini - dM )) / dM
-            
-            Mini -= Error / Derr
-            
-        if abs( Error ) > epsilon:
+        #the m_max of the last mass function is the first guess for the next one
+        m_max = None
+        
+        Converged = False
+        
+        #the errors of masses that are not positive are complex or NaN, such masses are not computed
+        Valid = lambda Value: bool( np.isreal( Value ) and np.isfinite( Value ) and np.real( Value ) > 0.0 )
+        
+        Iterations = 0
+        Error = float( "NaN" )
+        
+        #iteratively compute Mini, a cluster for which Mini can no longer be computed is given up
+        with np.errstate( divide = "ignore", invalid = "ignore" ):
+            while Iterations < 100 and Valid( Mini ):
+                Iterations += 1
+                
+                Error, m_max = self.__HelperComputeMFFromToday( M, Age, Rapo, Rperi, SFE, Mini, m_max )
+                
+                if not ( np.isreal( Error ) and np.isfinite( Error ) ):
+                    Error = float( "NaN" )
+                    break
+                
+                Error = float( np.real( Error ) )
+                
+                if abs( Error ) < epsilon:
+                    Converged = True
+                    break
+                
+                #the derivative needs the error of a smaller mass as well
+                if not Valid( Mini - dM ):
+                    break
+                
+                Derr = 0.5 * ( self.__HelperComputeMFFromToday( M, Age, Rapo, Rperi, SFE, Mini + dM, m_max )[0] - self.__HelperComputeMFFromToday( M, Age, Rapo, Rperi, SFE, Mini - dM, m_max )[0] ) / dM
+                
+                Next = Mini - Error / Derr
+                
+                if not Valid( Next ):
+                    break
+                
+                Mini = float( np.real( Next ) )
+        
+        #the mass function of the last Mini the error was computed for (taken from the cache)
+        IMF = self.ComputeMF( Mini, m_max ) if Valid( Mini ) else None
+        MFResidual = float( "NaN" ) if IMF is None else self.CheckUpperEnd( IMF )
+        
+        Converged = Converged and bool( abs( MFResidual ) < epsilon )
+        
+        self.__Diagnostics = { "MiniIterations": Iterations, "MFIterations": self.__MFIterations - MFIterations, "MiniResidual": Error, "MFResidual": float( MFResidual ), "IMFConverged": Converged }
+        
+        if not Converged:
             warnings.warn( "Warning: cIMFGenerator: ComputeMFFromToday: Mini did not converge!" )
+            return None
+        
+        return IMF
+    
+    
+    def GetSolverDiagnostics( self ):
+        """returns the diagnostics of the last call of ComputeIMFFromToday as a lib, None before the first call
+        'MiniIterations': the Newton-Raphson steps of the solver for Mini
+        'MFIterations': the steps of the solver for m_max needed by all mass functions computed for the GC
+        'MiniResidual': the last relative error of the present-day mass computed from Mini
+        'MFResidual': the error of the number of stars above m_max of the last mass function (see CheckUpperEnd)
+        'IMFConverged': whether both solvers converged"""
+        
+        return self.__Diagnostics
 
 
     def ComputeCurrentMass( self, Mini, Rapo, Rperi, SFE, Age ):
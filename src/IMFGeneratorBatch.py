@@ -0,0 +1,315 @@
+#general libs
+import warnings
+import numpy as np
+
+#own packages
+from src.IMFGenerator import METAL_IN_SUN
+from src.massfunctionbatch import cMassFunctionBatch
+from src.BaseSCCalc import ComputeDens, ComputeConcentrationParametre, ComputeKingConcentrationParameter
+
+
+class cIMFGeneratorBatch():
+    """a class to generate the initial mass functions of many GCs with different metallicities at once, see cIMFGenerator"""
+    
+    def __init__( self, RemCalcs ):
+        """initialises the generator
+        RemCalcs: the remnant calculator (cRemnantCalculatorBatch) holding the metallicities of the clusters"""
+        
+        self.__ZH = RemCalcs.GetZH()
+        self.__RemCalcs = RemCalcs
+        self.__gamma = 0.02
+        
+        #the counters of the mass functions requested and of the solver for m_max
+        self.__MFCalls = 0
+        self.__MFSolves = 0
+        self.__MFIterations = 0
+        
+        #the iterations of the m_max solver for every cluster of the last call of ComputeMFs and summed up over a call of ComputeIMFsFromToday, and the diagnostics of the last solve for Mini
+        self.__LastMFIterations = None
+        self.__ClusterMFIterations = None
+        self.__Diagnostics = None
+    
+    
+    def ComputeAlphas( self, Minis, ZHs = None ):
+        """computes the alphas for many GCs at once, see cIMFGenerator.ComputeAlpha
+        Minis: an array of initial masses [Msun]
+        ZHs: the metallicities [Z/H] of the GCs (default: the metallicities of the generator)
+        returns an array with one row of alphas per GC"""
+        
+        Minis = np.array( Minis, dtype = float, ndmin = 1 )
+        ZHs = np.broadcast_to( np.asarray( self.__ZH if ZHs is None else ZHs, dtype = float ), Minis.shape )
+        
+        #compute the alphas acording to Yan et al. (2021)
+        Dalpha = 63
+        
+        alphas = np.empty( ( len( Minis ), 3 ) )
+        
+        alphas[:, 0] = 1.3 + Dalpha * ( np.power( 10.0, ZHs ) - 1.0 ) * METAL_IN_SUN
+        alphas[:, 1] = 2.3 + Dalpha * ( np.power( 10.0, ZHs ) - 1.0 ) * METAL_IN_SUN
+        
+        y = -0.14 * ZHs + 0.99 * np.log10( ComputeDens( Minis ) * pow( 10.0, -6.0 ) )
+        
+        alphas[:, 2] = np.where( y < -0.87, 2.3, -0.41 * y + 1.94 )
+        
+        return alphas
+    
+    
+    def ComputeBetasAndXs( self, Minis, Rperis, SFEs ):
+        """computes the parameters beta and x for many GCs at once, see cIMFGenerator.ComputeBetaAndX
+        Minis: an array of initial masses [Msun]
+        Rperis: an array of pericentre distances [kpc]
+        SFEs: an array of star formation efficiencies
+        returns the arrays of beta and x"""
+        
+        c = ComputeConcentrationParametre( Minis, Rperis, SFEs )
+        W0 = ComputeKingConcentrationParameter( c )
+        
+        return 36.63 * np.power( W0, -1.835 ), 0.575 + 0.035 * W0
+    
+    
+    def CheckUpperEnds( self, MFs ):
+        """checks that the integral between m_max and 150 Msun is 1 for many mass functions at once, see cIMFGenerator.CheckUpperEnd
+        MFs: the mass functions to check (cMassFunctionBatch)
+        returns an array of int_m_max^150Msun MF - 1.0"""
+        
+        m_max = MFs.Getbounds()[:, -1]
+        alpha = MFs.Getalphas()[:, -1]
+        k = MFs.Getks()[:, -1]
+        
+        with np.errstate( divide = "ignore", invalid = "ignore" ):
+            return np.where( alpha == 1.0, k * ( np.log( 150.0 ) - np.log( m_max ) ), k / ( 1.0 - alpha ) * ( np.power( 150.0, 1.0 - alpha ) - np.power( m_max, 1.0 - alpha ) ) ) - 1.0
+    
+    
+    def ComputeMFs( self, Minis, ZHs = None, m_max = None ):
+        """computes the mass functions for many initial masses at once, see cIMFGenerator.ComputeMF
+        Minis: an array of initial masses of the clusters [Msun]
+        ZHs: the metallicities [Z/H] of the clusters (default: the metallicities of the generator)
+        m_max: an array of first guesses of the most massive stars (default and for NaN guesses: the approximation by Pflamm-Altenburg et al. 2007)
+        returns the mass functions as a cMassFunctionBatch
+        m_max is improved for all clusters in lock-step, clusters that converged are not changed anymore, clusters whose Mini is not positive get NaN as m_max"""
+        
+        Minis = np.array( Minis, dtype = float, ndmin = 1 )
+        
+        self.__MFCalls += len( Minis )
+        
+        alphas = self.ComputeAlphas( Minis, ZHs )
+        
+        m_max, Converged, self.__LastMFIterations = self.__SolveUpperEnds( Minis, alphas, None if m_max is None else np.array( m_max, dtype = float, ndmin = 1 ) )
+        
+        if not np.all( Converged | ~( Minis > 0.0 ) ):
+            warnings.warn( "cIMFGeneratorBatch: ComputeMFs: Newton-Raphson did not converge!" )
+        
+        return cMassFunctionBatch( Minis, np.column_stack( ( np.full( m_max.shape, 0.08 ), np.full( m_max.shape, 0.5 ), np.ones( m_max.shape ), m_max ) ), alphas )
+    
+    
+    def __UpperEnds( self, Minis, m_max, alphas ):
+        """computes CheckUpperEnd and its derivative for many clusters at once, see cIMFGenerator.__UpperEnd
+        Minis: an array of initial masses of the clusters [Msun]
+        m_max: an array of the most massive stars
+        alphas: an array with one row of alphas per cluster
+        returns the arrays int_m_max^150Msun MF - 1.0 and its derivative"""
+        
+        #int_low^high m^-beta dm
+        PowInt = lambda low, high, beta: np.where( 1.0 == beta, np.log( high ) - np.log( low ), ( np.power( high, 1.0 - beta ) - np.power( low, 1.0 - beta ) ) / ( 1.0 - beta ) )
+        
+        with np.errstate( divide = "ignore", invalid = "ignore" ):
+            c3 = pow( 0.5, -alphas[:, 0] ) / pow( 0.5, -alphas[:, 1] )
+            
+            #the mass below 1 Msun and within the last segment (both without k)
+            S = PowInt( 0.08, 0.5, alphas[:, 0] - 1.0 ) + c3 * PowInt( 0.5, 1.0, alphas[:, 1] - 1.0 )
+            I = PowInt( 1.0, m_max, alphas[:, 2] - 1.0 )
+            
+            Denominator = S + c3 * I
+            
+            k = ( Minis - m_max ) / Denominator
+            Dk = ( -Denominator - ( Minis - m_max ) * c3 * np.power( m_max, 1.0 - alphas[:, 2] ) ) / ( Denominator * Denominator )
+            
+            #the number of stars above m_max (without k)
+            N = PowInt( m_max, 150.0, alphas[:, 2] )
+            
+            return c3 * k * N - 1.0, c3 * ( Dk * N - k * np.power( m_max, -alphas[:, 2] ) )
+    
+    
+    def __SolveUpperEnds( self, Minis, alphas, m_max = None ):
+        """finds m_max for many clusters at once, so that there is exactly one star above m_max, see cIMFGenerator.ComputeMF
+        Minis: an array of initial masses of the clusters [Msun]
+        alphas: an array with one row of alphas per cluster
+        m_max: an array of first guesses (default and for NaN guesses: the approximation by Pflamm-Altenburg et al. 2007)
+        returns the array of m_max, for every cluster whether it converged and the number of steps it needed
+        Newton-Raphson steps with the analytic derivative are used as long as they stay within a bracket of the root, otherwise the bracket is bisected.
+        Clusters whose Mini is not positive are not solved for, their m_max is NaN."""
+        
+        Invalid = ~( Minis > 0.0 )
+        
+        with np.errstate( divide = "ignore", invalid = "ignore" ):
+            logMini = np.log10( Minis )
+            
+            #PflammAltenburg (2007) approximation
+            Approximation = np.power( 10.0, 2.56 * logMini * np.power( pow( 3.82, 9.17 ) + np.power( logMini, 9.17 ), -1.0/9.17 ) - 0.38 )
+        
+        m_max = Approximation if m_max is None else np.where( np.isnan( m_max ), Approximation, m_max )
+        
+        epsilon = 1e-6      #allowed error
+        
+        #the number of stars above m_max decreases with m_max, the root lies between the last boundary and 150 Msun (or Mini)
+        Low = np.ones( Minis.shape )
+        High = np.minimum( 150.0, Minis )
+        
+        m_max = np.where( ( Low < m_max ) & ( m_max < High ), m_max, 0.5 * ( Low + High ) )
+        
+        Converged = np.full( Minis.shape, False )
+        Iterations = np.zeros( Minis.shape, dtype = int )
+        
+        self.__MFSolves += len( Minis )
+        
+        for i in range( 100 ):
+            Active = np.flatnonzero( ~( Converged | Invalid ) )
+            
+            if 0 == len( Active ):
+                break
+            
+            self.__MFIterations += len( Active )
+            Iterations[ Active ] += 1
+            
+            Delta, Derivative = self.__UpperEnds( Minis[ Active ], m_max[ Active ], alphas[ Active ] )
+            
+            Converged[ Active ] = np.abs( Delta ) < epsilon
+            
+            #shrink the bracket
+            Low[ Active ] = np.where( Delta > 0.0, m_max[ Active ], Low[ Active ] )
+            High[ Active ] = np.where( Delta < 0.0, m_max[ Active ], High[ Active ] )
+            
+            with np.errstate( divide = "ignore", invalid = "ignore" ):
+                Newton = m_max[ Active ] - Delta / Derivative
+            
+            Inside = ( Low[ Active ] < Newton ) & ( Newton < High[ Active ] )
+            
+            m_max[ Active ] = np.where( Converged[ Active ], m_max[ Active ], np.where( Inside, Newton, 0.5 * ( Low[ Active ] + High[ Active ] ) ) )
+        
+        return np.where( Invalid, float( "NaN" ), m_max ), Converged, Iterations
+    
+    
+    def GetMFCalls( self ):
+        """returns the number of mass functions requested from ComputeMFs so far"""
+        
+        return self.__MFCalls
+    
+    
+    def GetMFSolves( self ):
+        """returns the number of m_max solved for so far"""
+        
+        return self.__MFSolves
+    
+    
+    def GetMFIterations( self ):
+        """returns the total number of iterations needed to solve for m_max so far"""
+        
+        return self.__MFIterations
+    
+    
+    def __HelperComputeMFsFromToday( self, Ms, Ages, Rapos, Rperis, SFEs, Minis, Indices, m_max ):
+        """computes the errors of the initial masses of many clusters at once, see cIMFGenerator.__HelperComputeMFFromToday
+        Ms, Ages, Rapos, Rperis, SFEs: arrays of the properties of the clusters given in Indices
+        Minis: the guesses of the initial masses
+        Indices: the clusters (of the remnant calculator batch) the values belong to
+        m_max: the first guesses of the most massive stars for ComputeMFs (NaN for no guess)
+        returns the errors resulting from the given initial masses and the m_max of their mass functions"""
+        
+        e = ( Rapos - Rperis ) / ( Rapos + Rperis )
+        
+        Factor = Rapos * ( 1.0 - e )
+        
+        IMFs = self.ComputeMFs( Minis, self.__ZH[ Indices ], m_max )
+        
+        self.__ClusterMFIterations[ Indices ] += self.__LastMFIterations
+        
+        N = IMFs.GetTotNumbers()
+        
+        beta, x = self.ComputeBetasAndXs( Minis, Rperis, SFEs )
+        
+        p_SF = self.__RemCalcs.GetMfinFromMassFuncts( IMFs, 1.0, Indices ) / IMFs.GetMtot()
+        
+        return beta * np.power( N / np.log( self.__gamma * N ), x ) * Factor * ( 1.0 - Ms / ( p_SF * Minis )) / ( Ages * 1000.0 ) - 1.0, IMFs.Getbounds()[:, -1]
+    
+    
+    def ComputeIMFsFromToday( self, Ms, Ages, Rapos, Rperis, SFEs ):
+        """computes the initial mass functions of many clusters at once, see cIMFGenerator.ComputeIMFFromToday
+        Ms: current masses of the GCs
+        Ages: the current ages of the GCs [Gyr]
+        Rapos: the apocentres of the GCs [kpc]
+        Rperis: the pericentres of the GCs [kpc]
+        SFEs: the star formation efficiencies of the GCs
+        returns the mass functions (cMassFunctionBatch) and for every GC whether Mini and m_max converged (see GetSolverDiagnostics)
+        The GCs are the ones of the remnant calculator of the generator. All initial masses are improved in lock-step, GCs that converged (or failed) are not computed anymore."""
+        
+        Ms, Ages, Rapos, Rperis, SFEs = [ np.array( Elem, dtype = float, ndmin = 1 ) for Elem in [ Ms, Ages, Rapos, Rperis, SFEs ] ]
+        
+        #initial guess
+        Minis = 2.0 * Ms
+        
+        #allowed error
+        epsilon = 1e-6
+        
+        #step width
+        dM = 1e3
+        
+        #the errors of masses that are not positive are NaN, such masses are not computed
+        Converged = np.full( Minis.shape, False )
+        Failed = ~np.isfinite( Minis ) | ( Minis <= 0.0 )
+        
+        #the diagnostics of every GC, the steps of the m_max solver are added up by the helper
+        MiniIterations = np.zeros( Minis.shape, dtype = int )
+        MiniResiduals = np.full( Minis.shape, float( "NaN" ) )
+        self.__ClusterMFIterations = np.zeros( Minis.shape, dtype = int )
+        
+        #the m_max of the last mass functions are the first guesses for the next ones
+        m_max = np.full( Minis.shape, float( "NaN" ) )
+        
+        Helper = lambda Indices, Minis: self.__HelperComputeMFsFromToday( Ms[ Indices ], Ages[ Indices ], Rapos[ Indices ], Rperis[ Indices ], SFEs[ Indices ], Minis, Indices, m_max[ Indices ] )
+        
+        #iteratively compute Mini
+        with np.errstate( divide = "ignore", invalid = "ignore" ):
+            for i in range( 100 ):
+                Active = np.flatnonzero( ~( Converged | Failed ) )
+                
+                if 0 == len( Active ):
+                    break
+                
+                Errors, m_max[ Active ] = Helper( Active, Minis[ Active ] )
+                
+                MiniIterations[ Active ] += 1
+                MiniResiduals[ Active ] = Errors
+                
+                Converged[ Active ] = np.abs( Errors ) < epsilon
+                
+                Steps = ~Converged[ Active ]
+                Active = Active[ Steps ]
+                
+                Derrs = 0.5 * ( Helper( Active, Minis[ Active ] + dM )[0] - Helper( Active, Minis[ Active ] - dM )[0] ) / dM
+                
+                Next = Minis[ Active ] - Errors[ Steps ] / Derrs
+                
+                #clusters for which Mini can no longer be computed are given up and keep their last Mini
+                Failed[ Active ] = ~np.isfinite( Next ) | ( Next <= 0.0 )
+                Minis[ Active ] = np.where( Failed[ Active ], Minis[ Active ], Next )
+            
+            MFs = self.ComputeMFs( Minis, self.__ZH, m_max )
+            
+            self.__ClusterMFIterations += self.__LastMFIterations
+            
+            MFResiduals = self.CheckUpperEnds( MFs )
+        
+        Converged &= np.abs( MFResiduals ) < epsilon
+        
+        self.__Diagnostics = { "MiniIterations": MiniIterations, "MFIterations": self.__ClusterMFIterations, "MiniResidual": MiniResiduals, "MFResidual": MFResiduals, "IMFConverged": Converged }
+        
+        if not np.all( Converged ):
+            warnings.warn( "Warning: cIMFGeneratorBatch: ComputeIMFsFromToday: Mini did not converge for " + str( np.sum( ~Converged ) ) + " GCs!" )
+        
+        return MFs, Converged
+    
+    
+    def GetSolverDiagnostics( self ):
+        """returns the diagnostics of the last call of ComputeIMFsFromToday as a lib of arrays with one value per GC, None before the first call, see cIMFGenerator.GetSolverDiagnostics"""
+        
+        return self.__Diagnostics
@@ -0,0 +1,150 @@
+#general libs
+import json
+import math
+import time
+from contextlib import contextmanager
+
+
+class cInstrumentation():
+    """records the wall time of the processing stages, the time every cluster took within the stages that handle one cluster after the other and counters of the hot paths
+    Stages and counters are summed over all recordings, the cluster times are kept in the order the clusters were processed."""
+    
+    def __init__( self ):
+        """Constructor, starts without any recordings"""
+        
+        self.__StageTimes = {}
+        self.__Counters = {}
+        
+        #the names of the clusters and for every stage the time of every cluster (NaN if the stage did not time the cluster)
+        self.__Names = []
+        self.__ClusterTimes = {}
+    
+    
+    @contextmanager
+    def Time( self, Stage ):
+        """times the code within the with-block and adds the time to a stage
+        Stage: the name of the stage"""
+        
+        Start = time.perf_counter()
+        
+        try:
+            yield
+        finally:
+            self.AddStageTime( Stage, time.perf_counter() - Start )
+    
+    
+    def AddStageTime( self, Stage, Time ):
+        """adds time to a stage
+        Stage: the name of the stage
+        Time: the wall time [s]"""
+        
+        self.__StageTimes[ Stage ] = self.__StageTimes.get( Stage, 0.0 ) + Time
+    
+    
+    def Count( self, Counter, Number = 1 ):
+        """increases a counter
+        Counter: the name of the counter
+        Number: the number to add"""
+        
+        self.__Counters[ Counter ] = self.__Counters.get( Counter, 0 ) + Number
+    
+    
+    def MapClusters( self, Stage, Function, NClusters ):
+        """calls a function for every cluster and records the time of every call
+        Stage: the name of the stage the cluster times belong to
+        Function: the function computing a cluster, called with the index of the cluster
+        NClusters: the number of clusters
+        returns the list of the results of the function
+        The times are recorded for the clusters added next by AddClusters."""
+        
+        Results = []
+        Times = []
+        
+        for nCluster in range( NClusters ):
+            Start = time.perf_counter()
+            Results.append( Function( nCluster ) )
+            Times.append( time.perf_counter() - Start )
+        
+        #stages timed for the first time have no times for the clusters before
+        if not Stage in self.__ClusterTimes:
+            self.__ClusterTimes[ Stage ] = [ float( "NaN" ) ] * len( self.__Names )
+        
+        self.__ClusterTimes[ Stage ] += Times
+        
+        return Results
+    
+    
+    def AddClusters( self, Names ):
+        """adds the clusters whose times were recorded by MapClusters since the last call, stages that did not time them get NaN
+        Names: the names of the clusters"""
+        
+        self.__Names += [ str( Name ) for Name in Names ]
+        
+        for Times in self.__ClusterTimes.values():
+            Times += [ float( "NaN" ) ] * ( len( self.__Names ) - len( Times ) )
+    
+    
+    def GetStageTimes( self ):
+        """returns a lib with the wall time of every stage [s]"""
+        
+        return dict( self.__StageTimes )
+    
+    
+    def GetCounters( self ):
+        """returns a lib with the number of every counter"""
+        
+        return dict( self.__Counters )
+    
+    
+    def GetClusterTimes( self, Stage ):
+        """returns the time every cluster took within a stage [s], NaN for clusters the stage did not time
+        Stage: the name of the stage"""
+        
+        return list( self.__ClusterTimes.get( Stage, [ float( "NaN" ) ] * len( self.__Names ) ) )
+    
+    
+    def GetClusterNames( self ):
+        """returns the names of the clusters in the order they were added"""
+        
+        return list( self.__Names )
+    
+    
+    def GetReport( self ):
+        """returns all recordings as a lib that can be written as JSON, NaN becomes None"""
+        
+        Clusters = { "Name": list( self.__Names ) }
+        
+        for Stage, Times in self.__ClusterTimes.items():
+            Clusters[ Stage ] = [ None if math.isnan( Time ) else Time for Time in Times ]
+        
+        return { "stages": self.GetStageTimes(), "counters": self.GetCounters(), "clusters": Clusters }
+    
+    
+    def Merge( self, Report ):
+        """adds the recordings of another instrumentation, e.g. from a worker process
+        Report: the report of the other instrumentation (see GetReport)"""
+        
+        for Stage, Time in Report["stages"].items():
+            self.AddStageTime( Stage, Time )
+        
+        for Counter, Number in Report["counters"].items():
+            self.Count( Counter, Number )
+        
+        for Stage, Times in Report["clusters"].items():
+            if "Name" == Stage:
+                continue
+            
+            if not Stage in self.__ClusterTimes:
+                self.__ClusterTimes[ Stage ] = [ float( "NaN" ) ] * len( self.__Names )
+            
+            self.__ClusterTimes[ Stage ] += [ float( "NaN" ) if Time is None else Time for Time in Times ]
+        
+        self.AddClusters( Report["clusters"]["Name"] )
+    
+    
+    def WriteReport( self, FileName ):
+        """writes the report (see GetReport) into a JSON file
+        FileName: the name of the file"""
+        
+        with open( FileName, "w" ) as File:
+            json.dump( self.GetReport(), File, indent = 1 )
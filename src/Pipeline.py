@@ -0,0 +1,23 @@
+#own modules
+from src.Data import cData
+from src.DataProcessor import cDataProcessor
+
+
+def Run( GCData, SNData, EjectaData = None, RemnantData = None, Workers = 1, SNSolver = "walk", CacheSize = 32, IMFSolver = "cluster" ):
+    """processes GCs given as tables in memory without reading or writing any files
+    GCData: the properties of the GCs, a pandas sheet or a lib of columns (lists, tuples or arrays)
+    SNData: the table of which stars explode in SNe (see cData.FromTables), or a cData whose star tables are used for the GCs
+    EjectaData: the table of the iron ejecta (see cData.FromTables), not used if SNData is a cData
+    RemnantData: the table of the life times and remnant masses (see cData.FromTables), not used if SNData is a cData
+    Workers: the number of processes the GCs are split across
+    SNSolver, CacheSize, IMFSolver: the settings of the processing (see cDataProcessor)
+    returns a lib of arrays with one row per GC holding the GC properties and the results (see cData.GetGCArrays)"""
+    
+    if isinstance( SNData, cData ):
+        data = SNData.WithGCData( GCData )
+    else:
+        data = cData.FromTables( GCData, SNData, EjectaData, RemnantData )
+    
+    cDataProcessor( SNSolver, CacheSize, IMFSolver ).ProcessData( data, Workers )
+    
+    return data.GetGCArrays()
@@ -2,7 +2,8 @@
 import numpy as np
 
 #own modules
-from src.common import IsNumber, LinInterExtrapolate
+from src.common import LinInterExtrapolate, LinInterExtrapolateSortedList
+from src.RemnantGrid import cRemnantGrid
 
 
 class cRemnantCalculator():
@@ -10,70 +11,27 @@ class cRemnantCalculator():
     
     def __init__( self, data, ZH ):
         """Constructor
-        data: a lib containing initial masses, development times and remnant masses for stars, the masses are expected to be given in accending order
+        data: the remnant grid (cRemnantGrid) or a lib containing initial masses, development times and remnant masses for stars, the masses are expected to be given in accending order
         ZH: the metallicity for which the remnant cRemnantCalculator shall be used"""
         
         self.__ZH = ZH
         
-        #copy the initial masses of the stars
-        self.__Mstar = data["mass[Msun]"]
-        self.__t = self.__FindValues( data, ZH, "t_" )
-        self.__Mfin = self.__FindValues( data, ZH, "Mfin_" )
-    
+        if not isinstance( data, cRemnantGrid ):
+            data = cRemnantGrid( data )
+        
+        #copy the initial masses of the stars and the values interpolated to the metallicity
+        self.__Mstar = data.GetMasses().tolist()
+        self.__t = data.GetColumn( ZH, "t_" ).tolist()
+        self.__Mfin = data.GetColumn( ZH, "Mfin_" ).tolist()
+        
+        #arrays of the same values for vectorized computations
+        self.__MstarArray = data.GetMasses()
+        self.__MfinArray = data.GetColumn( ZH, "Mfin_" )
+        
+        #the bins around each star used by GetMfinFromMassFunct and the remnant masses at their centres
+        self.__BinEdges = 0.5 * ( self.__MstarArray[:-1] + self.__MstarArray[1:] )
+        self.__BinMfins = LinInterExtrapolateSortedList( 0.5 * ( self.__BinEdges[:-1] + self.__BinEdges[1:] ), self.__MstarArray, self.__MfinArray ) if len( self.__MstarArray ) > 1 else np.empty( 0 )
     
-    def __FindValues( self, data, ZH, Name ):
-        """finds the closests columns for a Z-value and turns them into one list of values
-        data: a lib containing initial masses, development times and remnant masses for stars
-        ZH: the metallicity for which the remnant cRemnantCalculator shall be used
-        Name: the beginning of the column names before the metallicity data
-        returns a list of interpolated values"""
-        
-        #variable to store the closest columns in
-        Below = { "ColumnName": None, "metal": None }
-        Below2 = { "ColumnName": None, "metal": None }
-        Above = { "ColumnName": None, "metal": None }
-        Above2 = { "ColumnName": None, "metal": None }
-        
-        #find those closest columns
-        lenName = len( Name )
-        
-        for Heading in data:
-            if not ( Heading[:lenName] == Name ):
-                continue
-            if not IsNumber( Heading[lenName:] ):
-                continue
-            
-            ColumnMetal = float( Heading[lenName:] )
-            
-            if ColumnMetal == ZH:
-                return data[ Heading ]   #if it's the same, no interpolation needed
-            elif ColumnMetal < ZH:
-                if None == Below["ColumnName"] or ColumnMetal > Below["metal"]:
-                    Below2 = Below.copy()
-                    Below["ColumnName"] = Heading
-                    Below["metal"] = ColumnMetal
-            elif ColumnMetal > ZH:
-                if None == Above["ColumnName"] or ColumnMetal < Above["metal"]:
-                    Above2 = Above.copy()
-                    Above["ColumnName"] = Heading
-                    Above["metal"] = ColumnMetal
-        
-        #cover special cases (no metal above/below known) e.t.c.
-        if None == Below["ColumnName"]:
-            if None == Above2["ColumnName"]:
-                return data[ Above["ColumnName"] ]
-            else:
-                Below = Above2.copy()   #interpolation and extrapolation can be done in the same way
-                
-        if None == Above["ColumnName"]:
-            if None == Below2["ColumnName"]:
-                return data[ Below["ColumnName"] ]
-            else:
-                Above = Below2.copy()   #interpolation and extrapolation can be done in the same way
-                
-        #make the final list:
-        return [ LinInterExtrapolate( ( pow( 10.0, Below["metal"] ), data[ Below["ColumnName"] ][nElem] ), ( pow( 10.0, Above["metal"] ), data[ Above["ColumnName"] ][nElem] ), pow( 10.0, ZH ) ) for nElem in range( len( self.__Mstar ) ) ]
-
         
     def GetZH( self ):
         return self.__ZH
@@ -215,31 +173,22 @@ class cRemnantCalculator():
             return CurSCMass
         
         #normal cases
-        Start = 0
-        Finnish = -1
+        Start = np.searchsorted( self.__MstarArray, minMass, side = "right" )      #the first star more massive than minMass
+        Finnish = np.searchsorted( self.__MstarArray, maxMass, side = "left" ) - 1  #the last star less massive than maxMass
         
-        for nElem in range( len( self.__Mstar ) ):
-            if minMass < self.__Mstar[ nElem ]:
-                Start = nElem
-                break
-            
-        for nElem in range( len( self.__Mstar ) - 1, -1, -1 ):
-            if maxMass > self.__Mstar[ nElem ]:
-                Finnish = nElem
-                break
+        if Start == len( self.__MstarArray ):
+            Start = 0
         
         if Start == Finnish or Finnish < Start:
             CurSCMass += MassPart( minMass, maxMass ) / MF.GetMtot()
             return CurSCMass
         
-        CompRemnantMass = 0.0       #add the remnant mass separately first (so I only have to do one division at the end)
+        #the bins around each star between minMass and maxMass, only the remnant masses of the outermost bins are not known yet
+        Edges = np.concatenate( ( [ minMass ], self.__BinEdges[ Start:Finnish ], [ maxMass ] ) )
         
-        CompRemnantMass += MassPart( minMass, 0.5 * ( self.__Mstar[ Start ] + self.__Mstar[ Start + 1 ] ) )
+        Mfins = np.concatenate( ( [ self.GetMfinFromMass( 0.5 * ( Edges[0] + Edges[1] ) ) ], self.__BinMfins[ Start:Finnish - 1 ], [ self.GetMfinFromMass( 0.5 * ( Edges[-2] + Edges[-1] ) ) ] ) )
         
-        for nElem in range( Start + 1, Finnish ):
-            CompRemnantMass += MassPart( 0.5 * ( self.__Mstar[ nElem - 1 ] + self.__Mstar[ nElem ] ), 0.5 * ( self.__Mstar[ nElem ] + self.__Mstar[ nElem + 1 ] ) )
-            
-        CompRemnantMass += MassPart( 0.5 * ( self.__Mstar[ Finnish - 1 ] + self.__Mstar[ Finnish ] ), maxMass )
+        CompRemnantMass = np.sum( Mfins * MF.GetMasses( Edges[:-1], Edges[1:] ) )     #add the remnant mass separately first (so I only have to do one division at the end)
         
         CurSCMass += CompRemnantMass / MF.GetMtot()
             
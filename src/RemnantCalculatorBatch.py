@@ -0,0 +1,251 @@
+#general modules
+import math
+import numpy as np
+
+#own modules
+from src.common import LinInterExtrapolateSortedList
+from src.RemnantGrid import cRemnantGrid
+
+
+#the distance between the exponents around which the sums of powers of the bin edges are expanded and the number of terms used
+#An exponent is at most 0.05 away from its node and the bin edges of the star masses (0.08 to 150 Msun) have |ln E| < 5.1, so the
+#series of exp( ( p - p0 ) ln E ) is truncated at x^16 / 16! with |x| < 0.26, a relative error below 1e-22 for every edge.
+_PowerSumNodeDist = 0.1
+_PowerSumTerms = 16
+
+
+class cRemnantCalculatorBatch():
+    """a class that computes the remnant masses and life times for many clusters with different metallicities at once, see cRemnantCalculator"""
+    
+    def __init__( self, data, ZHs, ChunkSize = 1024 ):
+        """Constructor
+        data: the remnant grid (cRemnantGrid) or a lib containing initial masses, development times and remnant masses for stars, the masses are expected to be given in accending order
+        ZHs: the metallicities of the clusters
+        ChunkSize: the maximum number of clusters for which arrays with one value per star of the grid are created at once"""
+        
+        if ChunkSize < 1:
+            raise ValueError( "cRemnantCalculatorBatch: The chunk size needs to be at least 1!" )
+        
+        if not isinstance( data, cRemnantGrid ):
+            data = cRemnantGrid( data )
+        
+        self.__Grid = data
+        self.__ZH = np.array( ZHs, dtype = float, ndmin = 1 )
+        self.__ChunkSize = ChunkSize
+        
+        self.__Mstar = data.GetMasses()
+        
+        #the bins around each star used by GetMfinFromMassFuncts and the remnant masses at the centres of the interior bins for every metallicity column
+        self.__BinEdges = 0.5 * ( self.__Mstar[:-1] + self.__Mstar[1:] )
+        
+        Centres = 0.5 * ( self.__BinEdges[:-1] + self.__BinEdges[1:] )
+        Metals = data.GetMetallicities( "Mfin_" )
+        
+        self.__BinMfins = np.array( [ LinInterExtrapolateSortedList( Centres, self.__Mstar, data.GetColumn( Metal, "Mfin_" ) ) for Metal in Metals ] )
+        self.__MfinWeights = data.GetWeights( self.__ZH, "Mfin_" )
+        
+        #the cumulative sums used by __GetPowerSums, one table per node
+        self.__PowerSumTables = {}
+        
+        #the masses of the stars dying after a given time, they are only computed once per time
+        self.__DeathTime = None
+        self.__DeathMasses = None
+    
+    
+    def GetZH( self ):
+        return self.__ZH.copy()
+    
+    
+    def GetSize( self ):
+        return len( self.__ZH )
+    
+    
+    def GetRemnantGrid( self ):
+        return self.__Grid
+    
+    
+    def __GetIndices( self, Indices ):
+        """returns the indices of the clusters to work on (all clusters if Indices is None)"""
+        
+        if Indices is None:
+            return np.arange( len( self.__ZH ) )
+        
+        return np.asarray( Indices, dtype = int )
+    
+    
+    def GetTimeFromMass( self, masses, Indices = None ):
+        """returns the life-expectancies of stars, one per cluster
+        masses: the masses of the stars [Msun]
+        Indices: the clusters the masses belong to (default: all clusters)
+        returns the life expectancies of the stars [Gyr]"""
+        
+        return self.__Grid.GetLifetimes( masses, self.__ZH[ self.__GetIndices( Indices ) ] )
+    
+    
+    def GetMfinFromMass( self, masses, Indices = None ):
+        """computes the masses of stellar remnants, one per cluster
+        masses: the masses of the stars [Msun]
+        Indices: the clusters the masses belong to (default: all clusters)
+        returns the masses of the stellar remnants [Msun]"""
+        
+        return self.__Grid.GetMfins( masses, self.__ZH[ self.__GetIndices( Indices ) ] )
+    
+    
+    def GetMassFromTime( self, t, Indices = None ):
+        """returns the masses of the stars corresponding to the given life-expectancy for every cluster
+        t: the life-expectancy of the stars [Gyr]
+        Indices: the clusters for which the masses shall be returned (default: all clusters)
+        returns the masses of the stars [Msun]
+        The life times are sorted from the largest to the smallest one, they are searched for the same way cRemnantCalculator does."""
+        
+        if self.__DeathTime != t:
+            logTimeYr = np.log10( t ) + 9.0
+            
+            #only the life times visited by the bisection are computed
+            Times = self.__Grid.GetColumnAccessor( self.__ZH, "t_" )
+            
+            self.__DeathMasses = LinInterExtrapolateSortedList( np.full( len( self.__ZH ), logTimeYr ), Times, self.__Mstar, Descending = True )
+            
+            self.__DeathTime = t
+        
+        return self.__DeathMasses[ self.__GetIndices( Indices ) ]
+    
+    
+    def GetMfinFromMassFuncts( self, MFs, time, Indices = None ):
+        """computes the mass left in every cluster of the given mass functions after a given time, see cRemnantCalculator.GetMfinFromMassFunct
+        MFs: the mass functions describing the clusters [cMassFunctionBatch]
+        time: the time for which the left-over mass shall be computed [Gyr]
+        Indices: the clusters the mass functions belong to (default: all clusters)
+        returns an array with one value per mass function, the same values cRemnantCalculator.GetMfinFromMassFunct returns up to rounding
+        If the extrapolated life times give a mass below the lowest mass of a MF, no mass is counted below it (cMassFunction.GetMass counts the whole MF in that case)."""
+        
+        Indices = self.__GetIndices( Indices )
+        
+        ZHs = self.__ZH[ Indices ]
+        Mtots = MFs.GetMtot()
+        
+        mMins = MFs.Getbounds()[:, 0]
+        
+        #compute the lowest mass of a star to have died
+        minMasses = self.GetMassFromTime( time, Indices )
+        maxMasses = MFs.Getbounds()[:, -1]
+        
+        #compute the current SC mass, the stars below minMass contribute with their entire mass
+        CurSCMasses = MFs.GetMass( mMins, minMasses )
+        
+        #for the other stars only the remnant masses contribute
+        MassPart = lambda LowBounds, HighBounds, ZHs, MFs: self.__Grid.GetMfins( 0.5 * ( LowBounds + HighBounds ), ZHs ) * MFs.GetMass( LowBounds, HighBounds )
+        
+        Start = np.searchsorted( self.__Mstar, minMasses, side = "right" )      #the first star more massive than minMass
+        Finnish = np.searchsorted( self.__Mstar, maxMasses, side = "left" ) - 1  #the last star less massive than maxMass
+        
+        Start = np.where( Start == len( self.__Mstar ), 0, Start )
+        
+        #boundary cases and clusters with at most one star of the grid between minMass and maxMass use a single bin
+        Single = ( minMasses > self.__Mstar[-1] ) | ( maxMasses < self.__Mstar[0] ) | ( Finnish <= Start )
+        
+        RemnantMasses = np.where( Single, MassPart( minMasses, maxMasses, ZHs, MFs ), 0.0 )
+        
+        Normal = np.flatnonzero( ~Single )
+        
+        if len( Normal ) > 0:
+            NormalMFs = MFs.GetSubset( Normal )
+            
+            #the bins around the stars between minMass and maxMass use the edges First to Last, the outermost bins end at minMass and maxMass
+            First = Start[ Normal ]
+            Last = Finnish[ Normal ] - 1
+            
+            LowBins = MassPart( minMasses[ Normal ], self.__BinEdges[ First ], ZHs[ Normal ], NormalMFs )
+            HighBins = MassPart( self.__BinEdges[ Last ], maxMasses[ Normal ], ZHs[ Normal ], NormalMFs )
+            
+            RemnantMasses[ Normal ] = LowBins + self.__GetInteriorRemnantMasses( NormalMFs, First, Last, self.__MfinWeights[ Indices[ Normal ] ] ) + HighBins
+        
+        CurSCMasses += RemnantMasses / Mtots
+        
+        #clusters in which no star died yet keep their mass
+        return np.where( minMasses > maxMasses, Mtots, CurSCMasses )
+    
+    
+    def __GetInteriorRemnantMasses( self, MFs, First, Last, Weights ):
+        """computes the remnant masses of the bins between the bin edges First and Last for every cluster
+        MFs: the mass functions of the clusters [cMassFunctionBatch]
+        First, Last: the indices of the first and last bin edge of every cluster
+        Weights: the weights of the remnant mass columns of every cluster (see cRemnantGrid.GetWeights)
+        returns the remnant mass of every cluster
+        If all edges are within the last segment of a MF, the mass below an edge E is a constant plus k/p E^p, the sum over the bins is then done with GetPowerSums. Otherwise the mass below every edge of the grid is computed."""
+        
+        Interior = np.zeros( len( First ) )
+        
+        bounds = MFs.Getbounds()
+        Exponents = 2.0 - MFs.Getalphas()[:, -1]
+        
+        Fast = ( self.__BinEdges[ First ] >= bounds[:, -2] ) & ( 0.0 != Exponents ) & ( Last > First )
+        
+        #sum_{j=First}^{Last-1} Mfin_j ( E_{j+1}^p - E_j^p ) = Mfin_{Last-1} E_Last^p - Mfin_First E_First^p - sum_{j=First+1}^{Last-1} ( Mfin_j - Mfin_{j-1} ) E_j^p
+        Index = np.flatnonzero( Fast )
+        
+        if len( Index ) > 0:
+            p = Exponents[ Index ]
+            F = First[ Index ]
+            L = Last[ Index ]
+            
+            Sums = self.__BinMfins[:, L - 1].T * np.power( self.__BinEdges[ L ], p )[:, np.newaxis] - self.__BinMfins[:, F].T * np.power( self.__BinEdges[ F ], p )[:, np.newaxis] - ( self.__GetPowerSums( p, L ) - self.__GetPowerSums( p, F + 1 ) )
+            
+            Interior[ Index ] = MFs.Getks()[ Index, -1 ] / p * np.sum( Sums * Weights[ Index ], axis = 1 )
+        
+        #all other clusters use the mass below every edge of the grid, this needs one row per cluster and is done in chunks
+        Index = np.flatnonzero( ~Fast )
+        
+        for Start in range( 0, len( Index ), self.__ChunkSize ):
+            Chunk = Index[ Start:Start + self.__ChunkSize ]
+            Rows = np.arange( len( Chunk ) )
+            
+            Below = MFs.GetSubset( Chunk ).ComputeCumulativeIntegral( self.__BinEdges, 1 )
+            
+            #truncating the (increasing) mass below the edges to the edges First and Last removes all other bins
+            np.clip( Below, Below[ Rows, First[ Chunk ] ][:, np.newaxis], Below[ Rows, Last[ Chunk ] ][:, np.newaxis], out = Below )
+            
+            Interior[ Chunk ] = np.sum( ( np.diff( Below, axis = 1 ) @ self.__BinMfins.T ) * Weights[ Chunk ], axis = 1 )
+        
+        return Interior
+    
+    
+    def __GetPowerSums( self, p, Number ):
+        """computes sum_{j<Number} ( Mfin_j - Mfin_{j-1} ) E_j^p for every remnant mass column, E_j being the bin edges
+        p: the exponents, one per cluster
+        Number: the number of edges to sum over, one per cluster
+        returns an array with one row per cluster and one column per remnant mass column
+        E_j^p is expanded into a Taylor series around the closest node of a grid of exponents, the cumulative sums of the coefficients are computed once per node."""
+        
+        Nodes = np.round( p / _PowerSumNodeDist ).astype( int )
+        
+        Sums = np.empty( ( len( p ), len( self.__BinMfins ) ) )
+        
+        for Node in np.unique( Nodes ):
+            if not Node in self.__PowerSumTables:
+                self.__PowerSumTables[ Node ] = self.__MakePowerSumTable( Node * _PowerSumNodeDist )
+            
+            Index = np.flatnonzero( Nodes == Node )
+            
+            #the Taylor series in the distance to the node
+            Powers = np.cumprod( np.column_stack( ( np.ones( len( Index ) ), np.repeat( ( p[ Index ] - Node * _PowerSumNodeDist )[:, np.newaxis], _PowerSumTerms - 1, axis = 1 ) ) ), axis = 1 )
+            
+            Sums[ Index ] = np.einsum( "ctn,nt->nc", self.__PowerSumTables[ Node ][:, :, Number[ Index ]], Powers )
+        
+        return Sums
+    
+    
+    def __MakePowerSumTable( self, p0 ):
+        """computes the cumulative sums of the Taylor coefficients of ( Mfin_j - Mfin_{j-1} ) E_j^p around p0
+        p0: the exponent around which the series is expanded
+        returns an array with the index of the remnant mass column, of the term and of the number of edges summed over"""
+        
+        logEdges = np.log( self.__BinEdges[:-1] )
+        
+        #the differences of the remnant masses of neighbouring bins (the first edge has no bin below)
+        Diffs = np.diff( self.__BinMfins, axis = 1, prepend = 0.0 ) * np.exp( p0 * logEdges )
+        Diffs[:, 0] = 0.0
+        
+        Terms = np.array( [ Diffs * np.power( logEdges, nTerm ) / math.factorial( nTerm ) for nTerm in range( _PowerSumTerms ) ] )
+        
+        return np.concatenate( ( np.zeros( Terms.shape[:2] + ( 1, ) ), np.cumsum( Terms, axis = 2 ) ), axis = 2 ).transpose( 1, 0, 2 )
@@ -0,0 +1,70 @@
+#general modules
+from collections import OrderedDict
+
+#own modules
+from src.RemnantCalculator import cRemnantCalculator
+
+
+class cRemnantCalculatorCache():
+    """a cache holding one remnant calculator per metallicity, if the cache is full the least recently used calculator is removed"""
+    
+    def __init__( self, data, MaxSize = 32 ):
+        """Constructor
+        data: the data (cData) providing the remnant grid
+        MaxSize: the maximum number of remnant calculators to keep"""
+        
+        if MaxSize < 1:
+            raise ValueError( "cRemnantCalculatorCache: The cache size needs to be at least 1!" )
+        
+        self.__data = data
+        self.__MaxSize = MaxSize
+        
+        self.__Calculators = OrderedDict()
+        self.__Hits = 0
+        self.__Misses = 0
+    
+    
+    def GetRemnantCalculator( self, ZH ):
+        """returns the remnant calculator for the given metallicity, it is only created if it is not in the cache yet
+        ZH: the metallicity [Z/H]"""
+        
+        if ZH in self.__Calculators:
+            self.__Hits += 1
+            self.__Calculators.move_to_end( ZH )
+            
+            return self.__Calculators[ ZH ]
+        
+        self.__Misses += 1
+        
+        RemCalc = cRemnantCalculator( self.__data.GetRemnantGrid(), ZH )
+        
+        self.__Calculators[ ZH ] = RemCalc
+        
+        if len( self.__Calculators ) > self.__MaxSize:
+            self.__Calculators.popitem( last = False )
+        
+        return RemCalc
+    
+    
+    def GetHits( self ):
+        return self.__Hits
+    
+    
+    def GetMisses( self ):
+        return self.__Misses
+    
+    
+    def GetSize( self ):
+        return len( self.__Calculators )
+    
+    
+    def GetMaxSize( self ):
+        return self.__MaxSize
+    
+    
+    def Clear( self ):
+        """removes all remnant calculators from the cache and resets the counters"""
+        
+        self.__Calculators.clear()
+        self.__Hits = 0
+        self.__Misses = 0
@@ -0,0 +1,242 @@
+#general modules
+import numpy as np
+
+#own modules
+from src.common import IsNumber, BisectSortedList
+
+
+class cRemnantGrid():
+    """a class holding the life times and remnant masses of stars on a grid of initial masses and metallicities"""
+    
+    def __init__( self, data ):
+        """Constructor
+        data: a lib containing initial masses, development times and remnant masses for stars, the masses are expected to be given in accending order
+        the development times and remnant masses are expected in columns named 't_x' and 'Mfin_x' with x being the metallicity [Z/H]"""
+        
+        self.__Mstar = np.asarray( data["mass[Msun]"], dtype = float )
+        
+        self.__Metals = {}
+        self.__Values = {}
+        
+        for Name in [ "t_", "Mfin_" ]:
+            self.__Metals[ Name ], self.__Values[ Name ] = self.__MakeGrid( data, Name )
+    
+    
+    @staticmethod
+    def FromTables( Tables ):
+        """creates a grid from the arrays returned by GetTables without copying them
+        Tables: a lib of the arrays of a grid (see GetTables)"""
+        
+        Grid = cRemnantGrid.__new__( cRemnantGrid )
+        
+        Grid.__Mstar = Tables["Mstar"]
+        Grid.__Metals = { Name: Tables[ "Metals" + Name ] for Name in [ "t_", "Mfin_" ] }
+        Grid.__Values = { Name: Tables[ "Values" + Name ] for Name in [ "t_", "Mfin_" ] }
+        
+        return Grid
+    
+    
+    def GetTables( self ):
+        """returns all arrays of the grid as a lib, see FromTables"""
+        
+        Tables = { "Mstar": self.__Mstar }
+        
+        for Name in [ "t_", "Mfin_" ]:
+            Tables[ "Metals" + Name ] = self.__Metals[ Name ]
+            Tables[ "Values" + Name ] = self.__Values[ Name ]
+        
+        return Tables
+    
+    
+    def __MakeGrid( self, data, Name ):
+        """collects all columns starting with the given name into one matrix sorted by metallicity
+        data: a lib containing initial masses, development times and remnant masses for stars
+        Name: the beginning of the column names before the metallicity data
+        returns the sorted metallicities and a matrix with one row per metallicity"""
+        
+        lenName = len( Name )
+        
+        Metals = []
+        Columns = []
+        
+        for Heading in data:
+            if not ( Heading[:lenName] == Name ):
+                continue
+            if not IsNumber( Heading[lenName:] ):
+                continue
+            
+            Metals.append( float( Heading[lenName:] ) )
+            Columns.append( np.asarray( data[ Heading ], dtype = float ) )
+        
+        if 0 == len( Metals ):
+            return np.empty( 0 ), np.empty( ( 0, len( self.__Mstar ) ) )
+        
+        Order = np.argsort( Metals, kind = "stable" )
+        
+        return np.array( Metals )[ Order ], np.array( Columns )[ Order ]
+    
+    
+    def GetMasses( self ):
+        return self.__Mstar.copy()
+    
+    
+    def GetMetallicities( self, Name ):
+        """returns the sorted metallicities for which columns are known
+        Name: the beginning of the column names ('t_' or 'Mfin_')"""
+        
+        return self.__Metals[ Name ].copy()
+    
+    
+    def __FindColumns( self, ZH, Name ):
+        """finds the columns and the weights needed to get the values for the given metallicities
+        ZH: the metallicities [Z/H], a single value or an array
+        Name: the beginning of the column names ('t_' or 'Mfin_')
+        returns the indices of the first and second column, the numerator and denominator of the weight of the second column and whether only the first column is used
+        Metallicities between two columns are interpolated linearly in 10^[Z/H]. Above the highest metallicity the two highest columns are extrapolated, below the lowest metallicity the lowest column is used."""
+        
+        Metals = self.__Metals[ Name ]
+        ZHs = np.asarray( ZH, dtype = float )
+        
+        if 1 == len( Metals ):
+            Zeros = np.zeros( ZHs.shape, dtype = int )
+            return Zeros, Zeros, np.zeros( ZHs.shape ), np.ones( ZHs.shape ), np.full( ZHs.shape, True )
+        
+        #the two columns closest to the metallicity
+        Above = np.clip( np.searchsorted( Metals, ZHs, side = "left" ), 1, len( Metals ) - 1 )
+        Below = Above - 1
+        
+        #extrapolation beyond the highest metallicity is done from the highest column
+        OutsideAbove = ZHs > Metals[-1]
+        
+        First = np.where( OutsideAbove, Above, Below )
+        Second = np.where( OutsideAbove, Below, Above )
+        
+        #metallicities in the grid need no interpolation, below the grid the lowest column is used
+        First = np.where( ZHs == Metals[ Second ], Second, First )
+        First = np.where( ZHs < Metals[0], 0, First )
+        
+        OnlyFirst = ( ZHs == Metals[ First ] ) | ( ZHs < Metals[0] )
+        
+        X1 = self.__PowTen( Metals[ First ] )
+        X2 = self.__PowTen( Metals[ Second ] )
+        
+        return First, Second, self.__PowTen( ZHs ) - X1, X2 - X1, OnlyFirst
+    
+    
+    def __PowTen( self, Exponents ):
+        """computes 10^x using the same (python) power function as the scalar computations, so that the results are identical
+        Exponents: an array of exponents"""
+        
+        Unique, Inverse = np.unique( Exponents, return_inverse = True )
+        
+        return np.array( [ pow( 10.0, Exponent ) for Exponent in Unique ] )[ Inverse ].reshape( Exponents.shape )
+    
+    
+    def GetColumn( self, ZH, Name ):
+        """returns the values of all masses for the given metallicity
+        ZH: the metallicity [Z/H], a single value or an array of metallicities
+        Name: the beginning of the column names ('t_' or 'Mfin_')
+        returns an array with one value per mass (one row per metallicity if an array of metallicities was given)"""
+        
+        First, Second, Numerator, Denominator, OnlyFirst = self.__FindColumns( ZH, Name )
+        
+        Y1 = self.__Values[ Name ][ First ]
+        Y2 = self.__Values[ Name ][ Second ]
+        
+        with np.errstate( divide = "ignore", invalid = "ignore" ):
+            return np.where( OnlyFirst[..., np.newaxis], Y1, ( Y2 - Y1 ) * Numerator[..., np.newaxis] / Denominator[..., np.newaxis] + Y1 )
+    
+    
+    def GetColumnAccessor( self, ZH, Name ):
+        """returns a function giving the values of the columns for the given metallicities at given mass indices, so that whole columns do not need to be computed
+        ZH: the metallicities [Z/H], an array
+        Name: the beginning of the column names ('t_' or 'Mfin_')
+        the function takes one mass index per metallicity (or a single index for all of them) and returns the same values as GetColumn"""
+        
+        First, Second, Numerator, Denominator, OnlyFirst = self.__FindColumns( ZH, Name )
+        
+        Values = self.__Values[ Name ]
+        
+        def Accessor( Index ):
+            """the values of the interpolated columns at the given mass indices"""
+            
+            with np.errstate( divide = "ignore", invalid = "ignore" ):
+                return np.where( OnlyFirst, Values[ First, Index ], ( Values[ Second, Index ] - Values[ First, Index ] ) * Numerator / Denominator + Values[ First, Index ] )
+        
+        return Accessor
+    
+    
+    def GetWeights( self, ZH, Name ):
+        """returns the weights of the columns used for the given metallicities
+        ZH: the metallicities [Z/H], a single value or an array
+        Name: the beginning of the column names ('t_' or 'Mfin_')
+        returns an array with one weight per column (one row per metallicity if an array was given), the weighted sum of the columns equals GetColumn up to rounding"""
+        
+        First, Second, Numerator, Denominator, OnlyFirst = self.__FindColumns( ZH, Name )
+        
+        with np.errstate( divide = "ignore", invalid = "ignore" ):
+            Ratio = np.where( OnlyFirst, 0.0, Numerator / Denominator )
+        
+        Weights = np.zeros( First.shape + ( len( self.__Metals[ Name ] ), ) )
+        
+        np.put_along_axis( Weights, First[..., np.newaxis], 1.0 - Ratio[..., np.newaxis], axis = -1 )
+        
+        #add the second column's weight, both columns are the same if only the first one is used
+        SecondWeights = np.take_along_axis( Weights, Second[..., np.newaxis], axis = -1 ) + Ratio[..., np.newaxis]
+        np.put_along_axis( Weights, Second[..., np.newaxis], np.where( ( First == Second )[..., np.newaxis], 1.0, SecondWeights ), axis = -1 )
+        
+        return Weights
+    
+    
+    def GetValues( self, mass, ZH, Name ):
+        """returns the values for pairs of initial masses and metallicities
+        mass: the initial masses of the stars [Msun], a single value or an array
+        ZH: the metallicities [Z/H], a single value or an array (broadcast with mass)
+        Name: the beginning of the column names ('t_' or 'Mfin_')
+        returns the values interpolated in mass and metallicity, masses outside of the grid are extrapolated linearly
+        The masses are searched for with the same bisection cRemnantCalculator uses, so that both return the same values."""
+        
+        masses, ZHs = np.broadcast_arrays( np.asarray( mass, dtype = float ), np.asarray( ZH, dtype = float ) )
+        
+        Column = self.GetColumnAccessor( ZHs, Name )
+        
+        #the two masses used for inter- or extrapolation, beyond the second highest mass the highest one is the anchor
+        Lower, Exact = BisectSortedList( masses, self.__Mstar )
+        Upper = Lower + 1
+        
+        Beyond = ( masses > self.__Mstar[-2] ) & ~( masses < self.__Mstar[1] )
+        
+        Anchor = np.where( Beyond, Upper, Lower )
+        Other = np.where( Beyond, Lower, Upper )
+        
+        ValueAnchor = Column( Anchor )
+        ValueOther = Column( Other )
+        
+        Result = ( ValueOther - ValueAnchor ) * ( masses - self.__Mstar[ Anchor ] ) / ( self.__Mstar[ Other ] - self.__Mstar[ Anchor ] ) + ValueAnchor
+        
+        #masses in the grid need no interpolation
+        Result = np.where( masses == self.__Mstar[ Other ], ValueOther, Result )
+        Result = np.where( Exact | ( masses == self.__Mstar[ Anchor ] ), ValueAnchor, Result )
+        
+        if 0 == Result.ndim:
+            return float( Result )
+        
+        return Result
+    
+    
+    def GetLifetimes( self, mass, ZH ):
+        """returns the life-expectancy of stars
+        mass: the initial masses of the stars [Msun], a single value or an array
+        ZH: the metallicities [Z/H], a single value or an array (broadcast with mass)
+        returns the life expectancies of the stars [Gyr]"""
+        
+        return np.power( 10.0, self.GetValues( mass, ZH, "t_" ) - 9.0 )
+    
+    
+    def GetMfins( self, mass, ZH ):
+        """returns the remnant masses of stars
+        mass: the initial masses of the stars [Msun], a single value or an array
+        ZH: the metallicities [Z/H], a single value or an array (broadcast with mass)
+        returns the masses of the stellar remnants [Msun]"""
+        
+        return self.GetValues( mass, ZH, "Mfin_" )
@@ -0,0 +1,212 @@
+# general libs
+import os
+import json
+import math
+import time
+import socket
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# own libs
+from src.DataProcessor import cDataProcessor
+
+
+#the results returned for every GC
+_ResultColumns = [ "Name", "Mini", "ProducedIron", "NSN", "NSNPos", "mlast", "SFD", "IMFConverged" ]
+
+
+class cQueryServer():
+    """a server answering queries for the results of GCs over HTTP (on a TCP port or a Unix socket)
+    The star tables are loaded once and shared by all requests, every request is handled in its own thread.
+    Requests are POSTed to /run as JSON objects with the GC properties either in 'gc' (a single GC) or in 'gcs' (a list of GCs or a lib of columns) and optionally the name of the table set in 'tables'.
+    The answer holds the name of the table set, the results of every GC and the time the request took in milliseconds, GET /tables lists the table sets."""
+    
+    def __init__( self, TableSets, Host = "127.0.0.1", Port = 8080, Socket = None, **Settings ):
+        """Constructor, opens the server without serving requests yet (see Serve)
+        TableSets: a lib of the names of the table sets and the cData holding their star tables, the first one is used if a request does not name one
+        Host: the address to listen on
+        Port: the TCP port to listen on, 0 picks a free port
+        Socket: the path of a Unix socket to listen on instead of the TCP port
+        Settings: the settings of the processing (see cDataProcessor)"""
+        
+        if 0 == len( TableSets ):
+            raise ValueError( "cQueryServer: At least one table set is needed!" )
+        
+        #check the settings once instead of in every request
+        cDataProcessor( **Settings )
+        
+        self.__TableSets = dict( TableSets )
+        self.__DefaultTables = list( TableSets )[0]
+        self.__Settings = Settings
+        self.__Socket = Socket
+        
+        if Socket is None:
+            self.__Server = ThreadingHTTPServer( ( Host, Port ), _QueryHandler )
+        else:
+            self.__Server = _UnixHTTPServer( Socket, _QueryHandler )
+        
+        self.__Server.daemon_threads = True
+        self.__Server.QueryServer = self
+        
+        self.__Serving = False
+    
+    
+    def GetAddress( self ):
+        """returns the address the server listens on, a tuple of host and port or the path of the Unix socket"""
+        
+        return self.__Server.server_address
+    
+    
+    def GetTableSets( self ):
+        """returns the names of the loaded sets of star tables a request can choose from, the first one is the default"""
+        
+        return list( self.__TableSets )
+    
+    
+    def Serve( self ):
+        """serves requests until Shutdown is called"""
+        
+        self.__Serving = True
+        self.__Server.serve_forever()
+    
+    
+    def Shutdown( self ):
+        """stops serving requests (from another thread) and closes the server"""
+        
+        #shutdown waits for the serving loop, which never ends if it was not started
+        if self.__Serving:
+            self.__Server.shutdown()
+        
+        self.__Server.server_close()
+        
+        if not self.__Socket is None and os.path.exists( self.__Socket ):
+            os.remove( self.__Socket )
+    
+    
+    def Query( self, Request ):
+        """computes the results for the GCs of a request
+        Request: a lib with the GC properties in 'gc' (a single GC) or 'gcs' (a list of GCs or a lib of columns) and optionally the name of the table set in 'tables'
+        returns a lib with the name of the table set and a list with the results of every GC"""
+        
+        Tables = Request.get( "tables", self.__DefaultTables )
+        
+        if not Tables in self.__TableSets:
+            raise ValueError( "cQueryServer: Unknown table set '" + str( Tables ) + "'!" )
+        
+        if "gc" in Request:
+            GCs = [ Request["gc"] ]
+        elif "gcs" in Request:
+            GCs = Request["gcs"]
+        else:
+            raise ValueError( "cQueryServer: The request contains no GCs!" )
+        
+        #a list of GCs is turned into columns
+        if isinstance( GCs, list ):
+            if 0 == len( GCs ):
+                return { "tables": Tables, "results": [] }
+            
+            GCs = { Name: [ GC.get( Name ) for GC in GCs ] for Name in GCs[0] }
+        
+        data = self.__TableSets[ Tables ].WithGCData( GCs )
+        
+        cDataProcessor( **self.__Settings ).ProcessData( data )
+        
+        Columns = [ data.AccessGCData( Name ) for Name in _ResultColumns ]
+        
+        return { "tables": Tables, "results": [ { Name: _ToJSON( Column[ nGC ] ) for Name, Column in zip( _ResultColumns, Columns ) } for nGC in range( len( Columns[0] ) ) ] }
+
+
+def _ToJSON( Value ):
+    """turns a result into a plain python value, NaN becomes None (null in JSON)"""
+    
+    if hasattr( Value, "item" ):
+        Value = Value.item()
+    
+    if isinstance( Value, float ) and math.isnan( Value ):
+        return None
+    
+    return Value
+
+
+class _UnixHTTPServer( ThreadingHTTPServer ):
+    """a threading HTTP server listening on a Unix socket"""
+    
+    address_family = socket.AF_UNIX
+    
+    def server_bind( self ):
+        #the host name and port of TCP servers do not exist for Unix sockets
+        self.socket.bind( self.server_address )
+        self.server_name = "localhost"
+        self.server_port = 0
+
+
+class _QueryHandler( BaseHTTPRequestHandler ):
+    """handles the requests of a cQueryServer"""
+    
+    #the time the answered request took, None for requests that were not run
+    __Latency = None
+    
+    def address_string( self ):
+        #clients of Unix sockets have no address
+        return self.client_address[0] if isinstance( self.client_address, tuple ) else "unix"
+    
+    
+    def do_GET( self ):
+        if "/tables" == self.path:
+            self.__Answer( 200, { "tables": self.server.QueryServer.GetTableSets() } )
+        else:
+            self.__Answer( 404, { "error": "Unknown path '" + self.path + "'!" } )
+    
+    
+    def do_POST( self ):
+        if not "/run" == self.path:
+            self.__Answer( 404, { "error": "Unknown path '" + self.path + "'!" } )
+            return
+        
+        Start = time.perf_counter()
+        
+        try:
+            Request = json.loads( self.rfile.read( int( self.headers.get( "Content-Length", 0 ) ) ) )
+            
+            if not isinstance( Request, dict ):
+                raise ValueError( "cQueryServer: The request needs to be a JSON object!" )
+            
+            Answer = self.server.QueryServer.Query( Request )
+            Status = 200
+        
+        except ( ValueError, NameError, KeyError, TypeError ) as Error:
+            Answer = { "error": type( Error ).__name__ + ": " + str( Error ) }
+            Status = 400
+        
+        except Exception as Error:
+            Answer = { "error": type( Error ).__name__ + ": " + str( Error ) }
+            Status = 500
+        
+        Answer["latency_ms"] = ( time.perf_counter() - Start ) * 1000.0
+        
+        self.__Answer( Status, Answer )
+    
+    
+    def __Answer( self, Status, Answer ):
+        """sends a JSON answer, the time the request took is also sent as Server-Timing header"""
+        
+        Body = json.dumps( Answer ).encode( "utf-8" )
+        
+        self.__Latency = Answer.get( "latency_ms" )
+        
+        self.send_response( Status )
+        self.send_header( "Content-Type", "application/json" )
+        self.send_header( "Content-Length", str( len( Body ) ) )
+        
+        if "latency_ms" in Answer:
+            self.send_header( "Server-Timing", "run;dur=" + "{:.3f}".format( Answer["latency_ms"] ) )
+        
+        self.end_headers()
+        self.wfile.write( Body )
+    
+    
+    def log_request( self, code = "-", size = "-" ):
+        #the latency of every request is logged with it
+        if self.__Latency is None:
+            super().log_request( code, size )
+        else:
+            self.log_message( '"%s" %s %s %.3f ms', self.requestline, str( code ), str( size ), self.__Latency )
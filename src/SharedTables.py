@@ -0,0 +1,104 @@
+#general modules
+import os
+import weakref
+import tempfile
+import numpy as np
+
+
+def _RemoveFile( Path, Pid ):
+    """removes the file of the tables if it still exists, only in the process that created it (forked processes inherit the finalizers)
+    Path: the path of the file
+    Pid: the id of the process that created the file"""
+    
+    if Pid == os.getpid() and os.path.exists( Path ):
+        os.remove( Path )
+
+
+class cSharedTables():
+    """a set of read-only tables (numpy arrays) stored contiguously in one memory-mapped file, so that several processes can use them without holding their own copies
+    Pickling the object only passes the name of the file and the layout of the tables, the unpickled object maps the same file."""
+    
+    def __init__( self, Tables, Folder = None ):
+        """Constructor, writes the tables into a new file that is removed again by Close, or at the latest when the object is deleted or python exits
+        Tables: a lib of the arrays to share
+        Folder: the folder to create the file in (default: /dev/shm if available, else the temporary folder of the system)"""
+        
+        if Folder is None:
+            Folder = "/dev/shm" if os.path.isdir( "/dev/shm" ) else tempfile.gettempdir()
+        
+        #the position, shape and type of every table within the file, every table starts at a multiple of 64 bytes
+        self.__Layout = {}
+        Size = 0
+        
+        Arrays = {}
+        
+        for Name, Table in Tables.items():
+            Arrays[ Name ] = np.ascontiguousarray( Table )
+            
+            self.__Layout[ Name ] = ( Size, Arrays[ Name ].shape, Arrays[ Name ].dtype.str )
+            Size += -( -Arrays[ Name ].nbytes // 64 ) * 64
+        
+        Handle, self.__Path = tempfile.mkstemp( prefix = "SFDE_", suffix = ".tables", dir = Folder )
+        
+        #the file is also removed if Close is never called, e.g. after an exception
+        self.__Finalizer = weakref.finalize( self, _RemoveFile, self.__Path, os.getpid() )
+        
+        with os.fdopen( Handle, "wb" ) as File:
+            for Name, Array in Arrays.items():
+                File.seek( self.__Layout[ Name ][0] )
+                File.write( Array.tobytes() )
+            
+            File.truncate( max( Size, 1 ) )
+        
+        self.__Map()
+    
+    
+    def __Map( self ):
+        """maps the file and creates the read-only views of the tables"""
+        
+        self.__Buffer = np.memmap( self.__Path, dtype = np.uint8, mode = "r" )
+        
+        self.__Tables = {}
+        
+        for Name, ( Offset, Shape, Type ) in self.__Layout.items():
+            Count = int( np.prod( Shape ) )
+            
+            if 0 == Count:
+                self.__Tables[ Name ] = np.empty( Shape, dtype = np.dtype( Type ) )
+                continue
+            
+            self.__Tables[ Name ] = np.frombuffer( self.__Buffer, dtype = np.dtype( Type ), count = Count, offset = Offset ).reshape( Shape )
+    
+    
+    def __getstate__( self ):
+        return { "Path": self.__Path, "Layout": self.__Layout }
+    
+    
+    def __setstate__( self, State ):
+        self.__Path = State["Path"]
+        self.__Layout = State["Layout"]
+        self.__Finalizer = None
+        
+        self.__Map()
+    
+    
+    def GetPath( self ):
+        return self.__Path
+    
+    
+    def GetNames( self ):
+        return list( self.__Layout )
+    
+    
+    def GetTable( self, Name ):
+        """returns a read-only view of a table
+        Name: the name of the table"""
+        
+        return self.__Tables[ Name ]
+    
+    
+    def Close( self ):
+        """removes the file if this object created it, the views of the tables stay valid as long as they are used"""
+        
+        if not self.__Finalizer is None:
+            self.__Finalizer()
@@ -1,3 +1,5 @@
+import numpy as np
+
 pIronSun = 0.0013
 
 
@@ -26,3 +28,111 @@ def LinInterExtrapolate( X1Y1, X2Y2, X3 ):
         return X2Y2[1]
     
     return ( X2Y2[1] - X1Y1[1] ) * ( X3 - X1Y1[0] ) / ( X2Y2[0] - X1Y1[0] ) + X1Y1[1]
+
+
+def BisectSortedList( val, valList, Length = None ):
+    """finds the position of values in a list sorted from smallest to largest using the same bisection as cRemnantCalculator
+    val: the values to search for, a single value or an array
+    valList: a list of values sorted from smallest to largest (at least 2 elements), an array with one such list (row) per value or a function returning the elements of the lists at given indices
+    Length: the length of the lists (only needed if valList is a function)
+    returns the index pos for every value so that it is inter- or extrapolated between valList[pos] and valList[pos + 1], and whether the value was found exactly at valList[pos]
+    values below valList[1] and above valList[-2] are not searched for, they use the first and last two elements of the list instead"""
+    
+    vals = np.asarray( val, dtype = float )
+    
+    if not callable( valList ):
+        valList = np.asarray( valList, dtype = float )
+        Length = valList.shape[-1]
+    
+    Take = lambda Index: TakeFromSortedList( valList, Index )
+    
+    lenValList = Length
+    pos = np.full( vals.shape, int( lenValList / 2 ) )
+    Exact = np.full( vals.shape, False )
+    Active = ( vals >= Take( 1 ) ) & ( vals <= Take( -2 ) )
+    
+    if lenValList > 2:
+        for i in range( int( np.log2( int( lenValList / 2 ) ) ) + 1 ):
+            Step = int( lenValList / pow( 2, i + 2 ))
+            
+            Current = Take( pos )
+            Next = Take( np.minimum( pos + 1, lenValList - 1 ) )
+            Previous = Take( pos - 1 )
+            
+            Found = Active & ( vals == Current )
+            Up = Active & ( Current < vals )
+            Down = Active & ( Current > vals )
+            
+            BreakUp = Up & ( Next > vals )
+            BreakDown = Down & ( Previous < vals )
+            
+            Exact |= Found
+            
+            pos = np.where( Up & ~BreakUp, pos + Step, pos )
+            pos = np.where( BreakDown, pos - 1, pos )
+            pos = np.where( Down & ~BreakDown, pos - Step, pos )
+            
+            Active &= ~( Found | BreakUp | BreakDown )
+    
+    #the ends of the list, the low end is checked first
+    pos = np.where( vals > Take( -2 ), lenValList - 2, pos )
+    pos = np.where( vals < Take( 1 ), 0, pos )
+    
+    return pos, Exact
+
+
+def TakeFromSortedList( valList, Index ):
+    """returns the elements at the given indices of a list, or of every row of an array of lists (one index per row)
+    valList: a list of values, an array with one list per row or a function returning the elements at given indices
+    Index: the indices of the elements, a single index or an array"""
+    
+    if callable( valList ):
+        return valList( Index )
+    
+    if 1 == valList.ndim:
+        return valList[ Index ]
+    
+    Index = np.broadcast_to( Index, valList.shape[:-1] )
+    
+    return np.take_along_axis( valList, Index[..., np.newaxis] % valList.shape[-1], axis = -1 )[..., 0]
+
+
+def LinInterExtrapolateSortedList( val, valList, dataList, Descending = False ):
+    """inter- or extrapolates linearly in a list of values treating it as a function data( val ), the vectorized version of the lookup in cRemnantCalculator
+    val: the values for which the data shall be found, a single value or an array
+    valList: a list of values sorted from smallest to largest (at least 2 elements), an array with one such list (row) per value or a function returning the elements of the lists at given indices
+    dataList: the data corresponding to the values in valList (one row per value if valList has one)
+    Descending: True if valList is sorted from largest to smallest instead (the lookup for reversed lists in cRemnantCalculator)
+    returns the inter- or extrapolated data for every value"""
+    
+    vals = np.asarray( val, dtype = float )
+    dataList = np.asarray( dataList, dtype = float )
+    
+    if not callable( valList ):
+        valList = np.asarray( valList, dtype = float )
+    
+    #a descending list is searched as the ascending list of the negated values
+    Sign = -1.0 if Descending else 1.0
+    
+    Keys = lambda Index: Sign * TakeFromSortedList( valList, Index )
+    
+    Lower, Exact = BisectSortedList( Sign * vals, Keys, dataList.shape[-1] )
+    
+    #beyond the second largest value the largest one is the anchor (unless the value is below the second smallest one as well)
+    Beyond = ( Sign * vals > Sign * TakeFromSortedList( valList, -2 ) ) & ~( Sign * vals < Sign * TakeFromSortedList( valList, 1 ) )
+    
+    Anchor = np.where( Beyond, Lower + 1, Lower )
+    Other = np.where( Beyond, Lower, Lower + 1 )
+    
+    ValAnchor = TakeFromSortedList( valList, Anchor )
+    ValOther = TakeFromSortedList( valList, Other )
+    DataAnchor = TakeFromSortedList( dataList, Anchor )
+    DataOther = TakeFromSortedList( dataList, Other )
+    
+    Result = ( DataOther - DataAnchor ) * ( vals - ValAnchor ) / ( ValOther - ValAnchor ) + DataAnchor
+    
+    #values in the list need no interpolation
+    Result = np.where( vals == ValOther, DataOther, Result )
+    Result = np.where( Exact | ( vals == ValAnchor ), DataAnchor, Result )
+    
+    return Result
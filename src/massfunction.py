@@ -202,6 +202,46 @@ class cMassFunction:
         return Mass
     
     
+    def ComputeIntegrals( self, masses1, masses2, summand = 0 ):
+        """computes the integrals of the IMF for many mass intervals at once, see ComputeIntegral
+        masses1: an array of the low-mass ends of the mass intervals (the intervals are truncated when outside of the boundaries of the MF)
+        masses2: an array of the high-mass ends of the mass intervals (the intervals are truncated when outside of the boundaries of the MF)
+        summand: the summand added to the exponent -alpha (1 to compute the mass within an interval, 0 for the number of stars)
+        returns an array with the integral for every interval, intervals with masses2 < masses1 give 0"""
+        
+        masses1 = np.asarray( masses1, dtype = float )
+        masses2 = np.asarray( masses2, dtype = float )
+        
+        Int = np.zeros( np.broadcast( masses1, masses2 ).shape )
+        
+        #add up the part of every interval within each segment of the MF
+        for nBound in range( len( self.__bounds ) - 1 ):
+            Low = np.clip( masses1, self.__bounds[nBound], self.__bounds[nBound + 1] )
+            High = np.clip( masses2, self.__bounds[nBound], self.__bounds[nBound + 1] )
+            High = np.maximum( Low, High )
+            
+            alpha = self.__alphas[nBound]
+            k = self.__ks[nBound]
+            
+            if summand + 1 == alpha:
+                Int += k * ( np.log( High ) - np.log( Low ) )
+            else:
+                Int += k / ( 1.0 + summand - alpha ) * ( np.power( High, 1.0 + summand - alpha ) - np.power( Low, 1.0 + summand - alpha ) )
+        
+        return Int
+    
+    
+    def GetMasses( self, masses1, masses2 ):
+        """computes what mass is between masses1 and masses2 for many intervals at once, see GetMass
+        masses1: an array of the low-mass ends of the mass intervals to be investigated
+        masses2: an array of the high-mass ends of the mass intervals to be investigated
+        closed intervals [masses1,masses2] are expected"""
+        
+        masses2 = np.asarray( masses2, dtype = float )
+        
+        return self.ComputeIntegrals( masses1, masses2, 1 ) + np.where( masses2 >= self.__bounds[-1], self.__bounds[-1], 0.0 )
+    
+    
     def GetMassPortion( self, mass1, mass2 ):
         """computes what portion of the overall GC mass is between mass1 and mass2
         mass1: the low-mass end of the mass interval to be investigated
@@ -236,3 +276,40 @@ class cMassFunction:
             return np.exp( np.log( mass ) - NumStars / self.__ks[ AlphaIndex ] )
         else:
             return pow( pow( mass, 1.0 - self.__alphas[ AlphaIndex ] ) - NumStars * ( 1.0 - self.__alphas[ AlphaIndex ] ) / self.__ks[ AlphaIndex ], 1.0 / ( 1.0 - self.__alphas[ AlphaIndex ] ) )
+
+
+    def GetStarMasses( self, mmin ):
+        """returns the masses of all stars more massive than mmin assuming optimal sampling, starting with the most massive star (m_max)
+        mmin: the lower mass limit, only stars with a mass > mmin are returned
+        the i-th star is the one for which i stars lie between it and m_max, i.e. the same stars cStarExtractor returns one after another
+        returns a numpy array of masses sorted from the most to the least massive star"""
+
+        bounds = np.array( self.__bounds )
+        alphas = np.array( self.__alphas )
+        ks = np.array( self.__ks )
+
+        if mmin >= bounds[-1]:
+            return np.empty( 0 )
+
+        #cumulative number of stars between each boundary and m_max (inverse cumulative number function)
+        NumAbove = np.array( [ self.ComputeIntegral( Bound, bounds[-1] ) for Bound in bounds ] )
+        NumAbove[-1] = 0.0
+
+        #number of stars above mmin (apart from the most massive star at m_max)
+        NumStars = np.arange( 1, int( self.ComputeIntegral( mmin, bounds[-1] ) ) + 1, dtype = float )
+
+        #find the segment every star is in and invert the number integral within that segment
+        Segments = np.searchsorted( -NumAbove, -NumStars, side = "right" ) - 1
+        Segments = np.clip( Segments, 0, len( alphas ) - 1 )
+
+        Upper = bounds[ Segments + 1 ]
+        Alpha = alphas[ Segments ]
+        K = ks[ Segments ]
+        Rest = NumStars - NumAbove[ Segments + 1 ]
+
+        with np.errstate( divide = "ignore", invalid = "ignore" ):
+            Masses = np.where( Alpha == 1.0, np.exp( np.log( Upper ) - Rest / K ), np.power( np.power( Upper, 1.0 - Alpha ) - Rest * ( 1.0 - Alpha ) / K, 1.0 / ( 1.0 - Alpha ) ) )
+
+        Masses = np.concatenate( ( [ bounds[-1] ], Masses ) )
+
+        return Masses[ Masses > mmin ]
@@ -0,0 +1,273 @@
+import numpy as np
+
+from src.massfunction import cMassFunction
+
+
+class cMassFunctionBatch:
+    """a class holding the mass functions of many clusters at once, all mass functions need to have the same number of segments"""
+    
+    def __init__( self, Mtots, bounds, alphas ):
+        """instantiation of the class
+        self: the "this" equivalent
+        Mtots: an array of the total masses of the clusters
+        bounds: an array of m_min, the boundaries between segments and m_max for every cluster (one row per cluster or a single row used for all clusters), see cMassFunction
+        alphas: an array of alphas for every cluster (one row per cluster or a single row used for all clusters), there always needs to be one alpha more then boundaries"""
+        
+        self.__Mtot = np.array( Mtots, dtype = float, ndmin = 1 )
+        
+        NumMFs = len( self.__Mtot )
+        
+        bounds = np.array( bounds, dtype = float, ndmin = 2 )
+        alphas = np.array( alphas, dtype = float, ndmin = 2 )
+        
+        if bounds.shape[1] != alphas.shape[1] + 1:
+            raise ValueError( "cMassFunctionBatch: Invalid number of alphas, must be one less then boundaries!" )
+        
+        self.__bounds = np.broadcast_to( bounds, ( NumMFs, bounds.shape[1] ) ).copy()
+        self.__alphas = np.broadcast_to( alphas, ( NumMFs, alphas.shape[1] ) ).copy()
+        
+        #compute the k-values for the mass functions
+        self.__ComputeKs()
+    
+    
+    @staticmethod
+    def FromMassFunctions( MFs ):
+        """creates a batch from a list of mass functions (cMassFunction)
+        MFs: the mass functions, all of them need to have the same number of segments"""
+        
+        return cMassFunctionBatch( [ MF.GetMtot() for MF in MFs ], [ MF.Getbounds() for MF in MFs ], [ MF.Getalphas() for MF in MFs ] )
+    
+    
+    def __ComputeKs( self ):
+        """compute the k values from the given masses and alphas"""
+        
+        #compute preliminary k's
+        self.__ks = np.ones( self.__alphas.shape )
+        
+        for nAlpha in range( self.__alphas.shape[1] - 1 ):
+            self.__ks[:, nAlpha + 1] = self.__ks[:, nAlpha] * np.power( self.__bounds[:, nAlpha + 1], -self.__alphas[:, nAlpha] ) / np.power( self.__bounds[:, nAlpha + 1], -self.__alphas[:, nAlpha + 1] )
+        
+        #correct the ks
+        MassTot = self.__IntegrateSegments( self.__bounds[:, :-1], self.__bounds[:, 1:], self.__alphas, self.__ks, 1 ).sum( axis = 1 )
+        
+        Factor = ( self.__Mtot - self.__bounds[:, -1] ) / MassTot            # Mtot = \int\limits_{m_min}^{m_max} m \xi( m ) dm + m_max
+        self.__ks *= Factor[:, np.newaxis]
+    
+    
+    def __IntegrateSegments( self, mass1, mass2, alpha, k, summand ):
+        """integrates k m^{summand-alpha} from mass1 to mass2 within a single segment of the mass functions, all parameters are arrays of the same shape"""
+        
+        with np.errstate( divide = "ignore", invalid = "ignore" ):
+            return np.where( summand + 1 == alpha, k * ( np.log( mass2 ) - np.log( mass1 ) ), k / ( 1.0 + summand - alpha ) * ( np.power( mass2, 1.0 + summand - alpha ) - np.power( mass1, 1.0 + summand - alpha ) ) )
+    
+    
+    def __PerMF( self, Values, ndim ):
+        """reshapes a column of per-cluster values so that it can be combined with an array with ndim dimensions (the first one being the cluster)"""
+        
+        return Values.reshape( Values.shape + ( 1, ) * ( ndim - 1 ) )
+    
+    
+    def GetSize( self ):
+        return len( self.__Mtot )
+    
+    
+    def GetMtot( self ):
+        return self.__Mtot.copy()
+    
+    
+    def Getbounds( self ):
+        return self.__bounds.copy()
+    
+    
+    def Getalphas( self ):
+        return self.__alphas.copy()
+    
+    
+    def Getks( self ):
+        return self.__ks.copy()
+    
+    
+    def GetSubset( self, Indices ):
+        """returns a batch (cMassFunctionBatch) with the mass functions of the given clusters
+        Indices: the indices of the clusters"""
+        
+        return cMassFunctionBatch( self.__Mtot[ Indices ], self.__bounds[ Indices ], self.__alphas[ Indices ] )
+    
+    
+    def GetMassFunction( self, Index ):
+        """returns the mass function (cMassFunction) of a single cluster
+        Index: the index of the cluster"""
+        
+        return cMassFunction( self.__Mtot[ Index ], self.__bounds[ Index ].tolist(), self.__alphas[ Index ].tolist() )
+    
+    
+    def ComputeIntegral( self, mass1, mass2, summand = 0 ):
+        """computes the integral of every IMF adding summand to -alpha int limits_mass1^mass2 k_i m^{summand-alpha_i}, see cMassFunction
+        mass1: the low-mass ends of the mass intervals, the same for all clusters, one per cluster (shape (N,)) or several per cluster (shape (N,K)), the intervals are truncated when outside of the boundaries of the MF
+        mass2: the high-mass ends of the mass intervals (same shape as mass1), the intervals are truncated when outside of the boundaries of the MF
+        summand: the summand added to the exponent -alpha (1 to compute the mass within an interval, 0 for the number of stars)
+        returns an array with the integrals, intervals with mass2 < mass1 give 0"""
+        
+        mass1, mass2 = np.broadcast_arrays( np.asarray( mass1, dtype = float ), np.asarray( mass2, dtype = float ) )
+        
+        if 0 == mass1.ndim:
+            mass1, mass2 = np.broadcast_arrays( mass1, mass2, self.__Mtot )[:2]
+        
+        Int = np.zeros( mass1.shape )
+        
+        #add up the part of every interval within each segment of the MF
+        for nBound in range( self.__bounds.shape[1] - 1 ):
+            LowBound = self.__PerMF( self.__bounds[:, nBound], mass1.ndim )
+            HighBound = self.__PerMF( self.__bounds[:, nBound + 1], mass1.ndim )
+            
+            Low = np.clip( mass1, LowBound, HighBound )
+            High = np.maximum( Low, np.clip( mass2, LowBound, HighBound ) )
+            
+            Int += self.__IntegrateSegments( Low, High, self.__PerMF( self.__alphas[:, nBound], mass1.ndim ), self.__PerMF( self.__ks[:, nBound], mass1.ndim ), summand )
+        
+        return Int
+    
+    
+    def ComputeCumulativeIntegral( self, masses, summand = 0 ):
+        """computes int limits_{m_min}^{mass} k_i m^{summand-alpha_i} for every cluster and every mass of a grid shared by all clusters
+        masses: an array of masses sorted from the smallest to the largest one, masses outside of the boundaries of the MFs are truncated
+        summand: the summand added to the exponent -alpha (1 to compute the mass below a mass, 0 for the number of stars)
+        returns an array with one row per cluster and one column per mass
+        Only the masses that can be within a segment for any cluster are evaluated for that segment, so that a fine grid costs about one power per cluster and mass.
+        The integrals of masses above m_max equal the integral of the whole MF up to rounding."""
+        
+        masses = np.asarray( masses, dtype = float )
+        
+        Int = np.zeros( ( len( self.__Mtot ), len( masses ) ) )
+        
+        logMasses = np.log( masses )
+        
+        #add the part of every segment below each mass, masses above a segment get the whole segment
+        for nBound in range( self.__bounds.shape[1] - 1 ):
+            Low = self.__bounds[:, nBound:nBound + 1]
+            High = self.__bounds[:, nBound + 1:nBound + 2]
+            
+            First = np.searchsorted( masses, Low.min(), side = "right" )
+            Last = np.searchsorted( masses, High.max(), side = "left" )
+            
+            Int[:, Last:] += self.__IntegrateSegments( Low, High, self.__alphas[:, nBound:nBound + 1], self.__ks[:, nBound:nBound + 1], summand )
+            
+            if Last <= First:
+                continue
+            
+            Exponent = 1.0 + summand - self.__alphas[:, nBound:nBound + 1]
+            k = self.__ks[:, nBound:nBound + 1]
+            
+            #the masses are truncated to the segment of every cluster
+            Part = np.clip( logMasses[First:Last], np.log( Low ), np.log( High ) )
+            
+            with np.errstate( divide = "ignore", invalid = "ignore" ):
+                if np.any( 0.0 == Exponent ):
+                    Part = np.where( 0.0 == Exponent, k * ( Part - np.log( Low ) ), k / Exponent * ( np.exp( Exponent * Part ) - np.power( Low, Exponent ) ) )
+                else:
+                    Part *= Exponent
+                    np.exp( Part, out = Part )
+                    Part -= np.power( Low, Exponent )
+                    Part *= k / Exponent
+            
+            Int[:, First:Last] += Part
+        
+        return Int
+    
+    
+    def GetNumbers( self, mass1, mass2 ):
+        """computes what number of stars is between mass1 and mass2 for every cluster
+        mass1: the low-mass ends of the mass intervals to be investigated
+        mass2: the high-mass ends of the mass intervals to be investigated
+        closed intervals [mass1,mass2] are expected"""
+        
+        mass2 = np.asarray( mass2, dtype = float )
+        
+        if 0 == mass2.ndim:
+            mass2 = np.broadcast_to( mass2, self.__Mtot.shape )
+        
+        return self.ComputeIntegral( mass1, mass2 ) + np.where( mass2 >= self.__PerMF( self.__bounds[:, -1], mass2.ndim ), 1.0, 0.0 )
+    
+    
+    def GetTotNumbers( self ):
+        """returns the total number of stars in every cluster"""
+        
+        return self.GetNumbers( self.__bounds[:, 0], self.__bounds[:, -1] )
+    
+    
+    def GetMass( self, mass1, mass2 ):
+        """computes what mass is between mass1 and mass2 for every cluster
+        mass1: the low-mass ends of the mass intervals to be investigated
+        mass2: the high-mass ends of the mass intervals to be investigated
+        closed intervals [mass1,mass2] are expected"""
+        
+        mass2 = np.asarray( mass2, dtype = float )
+        
+        if 0 == mass2.ndim:
+            mass2 = np.broadcast_to( mass2, self.__Mtot.shape )
+        m_max = self.__PerMF( self.__bounds[:, -1], mass2.ndim )
+        
+        return self.ComputeIntegral( mass1, mass2, 1 ) + np.where( mass2 >= m_max, m_max, 0.0 )
+    
+    
+    def __InvertNumbers( self, Indices, Numbers ):
+        """inverts the cumulative number function, i.e. finds the masses m for which int limits_m^{m_max} xi(m) dm = Numbers
+        Indices: the index of the cluster for every number
+        Numbers: the numbers of stars between the mass to be found and m_max"""
+        
+        #the number of stars between every boundary and m_max
+        NumAbove = self.ComputeIntegral( self.__bounds, np.broadcast_to( self.__bounds[:, -1:], self.__bounds.shape ) )
+        NumAbove[:, -1] = 0.0
+        
+        NumAbove = NumAbove[ Indices ]
+        
+        #find the segment every star is in and invert the number integral within that segment
+        Segments = np.clip( ( NumAbove >= Numbers[:, np.newaxis] ).sum( axis = 1 ) - 1, 0, self.__alphas.shape[1] - 1 )
+        
+        Upper = self.__bounds[ Indices, Segments + 1 ]
+        Alpha = self.__alphas[ Indices, Segments ]
+        K = self.__ks[ Indices, Segments ]
+        Rest = Numbers - NumAbove[ np.arange( len( Indices ) ), Segments + 1 ]
+        
+        with np.errstate( divide = "ignore", invalid = "ignore" ):
+            return np.where( Alpha == 1.0, np.exp( np.log( Upper ) - Rest / K ), np.power( np.power( Upper, 1.0 - Alpha ) - Rest * ( 1.0 - Alpha ) / K, 1.0 / ( 1.0 - Alpha ) ) )
+    
+    
+    def GetMassStarMinX( self, mass, NumStars ):
+        """returns the mass of the Xth less massive star than a star of a given mass for every cluster assuming optimal sampling
+        mass: the masses of the given stars (one per cluster)
+        NumStars: the number of stars to the next one (one per cluster), can be float"""
+        
+        mass = np.broadcast_to( np.asarray( mass, dtype = float ), self.__Mtot.shape )
+        
+        if np.any( mass > self.__bounds[:, -1] ) or np.any( mass < self.__bounds[:, 0] ):
+            raise ValueError( "cMassFunctionBatch: GetMassStarMinX: mass out of bounds!" )
+        
+        Numbers = self.ComputeIntegral( mass, self.__bounds[:, -1] ) + NumStars
+        
+        return self.__InvertNumbers( np.arange( len( self.__Mtot ) ), np.broadcast_to( Numbers, self.__Mtot.shape ).astype( float ) )
+    
+    
+    def GetStarMasses( self, mmin ):
+        """returns the masses of all stars more massive than mmin for every cluster assuming optimal sampling, see cMassFunction.GetStarMasses
+        mmin: the lower mass limit, only stars with a mass > mmin are returned
+        returns a list with one numpy array per cluster sorted from the most to the least massive star"""
+        
+        m_max = self.__bounds[:, -1]
+        
+        #number of stars above mmin (apart from the most massive star at m_max)
+        NumStars = np.where( mmin < m_max, self.ComputeIntegral( np.full( m_max.shape, float( mmin ) ), m_max ), 0.0 ).astype( int )
+        
+        #all stars of all clusters in one array
+        Indices = np.repeat( np.arange( len( self.__Mtot ) ), NumStars )
+        Numbers = np.arange( len( Indices ) ) - np.repeat( np.cumsum( NumStars ) - NumStars, NumStars ) + 1.0
+        
+        Masses = np.split( self.__InvertNumbers( Indices, Numbers ), np.cumsum( NumStars )[:-1] )
+        
+        StarMasses = []
+        
+        for nMF in range( len( self.__Mtot ) ):
+            Stars = np.concatenate( ( [ m_max[ nMF ] ], Masses[ nMF ] ) )
+            StarMasses.append( Stars[ Stars > mmin ] )
+        
+        return StarMasses
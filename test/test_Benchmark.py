@@ -0,0 +1,96 @@
+#general libs
+import pytest
+import warnings
+import numpy as np
+
+#own libs
+from src.Data import cData
+from src.Benchmark import cBenchmark, MakeCatalogue, WriteResults, ReadResults, CompareResults
+
+
+def test_MakeCatalogue():
+    """tests that the synthetic catalogues are reproducible and span the expected ranges"""
+    
+    Catalogue = MakeCatalogue( 1000 )
+    
+    for Name, Column in MakeCatalogue( 1000 ).items():
+        assert np.array_equal( Catalogue[ Name ], Column )
+    
+    assert not np.array_equal( Catalogue["Mass"], MakeCatalogue( 1000, 1 )["Mass"] )
+    
+    assert 1000 == len( set( Catalogue["Name"] ) )
+    assert ( Catalogue["Mass"] >= 1e4 ).all() and ( Catalogue["Mass"] <= pow( 10.0, 6.5 ) ).all()
+    assert ( Catalogue["R_p"] < Catalogue["R_a"] ).all()
+    assert ( Catalogue["Fe-H"] >= -2.5 ).all() and ( Catalogue["Fe-H"] <= -0.1 ).all()
+    assert ( Catalogue["Age"] >= 10.0 ).all() and ( Catalogue["Age"] <= 13.5 ).all()
+    
+    #the catalogue can be processed like a GC file
+    assert 1000 == len( cData( None, "SNe_W18.dat", "Ejecta_W18.dat", "RemnantData.dat" ).WithGCData( Catalogue ).AccessGCData( "Mass" ) )
+
+
+def test_Run( tmp_path ):
+    """tests running the benchmarks and writing and comparing the results"""
+    
+    Benchmark = cBenchmark( cData( None, "SNe_W18.dat", "Ejecta_W18.dat", "RemnantData.dat" ), Repeats = 2 )
+    
+    assert "ProcessData" == Benchmark.GetNames()[0]
+    assert { "IMFFromToday", "MfinFromMassFunct", "SNWalk", "SNExplodes", "Ejecta", "PlotBarcodes" } == set( Benchmark.GetNames()[1:] )
+    
+    with pytest.raises( ValueError ):
+        Benchmark.Run( [ 2 ], [ "x" ] )
+    
+    with pytest.raises( ValueError ):
+        cBenchmark( None, Repeats = 0 )
+    
+    Results = Benchmark.Run( [ 1, 2 ] )
+    
+    assert [ ( Name, NGCs ) for NGCs in [ 1, 2 ] for Name in Benchmark.GetNames() ] == [ ( Result["benchmark"], Result["gcs"] ) for Result in Results ]
+    
+    for Result in Results:
+        assert 2 == Result["repeats"]
+        assert 0.0 < Result["best_s"] <= Result["median_s"]
+        assert Result["best_s"] / Result["gcs"] == Result["best_per_gc_s"]
+    
+    #only the chosen benchmarks are run
+    assert [ "SNWalk" ] == [ Result["benchmark"] for Result in Benchmark.Run( [ 1 ], [ "SNWalk" ] ) ]
+    
+    WriteResults( Results, str( tmp_path / "Results.json" ), { "repeats": 2 } )
+    
+    assert Results == ReadResults( str( tmp_path / "Results.json" ) )
+    
+    #a benchmark that got slower beyond the tolerance is a regression, sizes missing in the reference are ignored
+    Slower = [ dict( Result ) for Result in Results ]
+    Slower[0]["best_s"] *= 1.5
+    Slower[1]["best_s"] *= 1.1
+    
+    assert [] == CompareResults( Results, Results )
+    assert [ ( Slower[0]["benchmark"], 1, Results[0]["best_s"], Slower[0]["best_s"], Slower[0]["best_s"] / Results[0]["best_s"] ) ] == CompareResults( Results, Slower )
+    assert 2 == len( CompareResults( Results, Slower, 0.05 ) )
+    assert [] == CompareResults( Results[:7], Slower[7:] )
+
+
+def test_RunSolversAndFailedGCs( monkeypatch ):
+    """tests that the solvers are passed to the processor and that GCs without an IMF are left out of the benchmarks that need one"""
+    
+    with pytest.raises( ValueError ):
+        cBenchmark( None, IMFSolver = "x" )
+    
+    with pytest.raises( ValueError ):
+        cBenchmark( None, SNSolver = "x" )
+    
+    #the first GC of the catalogue cannot be solved for
+    def MakeFailingCatalogue( NGCs, Seed = 0 ):
+        Catalogue = MakeCatalogue( NGCs, Seed )
+        Catalogue["Mass"][0] = -5.0
+        
+        return Catalogue
+    
+    monkeypatch.setattr( "src.Benchmark.MakeCatalogue", MakeFailingCatalogue )
+    
+    Benchmark = cBenchmark( cData( None, "SNe_W18.dat", "Ejecta_W18.dat", "RemnantData.dat" ), Repeats = 1, IMFSolver = "catalogue", SNSolver = "prefix" )
+    
+    with warnings.catch_warnings():
+        warnings.simplefilter( "ignore" )
+        Results = Benchmark.Run( [ 3 ] )
+    
+    assert Benchmark.GetNames() == [ Result["benchmark"] for Result in Results ]
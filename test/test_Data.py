@@ -1,6 +1,11 @@
+import io
+import os
+import pickle
 import pytest
+import numpy as np
 
 from src.Data import cData
+from src.DataReader import cDataReader
 
 
 def SetupTest():
@@ -28,6 +33,67 @@ def test_ConstructorExceptions():
         cData( "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData_brokenMfin.dat" )
 
 
+def test_FromTables():
+    """tests that data created from tables in memory equals the data read from files and is checked the same way"""
+    
+    data = SetupTest()
+    
+    GCData = cDataReader( "test/mockdata/GCData.dat", [] ).GetPandasSheet()
+    SNData = cDataReader( "test/mockdata/SNe.dat", [] ).GetPandasSheet()
+    EjectaData = { Name: np.asarray( Column ) for Name, Column in cDataReader( "test/mockdata/Ejecta.dat", [] ).GetData().items() }
+    RemnantData = cDataReader( "test/mockdata/RemnantData.dat", [] ).GetData()
+    
+    Tables = cData.FromTables( GCData, SNData, EjectaData, RemnantData )
+    
+    assert data.AccessGCDataPrinteable() == Tables.AccessGCDataPrinteable()
+    assert data.SNExplodes( [ 10.0, 15.03, 140.0 ] ).tolist() == Tables.SNExplodes( [ 10.0, 15.03, 140.0 ] ).tolist()
+    assert data.Ejecta( [ 7.0, 12.034129692832765 ] ).tolist() == Tables.Ejecta( [ 7.0, 12.034129692832765 ] ).tolist()
+    assert data.GetRemnantGrid().GetMfins( [ 1.0, 20.0 ], -1.0 ).tolist() == Tables.GetRemnantGrid().GetMfins( [ 1.0, 20.0 ], -1.0 ).tolist()
+    
+    #the GCs of a copy are replaced, the star data is shared
+    Other = data.WithGCData( { Name: list( Column )[:1] for Name, Column in GCData.items() } )
+    
+    assert [ "47_Tuc" ] == list( Other.AccessGCData( "Name" ) )
+    assert data.GetRemnantGrid() is Other.GetRemnantGrid()
+    assert 2 == len( data.AccessGCData( "Name" ) )
+    
+    #a combined table holds all star data
+    Combined = cDataReader( "test/mockdata/CombinedData.dat", [] ).GetData()
+    
+    assert cData( "test/mockdata/GCData.dat", "test/mockdata/CombinedData.dat", "test/mockdata/CombinedData.dat", "test/mockdata/CombinedData.dat" ).Ejecta( 20.0 ) == cData.FromTables( GCData, Combined ).Ejecta( 20.0 )
+    
+    with pytest.raises(NameError, match=r"cData: Error importing data. Column 'Fe\[Msun\]' missing!"):
+        cData.FromTables( GCData, SNData )
+    
+    with pytest.raises(NameError, match=r"cData: Error importing data. Column 'Age' missing!"):
+        cData.FromTables( GCData.drop( columns = "Age" ), SNData, EjectaData, RemnantData )
+    
+    with pytest.raises(ValueError, match=r"cData: All columns of a table need to have the same length!"):
+        data.WithGCData( { Name: list( Column )[: 1 if "Age" == Name else 2 ] for Name, Column in GCData.items() } )
+    
+    with pytest.raises(ValueError, match=r"cData: Empty SN data. Please check your SN file."):
+        cData.FromTables( GCData, SNData.iloc[:0], EjectaData, RemnantData )
+    
+    with pytest.raises(ValueError, match=r"cData: time information in Remnant data missing. Please check your Remnant file."):
+        cData.FromTables( GCData, SNData, EjectaData, { "mass[Msun]": [1.0], "Mfin_-1.0": [0.5] } )
+
+
+def test_CacheFolder( tmp_path ):
+    """tests that the data read from cached tables equals the data parsed from the files"""
+    
+    data = SetupTest()
+    
+    for nRun in range( 2 ):
+        Cached = cData( "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat", CacheFolder = str( tmp_path ) )
+        
+        assert data.AccessGCDataPrinteable() == Cached.AccessGCDataPrinteable()
+        assert data.GetRemnantGrid().GetTables()["Values" + "t_"].tolist() == Cached.GetRemnantGrid().GetTables()["Values" + "t_"].tolist()
+        assert data.SNExplodes( [ 10.0, 15.03, 140.0 ] ).tolist() == Cached.SNExplodes( [ 10.0, 15.03, 140.0 ] ).tolist()
+        assert data.Ejecta( [ 7.0, 12.034129692832765 ] ).tolist() == Cached.Ejecta( [ 7.0, 12.034129692832765 ] ).tolist()
+    
+    assert 4 == len( os.listdir( tmp_path ) )
+
+
 def test_AccessGCData():
     """tests if the GCData is accessed apropriately"""
     
@@ -78,6 +144,67 @@ def test_AccessGCDataPrinteable():
     assert ResultString == data.AccessGCDataPrinteable()
 
 
+def test_WriteGCDataPrinteable():
+    """tests that the printable GC data written into a file has fixed-width columns and equals AccessGCDataPrinteable"""
+    
+    data = SetupTest()
+    
+    #columns of other types are not printed
+    data.AddGCData( "Objects", [ [1], [2] ] )
+    data.AddGCData( "LongColumn", [ "x" * 30, "y" ] )
+    
+    File = io.StringIO()
+    data.WriteGCDataPrinteable( File )
+    
+    assert data.AccessGCDataPrinteable() == File.getvalue()
+    
+    Lines = File.getvalue().split( "\n" )
+    
+    assert 4 == len( Lines )
+    assert "" == Lines[-1]
+    assert not "Objects" in Lines[0]
+    
+    #every column starts at the same position in every line and is separated by at least four spaces
+    assert len( Lines[0] ) == len( Lines[1] ) == len( Lines[2] )
+    assert "LongColumn" == Lines[0].split()[-1]
+    assert Lines[0].index( "LongColumn" ) == Lines[1].index( "x" * 30 ) == Lines[2].rindex( "y" )
+    assert Lines[1].endswith( "x" * 30 + "    " )
+    
+    File = io.StringIO()
+    data.WriteGCDataPrinteable( File, False )
+    
+    assert "\n".join( Lines[1:] ) == File.getvalue()
+
+
+def test_IterGCChunks():
+    """tests that the GCs can be read chunk by chunk"""
+    
+    data = SetupTest()
+    
+    #without a chunk size the data is the only chunk
+    assert [ data ] == list( data.IterGCChunks() )
+    
+    Chunked = cData( "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat", 1 )
+    Chunks = list( Chunked.IterGCChunks() )
+    
+    assert 2 == len( Chunks )
+    
+    for Name in data.GetGCColumnNames():
+        assert list( data.AccessGCData( Name ) ) == list( Chunks[0].AccessGCData( Name ) ) + list( Chunks[1].AccessGCData( Name ) )
+    
+    #the star data is shared between the chunks
+    assert Chunked.GetRemnantGrid() is Chunks[1].GetRemnantGrid()
+    
+    #the printed chunks add up to the printed data
+    Lines = data.AccessGCDataPrinteable().split( "\n" )
+    
+    assert [ Lines[0].split(), Lines[1].split(), "" ] == [ Line.split() if Line else Line for Line in Chunks[0].AccessGCDataPrinteable().split( "\n" ) ]
+    assert [ Lines[2].split(), "" ] == [ Line.split() if Line else Line for Line in Chunks[1].AccessGCDataPrinteable( False ).split( "\n" ) ]
+    
+    with pytest.raises(ValueError, match=r"cData: The chunk size needs to be at least 1!"):
+        cData( "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat", 0 )
+
+
 def test_AddGCData():
     """tests adding data to the GC dataset"""
     
@@ -94,6 +221,55 @@ def test_AddGCData():
         data.AddGCData( "FaultyData", [1,2,3] )
         
         
+def test_GetGCSubset():
+    """tests that a subset of the GCs can be taken from the data"""
+    
+    data = SetupTest()
+    
+    Subset = data.GetGCSubset( [1] )
+    
+    assert data.GetGCColumnNames() == Subset.GetGCColumnNames()
+    assert [ data.AccessGCData( "Name" )[1] ] == list( Subset.AccessGCData( "Name" ) )
+    assert [ data.AccessGCData( "Mass" )[1] ] == list( Subset.AccessGCData( "Mass" ) )
+    
+    #the star data is shared, the GC data is not
+    assert data.GetRemnantGrid() is Subset.GetRemnantGrid()
+    
+    Subset.AddGCData( "NewColumn", [3] )
+    
+    assert "NewColumn" in Subset.GetGCColumnNames()
+    assert not "NewColumn" in data.GetGCColumnNames()
+    
+    #the order of the indices is kept
+    assert list( data.AccessGCData( "Name" ) )[::-1] == list( data.GetGCSubset( [1,0] ).AccessGCData( "Name" ) )
+
+
+def test_ShareStarTables():
+    """tests that the star tables can be shared between processes by pickling"""
+    
+    data = SetupTest()
+    
+    Shared = data.ShareStarTables()
+    
+    #only the GC data and the name of the file are pickled
+    assert len( pickle.dumps( Shared ) ) < len( pickle.dumps( data ) )
+    
+    Copy = pickle.loads( pickle.dumps( Shared.GetGCSubset( [1] ) ) )
+    
+    assert [ data.AccessGCData( "Name" )[1] ] == list( Copy.AccessGCData( "Name" ) )
+    
+    masses = np.array( [ 0.5, 9.0, 25.0, 40.0 ] )
+    
+    assert data.SNExplodes( masses ).tolist() == Copy.SNExplodes( masses ).tolist()
+    assert data.Ejecta( masses ).tolist() == Copy.Ejecta( masses ).tolist()
+    assert data.GetRemnantGrid().GetMfins( masses, -1.0 ).tolist() == Copy.GetRemnantGrid().GetMfins( masses, -1.0 ).tolist()
+    
+    for Heading, Column in data.GetRemnantData().items():
+        assert list( Column ) == Copy.GetRemnantData()[ Heading ].tolist()
+    
+    Shared.ReleaseStarTables()
+
+
 def test_SNExplodes():
     """tests that the masses for which SN explode are determined correctly"""
     
@@ -107,6 +283,32 @@ def test_SNExplodes():
     assert True == data.SNExplodes( 140.0 )
     
     
+def test_GetSNIntervals():
+    """tests that the intervals of exploding and not exploding stars agree with SNExplodes"""
+    
+    data = SetupTest()
+    
+    Bounds, Explodes = data.GetSNIntervals( 8.0, 140.0 )
+    
+    assert 8.0 == Bounds[0]
+    assert 140.0 == Bounds[-1]
+    assert len( Bounds ) - 1 == len( Explodes )
+    assert np.all( np.diff( Bounds ) > 0.0 )
+    
+    #neighbouring intervals differ
+    assert np.all( Explodes[1:] != Explodes[:-1] )
+    
+    for nInterval in range( len( Explodes ) ):
+        masses = np.linspace( Bounds[nInterval], Bounds[nInterval + 1], 52 )[1:-1]
+        assert np.all( data.SNExplodes( masses ) == Explodes[nInterval] )
+    
+    #a range without any transition
+    Bounds, Explodes = data.GetSNIntervals( 10.0, 12.3 )
+    
+    assert [ 10.0, 12.3 ] == Bounds.tolist()
+    assert [ True ] == Explodes.tolist()
+
+
 def test_Ejecta():
     """tests that the iron ejecta are computed correctly"""
     
@@ -136,6 +338,31 @@ def test_Ejecta():
     assert 0.074 == pytest.approx( data1ejecta.Ejecta( 120.0 ) )
 
 
+def test_SNExplodesAndEjectaArrays():
+    """tests that arrays of masses give the same results as single masses"""
+    
+    data = SetupTest()
+    
+    masses = np.array( [ 7.0, 9.180887372013653, 10.0, 12.3, 15.03, 15.11, 21.604095563139936, 25.21, 120.0, 140.0 ] )
+    
+    Explodes = data.SNExplodes( masses )
+    Ejecta = data.Ejecta( masses )
+    
+    assert masses.shape == Explodes.shape
+    assert masses.shape == Ejecta.shape
+    
+    for nMass in range( len( masses ) ):
+        assert data.SNExplodes( masses[nMass] ) == Explodes[nMass]
+        assert data.Ejecta( masses[nMass] ) == Ejecta[nMass]
+    
+    #a call with an array of masses counts once
+    assert { "SNExplodes": 1 + len( masses ), "Ejecta": 1 + len( masses ) } == data.GetLookupCalls()
+    
+    data1ejecta = cData( "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/1Ejecta.dat", "test/mockdata/RemnantData.dat" )
+    
+    assert np.allclose( 0.074, data1ejecta.Ejecta( masses ) )
+
+
 def test_GetRemnantData():
     """tests whether the remnant data is read in correctly"""
     
@@ -193,3 +420,32 @@ def test_ConstructorSameFile():
         
         for nElem in range( len( CombinedRemData["mass[Msun]"] ) ):
             assert CombinedRemData[Elem][nElem] == IndRemnantData[Elem][nElem]
+
+
+def test_CacheFolderTypes( tmp_path ):
+    """tests that integer columns of the GC file have the same type and are printed the same way with and without the cache"""
+    
+    with open( "test/mockdata/GCData.dat" ) as File:
+        Lines = [ Line.rstrip( "\n" ) for Line in File ]
+    
+    #every GC gets an integer flag, the header is the first line and ends with a comment
+    Lines[0] = Lines[0].replace( "#", "Flag #", 1 )
+    Lines = Lines[:1] + [ Line + " " + str( nLine ) if Line.strip() else Line for nLine, Line in enumerate( Lines[1:] ) ]
+    
+    GCFile = str( tmp_path / "GCData.dat" )
+    
+    with open( GCFile, "w" ) as File:
+        File.write( "\n".join( Lines ) + "\n" )
+    
+    Files = [ GCFile, "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat" ]
+    
+    Parsed = cData( *Files )
+    
+    assert int == type( Parsed.AccessGCData( "Flag" )[0] )
+    assert "Flag" in Parsed.AccessGCDataPrinteable().splitlines()[0]
+    
+    for nRun in range( 2 ):
+        Cached = cData( *Files, CacheFolder = str( tmp_path / "Cache" ) )
+        
+        assert [ type( Elem ) for Elem in Parsed.AccessGCData( "Flag" ) ] == [ type( Elem ) for Elem in Cached.AccessGCData( "Flag" ) ]
+        assert Parsed.AccessGCDataPrinteable() == Cached.AccessGCDataPrinteable()
@@ -1,12 +1,17 @@
 #general libs
 import pytest
+import warnings
+import numpy as np
 
 #own libs
 from src.common import *
+from src.Data import cData
 from src.DataProcessor import cDataProcessor
+from src.DataWriter import cDataWriter
 from src.IMFGenerator import cIMFGenerator
 from src.RemnantCalculator import cRemnantCalculator
 from src.DataReader import cDataReader
+from src.RemnantGrid import cRemnantGrid
 
 
 class cMockData():
@@ -38,11 +43,23 @@ class cMockData():
         return self.__RemnantData.copy()
     
     
+    def GetRemnantGrid( self ):
+        """returns the grid made from the remnant data"""
+        
+        return cRemnantGrid( self.__RemnantData )
+    
+    
     def SNExplodes( self, mass ):
+        if np.ndim( mass ):
+            return np.full( np.shape( mass ), True )
+        
         return True
     
     
     def Ejecta( self, nextMass ):
+        if np.ndim( nextMass ):
+            return np.full( np.shape( nextMass ), 0.074 )
+        
         return 0.074
 
 
@@ -126,3 +143,224 @@ def test_ComputeIMF():
         assert compareData["NSNPos"][nCompElem] == pytest.approx( data.AccessGCData( "NSNPos" )[nCompElem] )
         assert compareData["mlast"][nCompElem] == pytest.approx( data.AccessGCData( "mlast" )[nCompElem] )
         assert compareData["SFD"][nCompElem] == pytest.approx( data.AccessGCData( "SFD" )[nCompElem] )
+
+
+def test_SNSolvers():
+    """tests that both methods to find the last SN give the same results"""
+    
+    Results = {}
+    
+    for SNSolver in [ "walk", "prefix" ]:
+        data = cMockData()
+        
+        RemnantReader = cDataReader( "test/mockdata/RemnantData.dat", ["mass[Msun]"] )
+        data.SetRemnantData( RemnantReader.GetData() )
+        
+        data.AddGCData( "Mass", (2e5, 4e5, 1e6) )
+        data.AddGCData( "Age", (12.0, 11.0, 12.0) )
+        data.AddGCData( "R_a", (8.0, 8.0, 5.0) )
+        data.AddGCData( "R_p", (6.0, 10.0, 2.0) )
+        data.AddGCData( "Fe-H", (-2.0, -0.5, -1.0) )
+        data.AddGCData( "FeSpread", (0.05, 0.1, 0.0) )
+        data.AddGCData( "SFE", (0.3, 0.3, 0.3) )
+        
+        Proc = cDataProcessor( SNSolver )
+        Proc.ProcessData( data )
+        
+        Results[SNSolver] = data
+    
+    for Column in [ "NSN", "NSNPos", "mlast", "SFD" ]:
+        for nGC in range( 3 ):
+            assert Results["walk"].AccessGCData( Column )[nGC] == Results["prefix"].AccessGCData( Column )[nGC]
+    
+    #every metallicity needs one remnant calculator shared by all steps
+    assert 3 == Proc.GetRemnantCalculatorCache().GetMisses()
+    assert 3 == Proc.GetRemnantCalculatorCache().GetHits()
+    
+    #no iron spread means that SF ends with the first star
+    assert 1 == Results["prefix"].AccessGCData( "NSN" )[2]
+    assert Results["prefix"].AccessGCData( "IMF" )[2].Getbounds()[-1] == Results["prefix"].AccessGCData( "mlast" )[2]
+    
+    #the SNe can be computed again on their own, also by another processor
+    for Proc in [ Proc, cDataProcessor() ]:
+        Expected = { Column: list( Results["prefix"].AccessGCData( Column ) ) for Column in [ "NSN", "NSNPos", "mlast", "SFD" ] }
+        Proc.ComputeSNe( Results["prefix"] )
+        
+        for Column in Expected:
+            assert Expected[ Column ] == list( Results["prefix"].AccessGCData( Column ) )
+    
+    with pytest.raises( ValueError, match = r"cDataProcessor: Unknown SN solver '.*.'!" ):
+        cDataProcessor( "unknown" )
+
+
+def test_IMFSolvers():
+    """tests that solving for the initial masses of all GCs at once gives the same results as one GC after the other"""
+    
+    Results = {}
+    
+    for IMFSolver in [ "cluster", "catalogue" ]:
+        data = cMockData()
+        
+        RemnantReader = cDataReader( "test/mockdata/RemnantData.dat", ["mass[Msun]"] )
+        data.SetRemnantData( RemnantReader.GetData() )
+        
+        data.AddGCData( "Mass", (2e5, 4e5, 1e6) )
+        data.AddGCData( "Age", (12.0, 11.0, 12.0) )
+        data.AddGCData( "R_a", (8.0, 8.0, 5.0) )
+        data.AddGCData( "R_p", (6.0, 10.0, 2.0) )
+        data.AddGCData( "Fe-H", (-2.0, -0.5, -1.0) )
+        data.AddGCData( "FeSpread", (0.05, 0.1, 0.0) )
+        data.AddGCData( "SFE", (0.3, 0.3, 0.3) )
+        
+        Proc = cDataProcessor( IMFSolver = IMFSolver )
+        Proc.ProcessData( data )
+        
+        Results[IMFSolver] = data
+    
+    assert [True, True, True] == list( Results["catalogue"].AccessGCData( "IMFConverged" ) )
+    
+    for Column in [ "Mini", "mlast", "SFD" ]:
+        assert Results["cluster"].AccessGCData( Column ) == pytest.approx( Results["catalogue"].AccessGCData( Column ), rel = 1e-9, nan_ok = True )
+    
+    for Column in [ "NSN", "NSNPos" ]:
+        assert Results["cluster"].AccessGCData( Column ) == Results["catalogue"].AccessGCData( Column )
+    
+    with pytest.raises( ValueError, match = r"cDataProcessor: Unknown IMF solver '.*.'!" ):
+        cDataProcessor( IMFSolver = "unknown" )
+
+
+def test_ProcessDataParallel():
+    """tests that processing the GCs in several processes gives the same results as in one process"""
+    
+    Serial = cData( "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat" )
+    Parallel = cData( "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat" )
+    
+    cDataProcessor().ProcessData( Serial )
+    cDataProcessor().ProcessData( Parallel, 2 )
+    
+    assert Serial.GetGCColumnNames() == Parallel.GetGCColumnNames()
+    
+    for Column in [ "Mini", "ProducedIron", "NSN", "NSNPos", "mlast", "SFD" ]:
+        assert list( Serial.AccessGCData( Column ) ) == list( Parallel.AccessGCData( Column ) )
+    
+    for nGC in range( 2 ):
+        assert Serial.AccessGCData( "IMF" )[nGC].Getbounds() == Parallel.AccessGCData( "IMF" )[nGC].Getbounds()
+    
+    #a GC that cannot be processed does not affect the others (a GC that does not converge is not an error, see test_NotConverged)
+    Faulty = cData( "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat" )
+    Faulty.AddGCData( "SFE", ( Faulty.AccessGCData( "SFE" )[0], 0.0 ) )
+    
+    with pytest.warns( UserWarning, match = r"cDataProcessor: Processing GC '.*.' failed: .*" ):
+        cDataProcessor().ProcessData( Faulty, 2 )
+    
+    assert Serial.AccessGCData( "Mini" )[0] == Faulty.AccessGCData( "Mini" )[0]
+    assert np.isnan( Faulty.AccessGCData( "Mini" )[1] )
+    assert Faulty.AccessGCData( "IMF" )[1] is None
+    
+    with pytest.raises( ValueError, match = "cDataProcessor: The number of workers needs to be at least 1!" ):
+        cDataProcessor().ProcessData( Serial, 0 )
+
+
+def test_ProcessDataParallelAllFailed( tmp_path ):
+    """tests that all result columns are added in parallel mode if all GCs fail, so that the data can still be written"""
+    
+    Serial = cData( "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat" )
+    cDataProcessor().ProcessData( Serial )
+    
+    Faulty = cData( "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat" )
+    Faulty.AddGCData( "SFE", ( 0.0, 0.0 ) )
+    
+    with pytest.warns( UserWarning, match = r"cDataProcessor: Processing GC '.*.' failed: .*" ):
+        cDataProcessor().ProcessData( Faulty, 2 )
+    
+    assert Serial.GetGCColumnNames() == Faulty.GetGCColumnNames()
+    assert [ None, None ] == list( Faulty.AccessGCData( "IMF" ) )
+    assert [ False, False ] == list( Faulty.AccessGCData( "IMFConverged" ) )
+    
+    for Column in [ "Mini", "MiniIterations", "MFResidual", "ProducedIron", "NSN", "NSNPos", "mlast", "SFD" ]:
+        assert all( np.isnan( Elem ) for Elem in Faulty.AccessGCData( Column ) )
+    
+    cDataWriter( str( tmp_path / "Output" ) ).WriteAllData( Faulty )
+
+
+def test_NotConverged():
+    """tests that GCs for which the solvers do not converge get rows of NaN and the diagnostics of the solvers"""
+    
+    Files = [ "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat" ]
+    
+    Expected = cData( *Files )
+    cDataProcessor().ProcessData( Expected )
+    
+    for Column in [ "MiniIterations", "MFIterations" ]:
+        assert all( Elem > 0 for Elem in Expected.AccessGCData( Column ) )
+    
+    for Column in [ "MiniResidual", "MFResidual" ]:
+        assert all( abs( Elem ) < 1e-6 for Elem in Expected.AccessGCData( Column ) )
+    
+    assert [ True, True ] == list( Expected.AccessGCData( "IMFConverged" ) )
+    
+    for IMFSolver, Workers in [ ( "cluster", 1 ), ( "catalogue", 1 ), ( "cluster", 2 ) ]:
+        data = cData( *Files )
+        data.AddGCData( "Mass", ( data.AccessGCData( "Mass" )[0], -5.0 ) )
+        
+        with warnings.catch_warnings():
+            warnings.simplefilter( "ignore" )
+            cDataProcessor( IMFSolver = IMFSolver ).ProcessData( data, Workers )
+        
+        assert data.AccessGCData( "Mini" )[0] == pytest.approx( Expected.AccessGCData( "Mini" )[0], rel = 1e-8 )
+        assert Expected.AccessGCData( "NSN" )[0] == data.AccessGCData( "NSN" )[0]
+        assert [ True, False ] == list( data.AccessGCData( "IMFConverged" ) )
+        
+        #the failing GC has no results, a negative mass is not solved for at all
+        assert data.AccessGCData( "IMF" )[1] is None
+        assert 0 == data.AccessGCData( "MiniIterations" )[1] == data.AccessGCData( "MFIterations" )[1]
+        assert np.isnan( data.AccessGCData( "MiniResidual" )[1] )
+        
+        for Column in [ "Mini", "ProducedIron", "NSN", "NSNPos", "mlast", "SFD" ]:
+            assert np.isnan( data.AccessGCData( Column )[1] )
+
+
+def test_Instrumentation():
+    """tests that instrumented processing gives the same results and records all stages, counters and GCs"""
+    
+    Files = [ "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat" ]
+    
+    Expected = cData( *Files )
+    cDataProcessor().ProcessData( Expected )
+    
+    assert cDataProcessor().GetInstrumentation() is None
+    
+    Reports = []
+    
+    for Workers in [ 1, 2 ]:
+        data = cData( *Files )
+        Proc = cDataProcessor( Instrument = True )
+        Proc.ProcessData( data, Workers )
+        
+        for Column in [ "Mini", "NSN", "NSNPos", "mlast", "SFD" ]:
+            assert list( Expected.AccessGCData( Column ) ) == list( data.AccessGCData( Column ) )
+        
+        Instr = Proc.GetInstrumentation()
+        
+        assert { "ProcessData", "IMF", "Iron", "SNe" } == set( Instr.GetStageTimes() )
+        assert list( data.AccessGCData( "Name" ) ) == Instr.GetClusterNames()
+        assert all( Time > 0.0 for Time in Instr.GetClusterTimes( "IMF" ) + Instr.GetClusterTimes( "SNe" ) )
+        
+        Reports.append( Instr.GetCounters() )
+    
+    #the counters do not depend on the number of processes
+    assert Reports[0] == Reports[1]
+    assert 2 == Reports[0]["SNExplodes"] == Reports[0]["Ejecta"]
+    assert Reports[0]["ComputeMF"] >= Reports[0]["MassFunctions"] > 0
+    assert sum( len( IMF.GetStarMasses( 8.0 ) ) for IMF in Expected.AccessGCData( "IMF" ) ) == Reports[0]["StarsWalked"]
+    
+    #the recordings add up over several calls, the catalogue solver does not time single GCs
+    Proc = cDataProcessor( IMFSolver = "catalogue", Instrument = True )
+    Proc.ProcessData( cData( *Files ) )
+    Proc.ProcessData( cData( *Files ) )
+    
+    Instr = Proc.GetInstrumentation()
+    
+    assert 4 == len( Instr.GetClusterNames() ) == len( Instr.GetClusterTimes( "SNe" ) )
+    assert all( np.isnan( Instr.GetClusterTimes( "IMF" ) ) )
+    assert 4 == Instr.GetCounters()["MassFunctions"]
@@ -1,3 +1,5 @@
+import os
+import shutil
 import pytest
 import pandas as pd
 
@@ -24,6 +26,59 @@ def test_data():
     CompareData( data.GetData() )
 
 
+def test_ReadChunks():
+    """tests that reading a file chunk by chunk gives the same data as reading it at once"""
+    
+    Chunks = list( cDataReader.ReadChunks( "test/mockdata/GCData.dat", ["Name","Mass"], 1 ) )
+    data = cDataReader( "test/mockdata/GCData.dat", ["Name","Mass"] ).GetData()
+    
+    assert 2 == len( Chunks )
+    
+    for Name in data:
+        assert data[Name] == Chunks[0][Name] + Chunks[1][Name]
+    
+    with pytest.raises(NameError, match=r"cDataReader: Error importing data. Column 'Column4' missing!"):
+        list( cDataReader.ReadChunks( "test/mockdata/TestData.dat", ["Column1","Column4"], 1 ) )
+
+
+def test_Cache( tmp_path ):
+    """tests that tables are cached under the hash of their content and give the same data as the parsed file"""
+    
+    CacheFolder = str( tmp_path / "Cache" )
+    
+    for File in [ "test/mockdata/TestData.dat", "test/mockdata/GCData.dat", "test/mockdata/RemnantData.dat" ]:
+        Parsed = cDataReader( File, [] ).GetData()
+        
+        First = cDataReader( File, [], CacheFolder )
+        Cached = cDataReader( File, [], CacheFolder )
+        
+        for data in [ First.GetData(), Cached.GetData() ]:
+            assert list( Parsed ) == list( data )
+            
+            for header in Parsed:
+                assert Parsed[header] == data[header]
+                assert [ type( Elem ) for Elem in Parsed[header] ] == [ type( Elem ) for Elem in data[header] ]
+        
+        assert cDataReader( File, [] ).GetPandasSheet().equals( Cached.GetPandasSheet() )
+    
+    assert 3 == len( os.listdir( CacheFolder ) )
+    
+    CompareData( cDataReader( "test/mockdata/TestData.dat", [], CacheFolder ).GetPandasSheet() )
+    
+    #a changed file is parsed again
+    shutil.copy( "test/mockdata/TestData.dat", tmp_path / "TestData.dat" )
+    
+    with open( tmp_path / "TestData.dat", "a" ) as File:
+        File.write( "5.0 6.0 neu\n" )
+    
+    assert "neu" == cDataReader( str( tmp_path / "TestData.dat" ), [], CacheFolder ).GetData()["Column3"][-1]
+    assert 4 == len( os.listdir( CacheFolder ) )
+    
+    #the columns of cached tables are checked as well
+    with pytest.raises(NameError, match=r"cDataReader: Error importing data. Column 'Column4' missing!"):
+        cDataReader( "test/mockdata/TestData.dat", ["Column1","Column4"], CacheFolder )
+
+
 def test_Exceptions():
     """tests if the exceptions in this class are raised appropriately"""
     
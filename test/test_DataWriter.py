@@ -0,0 +1,244 @@
+# general modules
+import os
+import pytest
+import warnings
+import numpy as np
+import pandas as pd
+
+#own modules
+from src.Data import cData
+from src.DataProcessor import cDataProcessor
+from src.DataWriter import cDataWriter
+
+
+def test_PlotBarcodes( tmp_path ):
+    """tests that drawing the barcodes in several processes gives the same files as in one process"""
+    
+    data = cData( "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat" )
+    cDataProcessor().ProcessData( data )
+    
+    cDataWriter( str( tmp_path / "Serial" ) ).PlotBarcodes( data )
+    cDataWriter( str( tmp_path / "Parallel" ) ).PlotBarcodes( data, 2 )
+    
+    Files = sorted( os.listdir( tmp_path / "Serial" / "Barcodes" ) )
+    
+    assert [ Name + ".png" for Name in sorted( data.AccessGCData( "Name" ) ) ] == Files
+    assert Files == sorted( os.listdir( tmp_path / "Parallel" / "Barcodes" ) )
+    
+    for File in Files:
+        with open( tmp_path / "Serial" / "Barcodes" / File, "rb" ) as Serial, open( tmp_path / "Parallel" / "Barcodes" / File, "rb" ) as Parallel:
+            assert Serial.read() == Parallel.read()
+    
+    with pytest.raises( ValueError, match = "cDataWriter: The number of workers needs to be at least 1!" ):
+        cDataWriter( str( tmp_path / "Faulty" ) ).PlotBarcodes( data, 0 )
+
+
+def test_WriteBarcodeIntervals( tmp_path ):
+    """tests that the barcode intervals written to files agree with the SN intervals and mlast"""
+    
+    data = cData( "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat" )
+    cDataProcessor().ProcessData( data )
+    
+    cDataWriter( str( tmp_path / "Npz" ) ).WriteAllData( data, Barcodes = "npz" )
+    cDataWriter( str( tmp_path / "Csv" ) ).WriteAllData( data, Barcodes = "csv" )
+    cDataWriter( str( tmp_path / "None" ) ).WriteAllData( data, Barcodes = "none" )
+    
+    assert not os.path.exists( tmp_path / "Npz" / "Barcodes" )
+    assert [ "GCData.dat" ] == os.listdir( tmp_path / "None" )
+    
+    Intervals = np.load( tmp_path / "Npz" / "Barcodes.npz" )
+    
+    with open( tmp_path / "Csv" / "Barcodes.csv" ) as File:
+        Rows = [ Line.strip().split( "," ) for Line in File if not Line.startswith( "#" ) ]
+    
+    assert [ "Name", "mlow[Msun]", "mhigh[Msun]", "Kind" ] == Rows[0]
+    assert Intervals["Name"].tolist() == [ Row[0] for Row in Rows[1:] ]
+    assert Intervals["mlow"].tolist() == [ float( Row[1] ) for Row in Rows[1:] ]
+    assert Intervals["mhigh"].tolist() == [ float( Row[2] ) for Row in Rows[1:] ]
+    assert Intervals["Kind"].tolist() == [ int( Row[3] ) for Row in Rows[1:] ]
+    
+    Names = data.AccessGCData( "Name" )
+    IMFs = data.AccessGCData( "IMF" )
+    mlasts = data.AccessGCData( "mlast" )
+    
+    for nSC in range( len( Names ) ):
+        Rows = Intervals["Name"] == Names[nSC]
+        
+        if np.isnan( mlasts[nSC] ):
+            assert not np.any( Rows )
+            continue
+        
+        mlows = Intervals["mlow"][ Rows ]
+        mhighs = Intervals["mhigh"][ Rows ]
+        Kinds = Intervals["Kind"][ Rows ]
+        
+        #the segments cover 8 Msun to mmax without gaps
+        assert 8.0 == mlows[0]
+        assert IMFs[nSC].Getbounds()[-1] == mhighs[-1]
+        assert mlows[1:].tolist() == mhighs[:-1].tolist()
+        
+        Centres = 0.5 * ( mlows + mhighs )
+        
+        assert ( 0 == Kinds ).tolist() == ( ~np.asarray( data.SNExplodes( Centres ), dtype = bool ) ).tolist()
+        assert np.all( ( 1 != Kinds ) | ( mhighs <= mlasts[nSC] ) )
+        assert np.all( ( 2 != Kinds ) | ( mlows >= mlasts[nSC] ) )
+        
+        #the walk starts at mmax, so an exploding star above mlast explodes before SF ends (2) and one below mlast after it (1)
+        Stars = IMFs[nSC].GetStarMasses( 8.0 )
+        Exploding = Stars[ np.asarray( data.SNExplodes( Stars ), dtype = bool ) ]
+        
+        Above = Exploding[ Exploding > mlasts[nSC] ][-1]
+        Below = Exploding[ Exploding < mlasts[nSC] ][0]
+        
+        assert 2 == Kinds[ ( mlows <= Above ) & ( Above < mhighs ) ][0]
+        assert 1 == Kinds[ ( mlows <= Below ) & ( Below < mhighs ) ][0]
+    
+    with open( tmp_path / "Csv" / "Barcodes.csv" ) as File:
+        assert "#Kind: 0 no SN, 1 SN after the end of SF (below mlast), 2 SN before the end of SF (above mlast)\n" == File.readline()
+    
+    with pytest.raises( ValueError, match = "cDataWriter: Unknown barcode format 'svg'!" ):
+        cDataWriter( str( tmp_path / "Faulty" ) ).WriteAllData( data, Barcodes = "svg" )
+
+
+def test_WriteChunk( tmp_path ):
+    """tests that writing the GCs chunk by chunk gives the same data as writing them at once"""
+    
+    Files = [ "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat" ]
+    
+    data = cData( *Files )
+    cDataProcessor().ProcessData( data )
+    cDataWriter( str( tmp_path / "All" ) ).WriteAllData( data, Barcodes = "csv" )
+    
+    Writer = cDataWriter( str( tmp_path / "Chunks" ) )
+    
+    CsvWriter = cDataWriter( str( tmp_path / "Csv" ) )
+    
+    for Chunk in cData( *Files, ChunkSize = 1 ).IterGCChunks():
+        cDataProcessor().ProcessData( Chunk )
+        Writer.WriteChunk( Chunk, Barcodes = "csv" )
+        CsvWriter.WriteChunk( Chunk, Barcodes = "none", Format = "csv" )
+    
+    with open( tmp_path / "All" / "Barcodes.csv" ) as All, open( tmp_path / "Chunks" / "Barcodes.csv" ) as Chunks:
+        assert All.read() == Chunks.read()
+    
+    cDataWriter( str( tmp_path / "AllCsv" ) ).WriteGCData( data, "csv" )
+    
+    with open( tmp_path / "AllCsv" / "GCData.csv" ) as All, open( tmp_path / "Csv" / "GCData.csv" ) as Chunks:
+        assert All.read() == Chunks.read()
+    
+    #the columns of the chunks are padded to their own widths
+    with open( tmp_path / "All" / "GCData.dat" ) as All, open( tmp_path / "Chunks" / "GCData.dat" ) as Chunks:
+        assert [ Line.split() for Line in All ] == [ Line.split() for Line in Chunks ]
+    
+    with pytest.raises( ValueError, match = "cDataWriter: Barcode format 'npz' cannot be written chunk by chunk!" ):
+        Writer.WriteChunk( Chunk, Barcodes = "npz" )
+    
+    #a chunk without mass functions has the same columns, columns added by later chunks are not written
+    Chunks = list( cData( *Files, ChunkSize = 1 ).IterGCChunks() )
+    
+    Chunks[0].AddGCData( "Mass", ( -5.0, ) )
+    Chunks[1].AddGCData( "Extra", ( 1.0, ) )
+    
+    CsvWriter = cDataWriter( str( tmp_path / "Failed" ) )
+    
+    with warnings.catch_warnings():
+        warnings.simplefilter( "ignore" )
+        cDataProcessor().ProcessData( Chunks[0] )
+    
+    CsvWriter.WriteChunk( Chunks[0], Barcodes = "none", Format = "csv" )
+    
+    cDataProcessor().ProcessData( Chunks[1] )
+    
+    with pytest.warns( UserWarning, match = "cDataWriter: The columns Extra of chunk 1 are not in GCData.csv and are not written!" ):
+        CsvWriter.WriteChunk( Chunks[1], Barcodes = "none", Format = "csv" )
+    
+    Sheet = pd.read_csv( tmp_path / "Failed" / "GCData.csv", float_precision = "round_trip" )
+    
+    assert list( pd.read_csv( tmp_path / "AllCsv" / "GCData.csv" ).columns ) == list( Sheet.columns )
+    assert np.isnan( Sheet["IMF_bounds_3"][0] )
+    assert data.AccessGCData( "IMF" )[1].Getbounds()[-1] == Sheet["IMF_bounds_3"][1]
+    
+    #mass functions with more boundaries than fixed for the chunks cannot be written
+    with pytest.raises( ValueError, match = "cData: A mass function of column 'IMF' has more than 3 boundaries!" ):
+        data.GetGCArrays( { "IMF": 3 } )
+
+
+def CheckGCColumns( data, Columns ):
+    """compares the columns written in a binary or csv format to the GC data
+    Columns: a lib of the written arrays, columns of mass functions as written by WriteGCData"""
+    
+    for Name in [ "Name", "Mass", "Fe-H", "Mini", "ProducedIron", "NSN", "NSNPos", "mlast", "SFD" ]:
+        assert list( data.AccessGCData( Name ) ) == list( Columns[ Name ] )
+    
+    #the mass functions are written as their parameters, a missing mass function gives NaN
+    for nGC, IMF in enumerate( data.AccessGCData( "IMF" ) ):
+        if IMF is None:
+            assert np.isnan( Columns["IMF_Mtot"][nGC] )
+            assert np.all( np.isnan( Columns["IMF_bounds"][nGC] ) )
+            continue
+        
+        assert IMF.GetMtot() == Columns["IMF_Mtot"][nGC]
+        assert list( IMF.Getbounds() ) == list( Columns["IMF_bounds"][nGC] )
+        assert list( IMF.Getalphas() ) == list( Columns["IMF_alphas"][nGC] )
+
+
+def test_WriteGCData( tmp_path ):
+    """tests that the GC data is written in the binary and csv formats at full precision"""
+    
+    data = cData( "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat" )
+    cDataProcessor().ProcessData( data )
+    
+    #a GC whose mass function failed and a column without array form
+    data.AddGCData( "IMF", [ data.AccessGCData( "IMF" )[0], None ] )
+    data.AddGCData( "Objects", [ {}, {} ] )
+    
+    Writer = cDataWriter( str( tmp_path / "Out" ) )
+    
+    with pytest.warns( UserWarning, match = "cData: Column 'Objects' cannot be converted into an array and is skipped!" ):
+        Writer.WriteGCData( data, "npz" )
+    
+    with pytest.warns( UserWarning ):
+        Writer.WriteGCData( data, "csv" )
+    
+    CheckGCColumns( data, np.load( tmp_path / "Out" / "GCData.npz" ) )
+    
+    #the default float parser of pandas is not exact
+    Sheet = pd.read_csv( tmp_path / "Out" / "GCData.csv", float_precision = "round_trip" )
+    
+    Columns = { Name: Sheet[ Name ].values for Name in Sheet.columns }
+    Columns["IMF_bounds"] = Sheet[ [ "IMF_bounds_" + str( nBound ) for nBound in range( 4 ) ] ].values
+    Columns["IMF_alphas"] = Sheet[ [ "IMF_alphas_" + str( nAlpha ) for nAlpha in range( 3 ) ] ].values
+    
+    CheckGCColumns( data, Columns )
+    
+    with pytest.raises( ValueError, match = "cDataWriter: Unknown format 'xls'!" ):
+        Writer.WriteGCData( data, "xls" )
+    
+    with pytest.raises( ValueError, match = "cDataWriter: Format 'npz' cannot be written chunk by chunk!" ):
+        Writer.WriteChunk( data, Barcodes = "none", Format = "npz" )
+
+
+def test_WriteGCDataOptionalFormats( tmp_path ):
+    """tests the formats needing optional packages"""
+    
+    data = cData( "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat" )
+    cDataProcessor().ProcessData( data )
+    
+    Writer = cDataWriter( str( tmp_path / "Out" ) )
+    
+    h5py = pytest.importorskip( "h5py" )
+    
+    Writer.WriteGCData( data, "hdf5" )
+    
+    with h5py.File( tmp_path / "Out" / "GCData.h5", "r" ) as File:
+        Columns = { Name: File[ Name ][()] for Name in File }
+    
+    Columns["Name"] = np.char.decode( Columns["Name"], "utf-8" )
+    
+    CheckGCColumns( data, Columns )
+    
+    pytest.importorskip( "pyarrow" )
+    
+    Writer.WriteGCData( data, "parquet" )
+    
+    assert list( data.AccessGCData( "Mini" ) ) == list( pd.read_parquet( tmp_path / "Out" / "GCData.parquet" )["Mini"] )
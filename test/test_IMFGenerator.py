@@ -7,6 +7,8 @@ from src.IMFGenerator import cIMFGenerator
 from src.massfunction import cMassFunction
 from src.BaseSCCalc import ComputeDens
 from src.RemnantCalculator import cRemnantCalculator
+from src.RemnantCalculatorBatch import cRemnantCalculatorBatch
+from src.DataReader import cDataReader
 
 
 def SetupRemCalc( ZH ):
@@ -203,3 +205,117 @@ def test_ComputeIMFFromToday():
     IMF4 = IMFGen4.ComputeIMFFromToday( M4, t, Rapo4, Rperi4, SFE )
     
     assert Mini4 == pytest.approx( IMF4.GetMtot(), 2e-6 )
+
+
+def test_SolverDiagnostics():
+    """checks the diagnostics of the solvers for Mini and that GCs that do not converge give no mass function"""
+    
+    data = cDataReader( "test/mockdata/RemnantData.dat", ["mass[Msun]"] ).GetData()
+    
+    IMFGen = cIMFGenerator( cRemnantCalculator( data, -1.5 ) )
+    
+    assert IMFGen.GetSolverDiagnostics() is None
+    
+    M = cIMFGenerator( cRemnantCalculator( data, -1.5 ) ).ComputeCurrentMass( 1e6, 8.0, 4.0, 0.3, 12.0 )
+    IMF = IMFGen.ComputeIMFFromToday( M, 12.0, 8.0, 4.0, 0.3 )
+    
+    Diagnostics = IMFGen.GetSolverDiagnostics()
+    
+    assert Diagnostics["IMFConverged"]
+    assert 1 < Diagnostics["MiniIterations"] < 100
+    assert IMFGen.GetMFIterations() == Diagnostics["MFIterations"]
+    assert abs( Diagnostics["MiniResidual"] ) < 1e-6
+    assert IMFGen.CheckUpperEnd( IMF ) == Diagnostics["MFResidual"]
+    
+    #a negative mass cannot be solved for, only the warning of the solver for Mini is issued
+    with pytest.warns( UserWarning, match = "Mini did not converge" ) as Record:
+        assert IMFGen.ComputeIMFFromToday( -5.0, 12.0, 8.0, 4.0, 0.3 ) is None
+    
+    assert 1 == len( Record )
+    
+    Diagnostics = IMFGen.GetSolverDiagnostics()
+    
+    assert not Diagnostics["IMFConverged"]
+    assert 0 == Diagnostics["MiniIterations"] == Diagnostics["MFIterations"]
+    assert np.isnan( Diagnostics["MiniResidual"] ) and np.isnan( Diagnostics["MFResidual"] )
+    
+    #a mass too small to be solved for is given up without complex errors
+    with pytest.warns( UserWarning, match = "Mini did not converge" ) as Record:
+        assert IMFGen.ComputeIMFFromToday( 500.0, 12.0, 8.0, 4.0, 0.3 ) is None
+    
+    assert 1 == len( Record )
+    assert isinstance( IMFGen.GetSolverDiagnostics()["MiniResidual"], float )
+    
+    #the generator only handles a single metallicity
+    with pytest.raises( ValueError, match = "cIMFGenerator: The remnant calculator needs to hold a single metallicity, use cIMFGeneratorBatch for many clusters!" ):
+        cIMFGenerator( cRemnantCalculatorBatch( data, [-1.5,-1.0] ) )
+
+
+def test_SolveUpperEnd():
+    """checks the solver for m_max"""
+    
+    #without the cache of mass functions every call solves for m_max
+    IMFGen = cIMFGenerator( SetupRemCalc( -2.0 ), 0 )
+    
+    MF = IMFGen.ComputeMF( 1e5 )
+    
+    assert abs( IMFGen.CheckUpperEnd( MF ) ) < 1e-6
+    assert 1 == IMFGen.GetMFSolves()
+    
+    Iterations = IMFGen.GetMFIterations()
+    
+    assert Iterations < 10
+    
+    #a close first guess needs fewer iterations, a guess outside of the bracket still converges
+    MF2 = IMFGen.ComputeMF( 1.01e5, MF.Getbounds()[-1] )
+    
+    assert IMFGen.GetMFIterations() - Iterations < Iterations
+    assert abs( IMFGen.CheckUpperEnd( MF2 ) ) < 1e-6
+    
+    MF3 = IMFGen.ComputeMF( 1e5, 1000.0 )
+    
+    assert MF.Getbounds()[-1] == pytest.approx( MF3.Getbounds()[-1], rel = 1e-6 )
+    
+    assert 3 == IMFGen.GetMFSolves()
+    assert 3 == IMFGen.GetMFCalls()
+
+
+def test_MFCache():
+    """checks that mass functions are only computed once for the same Mini"""
+    
+    IMFGen = cIMFGenerator( SetupRemCalc( -2.0 ), 2 )
+    
+    MF = IMFGen.ComputeMF( 1e5 )
+    
+    assert MF is IMFGen.ComputeMF( 1e5 )
+    assert 1 == IMFGen.GetMFCacheHits()
+    assert 1 == IMFGen.GetMFCacheMisses()
+    assert 1 == IMFGen.GetMFSolves()
+    
+    #the least recently used mass function is removed
+    IMFGen.ComputeMF( 2e5 )
+    IMFGen.ComputeMF( 3e5 )
+    
+    assert MF is not IMFGen.ComputeMF( 1e5 )
+    assert 4 == IMFGen.GetMFCacheMisses()
+    
+    #the final mass function of the Mini solver has been computed during the iteration already
+    IMFGen = cIMFGenerator( SetupRemCalc( -2.0 ) )
+    
+    M = IMFGen.ComputeCurrentMass( 1e6, 8.0, 4.0, 0.3, 12.0 )
+    IMFGen.ComputeIMFFromToday( M, 12.0, 8.0, 4.0, 0.3 )
+    
+    assert IMFGen.GetMFCacheHits() >= 1
+    assert IMFGen.GetMFSolves() == IMFGen.GetMFCacheMisses()
+    assert IMFGen.GetMFCalls() == IMFGen.GetMFCacheHits() + IMFGen.GetMFCacheMisses()
+    
+    #without a cache every mass function is solved for
+    IMFGen = cIMFGenerator( SetupRemCalc( -2.0 ), 0 )
+    
+    IMFGen.ComputeMF( 1e5 )
+    IMFGen.ComputeMF( 1e5 )
+    
+    assert 2 == IMFGen.GetMFSolves()
+    
+    with pytest.raises( ValueError, match = "cIMFGenerator: The size of the mass function cache must not be negative!" ):
+        cIMFGenerator( SetupRemCalc( -2.0 ), -1 )
@@ -0,0 +1,134 @@
+# general libraries
+import pytest
+import numpy as np
+
+# own libraries
+from src.IMFGenerator import cIMFGenerator
+from src.IMFGeneratorBatch import cIMFGeneratorBatch
+from src.RemnantCalculator import cRemnantCalculator
+from src.RemnantCalculatorBatch import cRemnantCalculatorBatch
+from src.DataReader import cDataReader
+
+
+def SetupRemCalcs( ZHs ):
+    """sets up a remnant calculator with the desired metallicities
+    ZHs: the metallicities to use"""
+    
+    data = { "mass[Msun]": [0.0,1.0,2.0], "t_-1.0": [9.0,6.0,3.0], "t_0.0": [9.0,6.5,3.2], "Mfin_-1.0": [0.5,0.8,1.2], "Mfin_0.0":[0.4,0.9,1.5] }
+    
+    return cRemnantCalculatorBatch( data, ZHs ), data
+
+
+def test_ComputeMFs():
+    """checks that the mass functions of many clusters computed at once agree with the single ones"""
+    
+    RemCalcs, data = SetupRemCalcs( [-2.0,-2.0,-2.0] )
+    
+    IMFGen = cIMFGeneratorBatch( RemCalcs )
+    IMFGenSingle = cIMFGenerator( cRemnantCalculator( data, -2.0 ) )
+    
+    Minis = [1e4,1e5,1e6]
+    
+    MFs = IMFGen.ComputeMFs( Minis )
+    
+    assert 3 == MFs.GetSize()
+    
+    for nMini in range( len( Minis ) ):
+        MF = IMFGenSingle.ComputeMF( Minis[nMini] )
+        
+        assert MF.Getbounds() == pytest.approx( MFs.Getbounds()[nMini], rel = 1e-9 )
+        assert MF.Getalphas() == pytest.approx( MFs.Getalphas()[nMini], rel = 1e-12 )
+        assert MF.Getks() == pytest.approx( MFs.Getks()[nMini], rel = 1e-9 )
+    
+    assert 147.6862129 == pytest.approx( MFs.Getbounds()[1,3] )
+    assert np.abs( IMFGen.CheckUpperEnds( MFs ) ).max() < 1e-6
+    
+    #the metallicity can be given per cluster
+    Alphas = IMFGen.ComputeAlphas( [1e5,1e5], [0.0,-2.0] )
+    
+    assert IMFGenSingle.ComputeAlpha( 1e5 ) == pytest.approx( Alphas[1], rel = 1e-12 )
+    assert cIMFGenerator( cRemnantCalculator( data, 0.0 ) ).ComputeAlpha( 1e5 ) == pytest.approx( Alphas[0], rel = 1e-12 )
+    
+    #the same betas and xs as for the single clusters
+    Betas, Xs = IMFGen.ComputeBetasAndXs( np.array( [1e5,1e6] ), np.array( [2.0,4.0] ), np.array( [0.3,0.2] ) )
+    
+    assert IMFGenSingle.ComputeBetaAndX( 1e6, 4.0, 0.2 ) == pytest.approx( ( Betas[1], Xs[1] ), rel = 1e-12 )
+
+
+def test_SolveUpperEnds():
+    """checks the solver for m_max of many clusters at once"""
+    
+    RemCalcs, data = SetupRemCalcs( [-2.0,-2.0,-2.0] )
+    
+    IMFGen = cIMFGeneratorBatch( RemCalcs )
+    
+    MF = cIMFGenerator( cRemnantCalculator( data, -2.0 ) ).ComputeMF( 1e5 )
+    
+    #a close first guess and a guess outside of the bracket converge as well
+    MFs = IMFGen.ComputeMFs( [1e5,1.01e5,1e5], None, [float( "NaN" ),MF.Getbounds()[-1],1000.0] )
+    
+    assert np.abs( IMFGen.CheckUpperEnds( MFs ) ).max() < 1e-6
+    assert MF.Getbounds()[-1] == pytest.approx( MFs.Getbounds()[0,-1], rel = 1e-6 )
+    assert MF.Getbounds()[-1] == pytest.approx( MFs.Getbounds()[2,-1], rel = 1e-6 )
+    assert 3 == IMFGen.GetMFSolves()
+    assert 3 == IMFGen.GetMFCalls()
+    assert 0 < IMFGen.GetMFIterations()
+
+
+def test_ComputeIMFsFromToday():
+    """checks that the initial mass functions of many GCs computed at once agree with the single ones"""
+    
+    dataReader = cDataReader( "test/mockdata/RemnantData.dat", ["mass[Msun]"] )
+    data = dataReader.GetData()
+    
+    Minis = [1e6,1e7,3e5]
+    ZHs = [-2.0,-1.5,-0.5]
+    Rapos = [8.0,8.0,20.0]
+    Rperis = [8.0 / 3.0,8.0 / 3.0,2.0]
+    SFE = 0.3
+    t = 12.0
+    
+    Ms = [ cIMFGenerator( cRemnantCalculator( data, ZHs[nGC] ) ).ComputeCurrentMass( Minis[nGC], Rapos[nGC], Rperis[nGC], SFE, t ) for nGC in range( 3 ) ]
+    
+    IMFGen = cIMFGeneratorBatch( cRemnantCalculatorBatch( data, ZHs ) )
+    
+    MFs, Converged = IMFGen.ComputeIMFsFromToday( Ms, [t,t,t], Rapos, Rperis, [SFE,SFE,SFE] )
+    
+    assert [True,True,True] == Converged.tolist()
+    assert Minis == pytest.approx( MFs.GetMtot() )
+    
+    for nGC in range( 3 ):
+        IMF = cIMFGenerator( cRemnantCalculator( data, ZHs[nGC] ) ).ComputeIMFFromToday( Ms[nGC], t, Rapos[nGC], Rperis[nGC], SFE )
+        
+        assert IMF.GetMtot() == pytest.approx( MFs.GetMtot()[nGC], rel = 1e-9 )
+        assert IMF.Getbounds() == pytest.approx( MFs.Getbounds()[nGC], rel = 1e-9 )
+
+
+def test_SolverDiagnostics():
+    """checks the diagnostics of the solvers with one value per GC and that GCs that do not converge are marked"""
+    
+    data = cDataReader( "test/mockdata/RemnantData.dat", ["mass[Msun]"] ).GetData()
+    
+    IMFGen = cIMFGeneratorBatch( cRemnantCalculatorBatch( data, [-1.5,-1.5] ) )
+    
+    assert IMFGen.GetSolverDiagnostics() is None
+    
+    M = cIMFGenerator( cRemnantCalculator( data, -1.5 ) ).ComputeCurrentMass( 1e6, 8.0, 4.0, 0.3, 12.0 )
+    IMF = cIMFGenerator( cRemnantCalculator( data, -1.5 ) ).ComputeIMFFromToday( M, 12.0, 8.0, 4.0, 0.3 )
+    
+    #the negative mass is not solved for, only the warning of the solver for Mini is issued
+    with pytest.warns( UserWarning, match = "Mini did not converge for 1 GCs" ) as Record:
+        MFs, Converged = IMFGen.ComputeIMFsFromToday( [M,-5.0], [12.0,12.0], [8.0,8.0], [4.0,4.0], [0.3,0.3] )
+    
+    assert 1 == len( Record )
+    
+    Diagnostics = IMFGen.GetSolverDiagnostics()
+    
+    assert 0 == Diagnostics["MiniIterations"][1] == Diagnostics["MFIterations"][1]
+    assert np.isnan( Diagnostics["MiniResidual"][1] ) and np.isnan( Diagnostics["MFResidual"][1] )
+    
+    assert [True,False] == Converged.tolist() == Diagnostics["IMFConverged"].tolist()
+    assert IMF.GetMtot() == pytest.approx( MFs.GetMtot()[0], rel = 1e-9 )
+    assert IMFGen.GetMFIterations() == Diagnostics["MFIterations"].sum()
+    assert abs( Diagnostics["MiniResidual"][0] ) < 1e-6
+    assert np.array_equal( IMFGen.CheckUpperEnds( MFs ), Diagnostics["MFResidual"], equal_nan = True )
@@ -0,0 +1,67 @@
+#general libs
+import json
+import time
+import math
+import pytest
+
+#own libs
+from src.Instrumentation import cInstrumentation
+
+
+def test_Instrumentation( tmp_path ):
+    """tests recording stages, counters and cluster times"""
+    
+    Instr = cInstrumentation()
+    
+    with Instr.Time( "Stage" ):
+        time.sleep( 0.01 )
+    
+    #stages that fail are timed as well
+    with pytest.raises( ValueError ):
+        with Instr.Time( "Stage" ):
+            raise ValueError()
+    
+    assert Instr.GetStageTimes()["Stage"] >= 0.01
+    
+    Instr.Count( "Calls" )
+    Instr.Count( "Calls", 4 )
+    
+    assert { "Calls": 5 } == Instr.GetCounters()
+    
+    assert [ 0, 2, 4 ] == Instr.MapClusters( "A", lambda nCluster: 2 * nCluster, 3 )
+    Instr.AddClusters( [ "GC1", "GC2", "GC3" ] )
+    
+    #stages that did not time clusters get NaN
+    Instr.MapClusters( "B", lambda nCluster: None, 1 )
+    Instr.AddClusters( [ "GC4" ] )
+    Instr.AddClusters( [ "GC5" ] )
+    
+    assert [ "GC1", "GC2", "GC3", "GC4", "GC5" ] == Instr.GetClusterNames()
+    
+    A = Instr.GetClusterTimes( "A" )
+    B = Instr.GetClusterTimes( "B" )
+    
+    assert all( Time >= 0.0 for Time in A[:3] ) and all( math.isnan( Time ) for Time in A[3:] )
+    assert all( math.isnan( Time ) for Time in B[:3] + B[4:] ) and B[3] >= 0.0
+    assert all( math.isnan( Time ) for Time in Instr.GetClusterTimes( "C" ) )
+    
+    #the report can be merged into another instrumentation
+    Report = Instr.GetReport()
+    
+    assert [ None, None ] == Report["clusters"]["A"][3:]
+    
+    Other = cInstrumentation()
+    Other.MapClusters( "C", lambda nCluster: None, 1 )
+    Other.AddClusters( [ "GC0" ] )
+    Other.Merge( Report )
+    
+    assert [ "GC0" ] + Instr.GetClusterNames() == Other.GetClusterNames()
+    assert { "Calls": 5 } == Other.GetCounters()
+    assert Instr.GetStageTimes() == Other.GetStageTimes()
+    assert A[:3] == Other.GetClusterTimes( "A" )[1:4]
+    assert 6 == len( Other.GetClusterTimes( "C" ) )
+    
+    Instr.WriteReport( str( tmp_path / "Report.json" ) )
+    
+    with open( tmp_path / "Report.json" ) as File:
+        assert Report == json.load( File )
@@ -0,0 +1,38 @@
+#general libs
+import numpy as np
+
+#own libs
+from src.Data import cData
+from src.DataProcessor import cDataProcessor
+from src.DataReader import cDataReader
+from src.Pipeline import Run
+
+
+def test_Run():
+    """tests that processing tables in memory gives the same results as processing the files"""
+    
+    Files = [ "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat" ]
+    
+    data = cData( *Files )
+    cDataProcessor().ProcessData( data )
+    
+    Expected = data.GetGCArrays()
+    
+    Tables = [ cDataReader( File, [] ).GetPandasSheet() for File in Files ]
+    
+    #the star tables are given as tables or taken from a cData
+    for Results in [ Run( *Tables ), Run( Tables[0], cData( *Files ) ) ]:
+        assert list( Expected ) == list( Results )
+        
+        for Name in Expected:
+            assert Expected[ Name ].tolist() == Results[ Name ].tolist()
+    
+    #a lib of arrays with other GCs
+    GCData = { Name: np.asarray( Column )[::-1] for Name, Column in Tables[0].items() }
+    
+    Results = Run( GCData, *Tables[1:], IMFSolver = "catalogue" )
+    
+    assert Expected["Name"][::-1].tolist() == Results["Name"].tolist()
+    assert np.allclose( Expected["Mini"][::-1], Results["Mini"], rtol = 1e-8 )
+    assert Expected["NSN"][::-1].tolist() == Results["NSN"].tolist()
+    assert Results["IMFConverged"].all()
@@ -121,3 +121,23 @@ def test_GetMfinFromMassFunct():
     
     assert IMF2.GetMass( IMF2.Getbounds()[0], RemCalc.GetMassFromTime( 1.0 ) ) + IMF2.GetMass( RemCalc.GetMassFromTime( 1.0 ), 15.0 ) * RemCalc.GetMfinFromMass( 0.5 * ( 15.0 + RemCalc.GetMassFromTime( 1.0 )  )) / IMF2.GetMtot() == pytest.approx( RemCalc.GetMfinFromMassFunct( IMF2, 1.0 ))
     assert IMF2.GetMass( IMF2.Getbounds()[0], RemCalc.GetMassFromTime( 1.1e-3 ) ) + ( IMF2.GetMass( RemCalc.GetMassFromTime( 1.1e-3 ), 15.0 ) * RemCalc.GetMfinFromMass( 0.5 * ( RemCalc.GetMassFromTime( 1.1e-3 ) + 15.0 )) ) / IMF2.GetMtot() == pytest.approx( RemCalc.GetMfinFromMassFunct( IMF2, 1.1e-3 ))
+
+
+def test_GetMfinFromMassFunctBins():
+    """tests that the left-over mass is computed correctly when the mass function covers many stars of the remnant data"""
+    
+    RemCalc = SetupRealData( -1.25 )
+    IMF = cMassFunction( 1e5, [0.08,0.5,1.0,80.0], [1.3,2.3,2.2] )
+    
+    dataReader = cDataReader( "test/mockdata/RemnantDataComplete.dat", ["mass[Msun]"] )
+    Mstar = dataReader.GetData()["mass[Msun]"]
+    
+    for time in [ 0.005, 0.1, 1.0 ]:
+        minMass = RemCalc.GetMassFromTime( time )
+        
+        #sum up the bins around every star of the remnant data one by one
+        Edges = [ minMass ] + [ 0.5 * ( Mstar[ nElem ] + Mstar[ nElem + 1 ] ) for nElem in range( len( Mstar ) - 1 ) if minMass < Mstar[ nElem ] and Mstar[ nElem + 1 ] < 80.0 ] + [ 80.0 ]
+        
+        RemnantMass = sum( [ RemCalc.GetMfinFromMass( 0.5 * ( Edges[ nEdge ] + Edges[ nEdge + 1 ] ) ) * IMF.GetMass( Edges[ nEdge ], Edges[ nEdge + 1 ] ) for nEdge in range( len( Edges ) - 1 ) ] )
+        
+        assert IMF.GetMass( 0.08, minMass ) + RemnantMass / IMF.GetMtot() == pytest.approx( RemCalc.GetMfinFromMassFunct( IMF, time ), 1e-12 )
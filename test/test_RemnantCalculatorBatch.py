@@ -0,0 +1,72 @@
+# general modules
+import pytest
+import numpy as np
+
+#own modules
+from src.RemnantCalculatorBatch import cRemnantCalculatorBatch
+from src.RemnantCalculator import cRemnantCalculator
+from src.massfunction import cMassFunction
+from src.massfunctionbatch import cMassFunctionBatch
+from src.DataReader import cDataReader
+
+
+def SetupRealData( ZHs, ChunkSize = 1024 ):
+    """instantiates a class for testing using actual data from Yan et al."""
+    
+    dataReader = cDataReader( "test/mockdata/RemnantDataComplete.dat", ["mass[Msun]"] )
+    data = dataReader.GetData()
+    
+    return cRemnantCalculatorBatch( data, ZHs, ChunkSize ), data
+
+
+def test_Init():
+    """tests the setup of the class"""
+    
+    RemCalc, data = SetupRealData( [-2.0,-1.25,0.0] )
+    
+    assert 3 == RemCalc.GetSize()
+    assert [-2.0,-1.25,0.0] == RemCalc.GetZH().tolist()
+    
+    with pytest.raises( ValueError, match = "cRemnantCalculatorBatch: The chunk size needs to be at least 1!" ):
+        cRemnantCalculatorBatch( data, [0.0], 0 )
+
+
+def test_Lookups():
+    """tests that times, masses and remnant masses agree with the single remnant calculators"""
+    
+    ZHs = [-2.0,-1.25,-0.3,0.0]
+    RemCalc, data = SetupRealData( ZHs )
+    
+    RemCalcs = [ cRemnantCalculator( data, ZH ) for ZH in ZHs ]
+    
+    for time in [ 0.001, 0.05, 1.0, 30.0 ]:
+        assert [ Single.GetMassFromTime( time ) for Single in RemCalcs ] == RemCalc.GetMassFromTime( time ).tolist()
+    
+    for mass in [ 0.5, 8.0, 100.0 ]:
+        assert [ Single.GetTimeFromMass( mass ) for Single in RemCalcs ] == pytest.approx( RemCalc.GetTimeFromMass( np.full( 4, mass ) ), rel = 1e-12 )
+        assert [ Single.GetMfinFromMass( mass ) for Single in RemCalcs ] == pytest.approx( RemCalc.GetMfinFromMass( np.full( 4, mass ) ), rel = 1e-12 )
+    
+    #a subset of the clusters
+    assert [ RemCalcs[3].GetMassFromTime( 1.0 ), RemCalcs[1].GetMassFromTime( 1.0 ) ] == RemCalc.GetMassFromTime( 1.0, [3,1] ).tolist()
+
+
+def test_GetMfinFromMassFuncts():
+    """tests that the left-over masses agree with the single remnant calculators"""
+    
+    ZHs = [-2.0,-1.25,-0.3,0.0,-1.0]
+    MFs = [ cMassFunction( 1e5, [0.08,0.5,1.0,80.0], [1.3,2.3,2.2] ), cMassFunction( 1e6, [0.08,0.5,1.0,120.0], [1.3,2.3,1.9] ), cMassFunction( 1e4, [0.08,0.5,1.0,40.0], [1.3,2.3,2.0] ), cMassFunction( 3e5, [0.08,0.5,1.0,100.0], [1.3,2.3,2.3] ), cMassFunction( 10.0, [0.08,0.5,1.0,1.5], [1.3,2.3,2.3] ) ]
+    
+    #a small chunk size makes sure that the clusters are processed in several chunks
+    RemCalc, data = SetupRealData( ZHs, 2 )
+    Batch = cMassFunctionBatch.FromMassFunctions( MFs )
+    
+    for time in [ 0.01, 0.1, 1.0, 10.0, 20.0 ]:
+        Mfins = RemCalc.GetMfinFromMassFuncts( Batch, time )
+        
+        for nMF in range( len( MFs ) ):
+            assert cRemnantCalculator( data, ZHs[nMF] ).GetMfinFromMassFunct( MFs[nMF], time ) == pytest.approx( Mfins[nMF], rel = 1e-12 )
+    
+    #a subset of the clusters
+    Mfins = RemCalc.GetMfinFromMassFuncts( Batch.GetSubset( [1,3] ), 1.0, [1,3] )
+    
+    assert cRemnantCalculator( data, ZHs[3] ).GetMfinFromMassFunct( MFs[3], 1.0 ) == pytest.approx( Mfins[1], rel = 1e-12 )
@@ -0,0 +1,66 @@
+# general modules
+import pytest
+
+#own modules
+from src.RemnantCalculatorCache import cRemnantCalculatorCache
+from src.RemnantGrid import cRemnantGrid
+
+
+class cMockData():
+    """a mock class providing the remnant grid"""
+    
+    def __init__( self ):
+        self.__RemnantGrid = cRemnantGrid( { "mass[Msun]": [1.0,2.0], "t_-1.0": [6.0,3.0], "t_0.0": [6.5,3.2], "Mfin_-1.0": [0.8,1.2], "Mfin_0.0":[0.9,1.5] } )
+    
+    
+    def GetRemnantGrid( self ):
+        """returns the remnant grid"""
+        
+        return self.__RemnantGrid
+
+
+def test_GetRemnantCalculator():
+    """tests that the remnant calculators are reused for the same metallicity"""
+    
+    data = cMockData()
+    Cache = cRemnantCalculatorCache( data, 2 )
+    
+    RemCalc1 = Cache.GetRemnantCalculator( -1.0 )
+    
+    assert -1.0 == RemCalc1.GetZH()
+    assert RemCalc1 is Cache.GetRemnantCalculator( -1.0 )
+    assert 1 == Cache.GetHits()
+    assert 1 == Cache.GetMisses()
+    
+    RemCalc2 = Cache.GetRemnantCalculator( -0.5 )
+    
+    assert -0.5 == RemCalc2.GetZH()
+    assert 2 == Cache.GetSize()
+    assert 1 == Cache.GetHits()
+    assert 2 == Cache.GetMisses()
+
+
+def test_Eviction():
+    """tests that the least recently used calculator is removed from a full cache"""
+    
+    Cache = cRemnantCalculatorCache( cMockData(), 2 )
+    
+    RemCalc1 = Cache.GetRemnantCalculator( -1.0 )
+    RemCalc2 = Cache.GetRemnantCalculator( -0.5 )
+    
+    Cache.GetRemnantCalculator( -1.0 )      #-0.5 is now the least recently used one
+    Cache.GetRemnantCalculator( 0.0 )
+    
+    assert 2 == Cache.GetSize()
+    assert 2 == Cache.GetMaxSize()
+    assert RemCalc1 is Cache.GetRemnantCalculator( -1.0 )
+    assert not RemCalc2 is Cache.GetRemnantCalculator( -0.5 )
+    
+    Cache.Clear()
+    
+    assert 0 == Cache.GetSize()
+    assert 0 == Cache.GetHits()
+    assert 0 == Cache.GetMisses()
+    
+    with pytest.raises( ValueError, match = r"cRemnantCalculatorCache: The cache size needs to be at least 1!" ):
+        cRemnantCalculatorCache( cMockData(), 0 )
@@ -0,0 +1,107 @@
+# general modules
+import pytest
+import numpy as np
+
+#own modules
+from src.RemnantGrid import cRemnantGrid
+from src.RemnantCalculator import cRemnantCalculator
+from src.DataReader import cDataReader
+
+
+def Setup():
+    """instantiates a grid with three metallicities"""
+    
+    data = { "mass[Msun]": [1.0,2.0,4.0], "t_0.0": [6.5,3.2,2.0], "t_-1.0": [6.0,3.0,1.0], "t_-0.5": [6.2,3.1,1.5], "Mfin_-1.0": [0.8,1.2,1.6], "Mfin_0.0":[0.9,1.5,2.0], "Mfin_-0.5": [0.85,1.3,1.7] }
+    
+    return cRemnantGrid( data )
+
+
+def test_Axes():
+    """tests that the axes of the grid are sorted"""
+    
+    Grid = Setup()
+    
+    assert [1.0, 2.0, 4.0] == Grid.GetMasses().tolist()
+    assert [-1.0, -0.5, 0.0] == Grid.GetMetallicities( "t_" ).tolist()
+    assert [-1.0, -0.5, 0.0] == Grid.GetMetallicities( "Mfin_" ).tolist()
+
+
+def test_GetColumn():
+    """tests the inter- and extrapolation of the metallicities"""
+    
+    Grid = Setup()
+    
+    #metallicities in the grid
+    assert [6.2, 3.1, 1.5] == Grid.GetColumn( -0.5, "t_" ).tolist()
+    assert [0.9, 1.5, 2.0] == Grid.GetColumn( 0.0, "Mfin_" ).tolist()
+    
+    #interpolation in 10^[Z/H]
+    Factor = ( pow( 10.0, -0.25 ) - pow( 10.0, -0.5 ) ) / ( 1.0 - pow( 10.0, -0.5 ) )
+    assert np.allclose( [ 6.2 + 0.3 * Factor, 3.1 + 0.1 * Factor, 1.5 + 0.5 * Factor ], Grid.GetColumn( -0.25, "t_" ) )
+    
+    #extrapolation above the grid uses the two highest metallicities
+    Factor = ( pow( 10.0, 0.5 ) - 1.0 ) / ( pow( 10.0, -0.5 ) - 1.0 )
+    assert np.allclose( [ 0.9 - 0.05 * Factor, 1.5 - 0.2 * Factor, 2.0 - 0.3 * Factor ], Grid.GetColumn( 0.5, "Mfin_" ) )
+    
+    #below the grid the lowest metallicity is used
+    assert [0.8, 1.2, 1.6] == Grid.GetColumn( -2.0, "Mfin_" ).tolist()
+    
+    #arrays of metallicities give one row per metallicity
+    Columns = Grid.GetColumn( [-2.0, -0.25, 0.5], "t_" )
+    
+    assert ( 3, 3 ) == Columns.shape
+    
+    for nZH, ZH in enumerate( [-2.0, -0.25, 0.5] ):
+        assert Grid.GetColumn( ZH, "t_" ).tolist() == Columns[nZH].tolist()
+
+
+def test_GetValues():
+    """tests that the grid gives the same values as the remnant calculator"""
+    
+    dataReader = cDataReader( "test/mockdata/RemnantDataComplete.dat", ["mass[Msun]"] )
+    Grid = cRemnantGrid( dataReader.GetData() )
+    
+    masses = np.array( [ 0.05, 0.08, 0.1567, 0.5, 1.0, 8.5, 20.0, 79.8, 149.99, 150.0, 160.0 ] )
+    
+    for ZH in [ -2.5, -1.67, -1.25, -0.2, 0.3 ]:
+        RemCalc = cRemnantCalculator( Grid, ZH )
+        
+        Mfins = Grid.GetMfins( masses, ZH )
+        Lifetimes = Grid.GetLifetimes( masses, ZH )
+        
+        for nMass in range( len( masses ) ):
+            assert RemCalc.GetMfinFromMass( masses[nMass] ) == Mfins[nMass]
+            assert RemCalc.GetTimeFromMass( masses[nMass] ) == pytest.approx( Lifetimes[nMass] )
+    
+    #pairs of masses and metallicities
+    ZHs = np.array( [ -2.5, -1.67, -1.25, -0.2, 0.3 ] )
+    Mfins = Grid.GetMfins( masses[:5], ZHs )
+    
+    for nPair in range( len( ZHs ) ):
+        assert Grid.GetMfins( masses[nPair], ZHs[nPair] ) == Mfins[nPair]
+
+
+def test_GetWeights():
+    """tests that the weights of the columns and the column accessor agree with the interpolated columns"""
+    
+    Grid = Setup()
+    
+    ZHs = np.array( [ -2.0, -1.0, -0.25, 0.0, 0.5 ] )
+    
+    Weights = Grid.GetWeights( ZHs, "t_" )
+    Columns = Grid.GetColumn( ZHs, "t_" )
+    
+    assert ( 5, 3 ) == Weights.shape
+    assert [ 1.0, 0.0, 0.0 ] == Weights[0].tolist()
+    assert [ 0.0, 0.0, 1.0 ] == Weights[3].tolist()
+    assert np.allclose( 1.0, Weights.sum( axis = 1 ) )
+    
+    Values = np.array( [ Grid.GetColumn( Metal, "t_" ) for Metal in Grid.GetMetallicities( "t_" ) ] )
+    
+    assert np.allclose( Columns, Weights @ Values )
+    
+    #the accessor gives the values of the columns at single mass indices
+    Accessor = Grid.GetColumnAccessor( ZHs, "t_" )
+    
+    assert Columns[:, 1].tolist() == Accessor( 1 ).tolist()
+    assert Columns[ np.arange( 5 ), [0,2,1,0,2] ].tolist() == Accessor( np.array( [0,2,1,0,2] ) ).tolist()
@@ -0,0 +1,151 @@
+#general libs
+import json
+import socket
+import pytest
+import threading
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+
+#own libs
+from src.Data import cData
+from src.DataProcessor import cDataProcessor
+from src.Server import cQueryServer
+
+
+def SetupTables():
+    """loads the star tables of the mock data as two table sets"""
+    
+    return { "mock": cData( None, "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat" ), "combined": cData( None, "test/mockdata/CombinedData.dat", "test/mockdata/CombinedData.dat", "test/mockdata/CombinedData.dat" ) }
+
+
+def GetGCs():
+    """returns the GCs of the mock data as a list of libs and their results computed from the files"""
+    
+    data = cData( "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat" )
+    
+    GCs = [ { Name: data.AccessGCData( Name )[ nGC ] for Name in data.GetGCColumnNames() } for nGC in range( len( data.AccessGCData( "Name" ) ) ) ]
+    
+    cDataProcessor().ProcessData( data )
+    
+    Results = [ { Name: data.AccessGCData( Name )[ nGC ] for Name in [ "Name", "Mini", "ProducedIron", "NSN", "NSNPos", "mlast", "SFD", "IMFConverged" ] } for nGC in range( len( GCs ) ) ]
+    
+    return GCs, Results
+
+
+class cUnixConnection( http.client.HTTPConnection ):
+    """a HTTP connection over a Unix socket"""
+    
+    def __init__( self, Path ):
+        super().__init__( "localhost" )
+        self.__Path = Path
+    
+    def connect( self ):
+        self.sock = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+        self.sock.connect( self.__Path )
+
+
+def Post( Connection, Request ):
+    """posts a request to a server and returns the status, the answer and the Server-Timing header"""
+    
+    Connection.request( "POST", "/run", json.dumps( Request ), { "Content-Type": "application/json" } )
+    Response = Connection.getresponse()
+    
+    return Response.status, json.loads( Response.read() ), Response.getheader( "Server-Timing" )
+
+
+def test_Query():
+    """tests that the queries give the same results as processing the files"""
+    
+    GCs, Expected = GetGCs()
+    
+    Server = cQueryServer( SetupTables(), Port = 0 )
+    
+    try:
+        assert [ "mock", "combined" ] == Server.GetTableSets()
+        
+        assert { "tables": "mock", "results": Expected } == Server.Query( { "gcs": GCs } )
+        assert { "tables": "mock", "results": Expected[1:] } == Server.Query( { "gc": GCs[1], "tables": "mock" } )
+        
+        #the GCs can be given as columns
+        Columns = { Name: [ GC[ Name ] for GC in GCs ] for Name in GCs[0] }
+        
+        assert Expected == Server.Query( { "gcs": Columns } )["results"]
+        assert "combined" == Server.Query( { "gcs": Columns, "tables": "combined" } )["tables"]
+        assert [] == Server.Query( { "gcs": [] } )["results"]
+        
+        with pytest.raises( ValueError, match = "cQueryServer: Unknown table set 'other'!" ):
+            Server.Query( { "gcs": GCs, "tables": "other" } )
+        
+        with pytest.raises( ValueError, match = "cQueryServer: The request contains no GCs!" ):
+            Server.Query( {} )
+    
+    finally:
+        Server.Shutdown()
+    
+    with pytest.raises( ValueError, match = "cQueryServer: At least one table set is needed!" ):
+        cQueryServer( {}, Port = 0 )
+
+
+def test_HTTP():
+    """tests concurrent requests over HTTP"""
+    
+    GCs, Expected = GetGCs()
+    
+    Server = cQueryServer( SetupTables(), Port = 0 )
+    Thread = threading.Thread( target = Server.Serve )
+    Thread.start()
+    
+    Host, Port = Server.GetAddress()
+    
+    def Query( nRequest ):
+        return Post( http.client.HTTPConnection( Host, Port ), { "gc": GCs[ nRequest % 2 ] } )
+    
+    try:
+        with ThreadPoolExecutor( max_workers = 4 ) as Pool:
+            Answers = list( Pool.map( Query, range( 8 ) ) )
+        
+        for nRequest, ( Status, Answer, Timing ) in enumerate( Answers ):
+            assert 200 == Status
+            assert [ Expected[ nRequest % 2 ] ] == Answer["results"]
+            assert Answer["latency_ms"] > 0.0
+            assert "run;dur=" + "{:.3f}".format( Answer["latency_ms"] ) == Timing
+        
+        Status, Answer, Timing = Post( http.client.HTTPConnection( Host, Port ), { "gc": { "Name": "x" } } )
+        
+        assert 400 == Status
+        assert "NameError: cData: Error importing data. Column 'Mass' missing!" == Answer["error"]
+        
+        Connection = http.client.HTTPConnection( Host, Port )
+        Connection.request( "GET", "/tables" )
+        
+        assert { "tables": [ "mock", "combined" ] } == json.loads( Connection.getresponse().read() )
+    
+    finally:
+        Server.Shutdown()
+        Thread.join()
+
+
+def test_UnixSocket( tmp_path ):
+    """tests requests over a Unix socket"""
+    
+    GCs, Expected = GetGCs()
+    
+    Path = str( tmp_path / "SFDE.sock" )
+    
+    Server = cQueryServer( SetupTables(), Socket = Path )
+    Thread = threading.Thread( target = Server.Serve )
+    Thread.start()
+    
+    try:
+        assert Path == Server.GetAddress()
+        
+        Status, Answer, Timing = Post( cUnixConnection( Path ), { "gcs": GCs } )
+        
+        assert 200 == Status
+        assert Expected == Answer["results"]
+    
+    finally:
+        Server.Shutdown()
+        Thread.join()
+    
+    assert not ( tmp_path / "SFDE.sock" ).exists()
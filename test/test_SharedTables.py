@@ -0,0 +1,67 @@
+# general modules
+import os
+import sys
+import pickle
+import subprocess
+import pytest
+import numpy as np
+
+#own modules
+from src.SharedTables import cSharedTables
+
+
+def test_SharedTables():
+    """tests that the tables are stored, shared by pickling and removed again"""
+    
+    Tables = { "Masses": np.array( [0.1,0.5,1.0] ), "Flags": np.array( [True,False,True] ), "Grid": np.arange( 12.0 ).reshape( 3, 4 ), "Empty": np.empty( 0 ) }
+    
+    Shared = cSharedTables( Tables )
+    
+    assert list( Tables ) == Shared.GetNames()
+    assert os.path.exists( Shared.GetPath() )
+    
+    for Name, Table in Tables.items():
+        assert Table.dtype == Shared.GetTable( Name ).dtype
+        assert Table.tolist() == Shared.GetTable( Name ).tolist()
+    
+    #the tables are read-only
+    with pytest.raises( ValueError ):
+        Shared.GetTable( "Masses" )[0] = 2.0
+    
+    #a pickled copy maps the same file, only the owner removes it
+    Copy = pickle.loads( pickle.dumps( Shared ) )
+    
+    assert len( pickle.dumps( Shared ) ) < Tables["Grid"].nbytes + 1000
+    assert Tables["Grid"].tolist() == Copy.GetTable( "Grid" ).tolist()
+    
+    Copy.Close()
+    
+    assert os.path.exists( Shared.GetPath() )
+    
+    Shared.Close()
+    
+    assert not os.path.exists( Shared.GetPath() )
+    assert Tables["Grid"].tolist() == Shared.GetTable( "Grid" ).tolist()
+
+
+def test_SharedTablesNotClosed( tmp_path ):
+    """tests that the file is removed also if Close is never called"""
+    
+    Shared = cSharedTables( { "Masses": np.array( [0.1,0.5,1.0] ) }, str( tmp_path ) )
+    Path = Shared.GetPath()
+    
+    #a pickled copy does not remove the file when it is deleted
+    Copy = pickle.loads( pickle.dumps( Shared ) )
+    del Copy
+    
+    assert os.path.exists( Path )
+    
+    del Shared
+    
+    assert not os.path.exists( Path )
+    
+    #a process that stops with an exception before closing the tables removes the file when it exits
+    Script = "import numpy as np\nfrom src.SharedTables import cSharedTables\nShared = cSharedTables( { 'Masses': np.ones( 3 ) }, " + repr( str( tmp_path ) ) + " )\nraise RuntimeError()\n"
+    
+    assert 0 != subprocess.run( [ sys.executable, "-c", Script ], capture_output = True ).returncode
+    assert [] == os.listdir( tmp_path )
@@ -1,5 +1,6 @@
 #general modules
 import pytest
+import numpy as np
 
 #own modules
 from src.common import *
@@ -25,3 +26,35 @@ def test_LinInterExtrapolate():
     assert 2.0 == pytest.approx( LinInterExtrapolate( [0.5,1.0], [0.8,1.6], 1.0 ))
     assert -0.2 == pytest.approx( LinInterExtrapolate( [0.5,-1.0], [0.8,1.4], 0.6 ))
     assert 3.0 == pytest.approx( LinInterExtrapolate( [0.5,-1.0], [0.8,1.4], 1.0 ))
+
+
+def test_LinInterExtrapolateSortedList():
+    """tests that values in a sorted list are found and inter- and extrapolated correctly"""
+    
+    valList = [0.1, 0.4, 0.5, 0.8, 1.0, 2.0]
+    dataList = [ 2.0 * val + 1.0 for val in valList ]
+    
+    vals = [ -1.0, 0.1, 0.25, 0.4, 0.45, 0.7, 0.8, 1.5, 2.0, 3.0 ]
+    
+    assert [ 2.0 * val + 1.0 for val in vals ] == pytest.approx( LinInterExtrapolateSortedList( vals, valList, dataList ).tolist() )
+    
+    #values in the list are found exactly
+    pos, Exact = BisectSortedList( [0.5, 0.8], valList )
+    
+    assert [2, 3] == pos.tolist()
+    assert [True, True] == Exact.tolist()
+    
+    #values below the second and above the second largest element use the ends of the list
+    pos, Exact = BisectSortedList( [0.05, 0.2, 1.5, 2.5], valList )
+    
+    assert [0, 0, 4, 4] == pos.tolist()
+    
+    #descending lists and one list per value
+    assert [ 2.0 * val + 1.0 for val in vals ] == pytest.approx( LinInterExtrapolateSortedList( vals, valList[::-1], dataList[::-1], Descending = True ).tolist() )
+    
+    valLists = np.array( [ valList, [ 2.0 * val for val in valList ] ] )
+    
+    assert [ 2.0, 1.6 ] == pytest.approx( LinInterExtrapolateSortedList( [ 0.5, 0.6 ], valLists, dataList ).tolist() )
+    
+    #the lists can be given as a function returning their elements
+    assert [ 2.0, 1.6 ] == pytest.approx( LinInterExtrapolateSortedList( [ 0.5, 0.6 ], lambda Index: TakeFromSortedList( valLists, Index ), dataList ).tolist() )
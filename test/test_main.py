@@ -0,0 +1,58 @@
+#general libs
+import os
+import json
+import sys
+import subprocess
+
+
+def RunPython( Arguments ):
+    """runs a new python process in the folder of the package and returns its output"""
+    
+    return subprocess.run( [ sys.executable ] + Arguments, cwd = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ), capture_output = True, text = True, check = True ).stdout
+
+
+def test_ImportTime():
+    """tests that importing the modules main.py needs does not import pandas or matplotlib and stays fast compared to numpy"""
+    
+    #the import of numpy, which every run needs anyway, is timed in the same process as reference, so that the ratio does not depend on the speed of the machine, the best of several cold starts is used
+    Script = "import sys, time\nStart = time.perf_counter()\nimport numpy\nNumpy = time.perf_counter() - Start\nStart = time.perf_counter()\nimport src.Data, src.DataProcessor, src.DataWriter\nprint( ( time.perf_counter() - Start ) / Numpy, 'pandas' in sys.modules, 'matplotlib' in sys.modules )"
+    
+    Ratios = []
+    
+    for nRun in range( 3 ):
+        Ratio, Pandas, Matplotlib = RunPython( [ "-c", Script ] ).split()
+        
+        assert "False" == Pandas
+        assert "False" == Matplotlib
+        
+        Ratios.append( float( Ratio ) )
+    
+    #importing pandas alone takes more than twice as long as numpy
+    assert min( Ratios ) < 1.0
+
+
+def test_NoPlots( tmp_path ):
+    """tests that no barcodes are drawn with --no-plots, while barcodes written into a file are kept"""
+    
+    Inputs = [ "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat" ]
+    
+    RunPython( [ "main.py", "--no-plots" ] + Inputs + [ str( tmp_path / "NoPlots" ) ] )
+    RunPython( [ "main.py", "--no-plots", "--barcodes", "npz" ] + Inputs + [ str( tmp_path / "Npz" ) ] )
+    
+    assert [ "GCData.dat" ] == os.listdir( tmp_path / "NoPlots" )
+    assert [ "Barcodes.npz", "GCData.dat" ] == sorted( os.listdir( tmp_path / "Npz" ) )
+
+
+def test_Profile( tmp_path ):
+    """tests that --profile writes the stages, counters and GC times into the output folder"""
+    
+    Inputs = [ "test/mockdata/GCData.dat", "test/mockdata/SNe.dat", "test/mockdata/Ejecta.dat", "test/mockdata/RemnantData.dat" ]
+    
+    RunPython( [ "main.py", "--profile", "--barcodes", "none" ] + Inputs + [ str( tmp_path / "Profile" ) ] )
+    
+    with open( tmp_path / "Profile" / "Profile.json" ) as File:
+        Report = json.load( File )
+    
+    assert { "ProcessData", "IMF", "Iron", "SNe", "Write" } == set( Report["stages"] )
+    assert { "ComputeMF", "MassFunctions", "SNExplodes", "Ejecta", "StarsWalked" } == set( Report["counters"] )
+    assert 2 == len( Report["clusters"]["Name"] ) == len( Report["clusters"]["SNe"] )
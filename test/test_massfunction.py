@@ -237,3 +237,47 @@ def test_GetMassStarMinX():
     MF4 = cMassFunction( Mini4, bounds4, alphas4 )
     
     assert 0.301058871413287 == pytest.approx( MF4.GetMassStarMinX( 0.7, 2188.800573307484 ))
+
+
+def test_GetStarMasses():
+    """checks that the optimally sampled stars above a given mass are returned correctly"""
+    
+    Mini = 10000.0
+    bounds = [0.08, 0.5, 1.0, 140.0]
+    alphas = [1.3, 2.3, 1.8]
+    
+    MF = cMassFunction( Mini, bounds, alphas )
+    
+    Masses = MF.GetStarMasses( 8.0 )
+    
+    assert bounds[-1] == pytest.approx( Masses[0] )
+    assert 8.0 < Masses[-1]
+    assert int( MF.GetNumbers( 8.0, bounds[-1] ) ) == len( Masses )
+    
+    for nStar in range( len( Masses ) ):
+        assert nStar + 1 == pytest.approx( MF.GetNumbers( Masses[nStar], bounds[-1] ) )
+        
+    #the stars need to reach across segment boundaries
+    Masses = MF.GetStarMasses( 0.3 )
+    
+    for nStar in range( 1, len( Masses ) ):
+        assert Masses[nStar] == pytest.approx( MF.GetMassStarMinX( Masses[nStar - 1], 1.0 ) )
+    
+    #no stars above m_max
+    assert 0 == len( MF.GetStarMasses( 150.0 ) )
+
+
+def test_ComputeIntegrals():
+    """checks that the integrals of many intervals are the same as the ones of the single intervals"""
+    
+    MF = cMassFunction( 1000.0, [0.08, 0.5, 1.0, 100.0], [1.3, 2.3, 2.0] )
+    
+    masses1 = [ 0.01, 0.08, 0.3, 0.5, 0.7, 2.0, 50.0, 99.0 ]
+    masses2 = [ 0.2, 0.5, 0.9, 3.0, 100.0, 150.0, 60.0, 100.0 ]
+    
+    Numbers = MF.ComputeIntegrals( masses1, masses2 )
+    Masses = MF.GetMasses( masses1, masses2 )
+    
+    for nInterval in range( len( masses1 ) ):
+        assert MF.ComputeIntegral( masses1[nInterval], masses2[nInterval] ) == pytest.approx( Numbers[nInterval] )
+        assert MF.GetMass( masses1[nInterval], masses2[nInterval] ) == pytest.approx( Masses[nInterval] )
@@ -0,0 +1,92 @@
+import pytest
+import numpy as np
+
+from src.massfunction import cMassFunction
+from src.massfunctionbatch import cMassFunctionBatch
+
+
+def SetupMFs():
+    """sets up a list of mass functions with the same number of segments"""
+
+    return [ cMassFunction( 1e5, [0.08,0.5,1.0,100.0], [1.3,2.3,2.3] ), cMassFunction( 5e4, [0.08,0.5,1.0,60.0], [0.4,1.4,2.1] ), cMassFunction( 10.0, [0.08,0.5,1.0,2.0], [1.0,2.0,1.0] ) ]
+
+
+def test_Init():
+    """checks that the batch holds the same parameters as the single mass functions"""
+
+    MFs = SetupMFs()
+    Batch = cMassFunctionBatch.FromMassFunctions( MFs )
+
+    assert 3 == Batch.GetSize()
+
+    for nMF in range( len( MFs ) ):
+        assert MFs[nMF].GetMtot() == Batch.GetMtot()[nMF]
+        assert MFs[nMF].Getbounds() == pytest.approx( Batch.Getbounds()[nMF] )
+        assert MFs[nMF].Getalphas() == pytest.approx( Batch.Getalphas()[nMF] )
+        assert MFs[nMF].Getks() == pytest.approx( Batch.Getks()[nMF], rel = 1e-12 )
+        assert MFs[nMF].Getks() == pytest.approx( Batch.GetMassFunction( nMF ).Getks(), rel = 1e-12 )
+
+    #a single row of boundaries and alphas is used for all clusters
+    Batch = cMassFunctionBatch( [1e4,1e5], [0.08,0.5,150.0], [1.3,2.3] )
+
+    assert ( 2, 3 ) == Batch.Getbounds().shape
+    assert cMassFunction( 1e5, [0.08,0.5,150.0], [1.3,2.3] ).Getks() == pytest.approx( Batch.Getks()[1], rel = 1e-12 )
+
+    with pytest.raises( ValueError, match = "cMassFunctionBatch: Invalid number of alphas, must be one less then boundaries!" ):
+        cMassFunctionBatch( [1e4], [0.08,0.5,150.0], [1.3] )
+
+
+def test_Integrals():
+    """checks that integrals, numbers and masses agree with the single mass functions"""
+
+    MFs = SetupMFs()
+    Batch = cMassFunctionBatch.FromMassFunctions( MFs )
+
+    masses1 = np.array( [ [0.01,0.3,0.7,5.0], [0.2,1.0,8.0,70.0], [0.08,0.6,1.5,2.0] ] )
+    masses2 = np.array( [ [0.4,0.9,100.0,200.0], [0.5,30.0,60.0,80.0], [0.1,1.5,1.9,2.0] ] )
+
+    Numbers = Batch.GetNumbers( masses1, masses2 )
+    Masses = Batch.GetMass( masses1, masses2 )
+
+    for nMF in range( len( MFs ) ):
+        for nInt in range( masses1.shape[1] ):
+            assert MFs[nMF].GetNumbers( masses1[nMF,nInt], masses2[nMF,nInt] ) == pytest.approx( Numbers[nMF,nInt], rel = 1e-12, abs = 1e-12 )
+            assert MFs[nMF].GetMass( masses1[nMF,nInt], masses2[nMF,nInt] ) == pytest.approx( Masses[nMF,nInt], rel = 1e-12, abs = 1e-12 )
+
+    TotNumbers = Batch.GetTotNumbers()
+
+    for nMF in range( len( MFs ) ):
+        assert MFs[nMF].GetTotNumbers() == pytest.approx( TotNumbers[nMF], rel = 1e-12 )
+        assert MFs[nMF].GetMtot() == pytest.approx( Batch.GetMass( MFs[nMF].Getbounds()[0], MFs[nMF].Getbounds()[-1] )[nMF], rel = 1e-12 )
+
+
+def test_StarLadder():
+    """checks that the star masses agree with the single mass functions"""
+
+    MFs = SetupMFs()
+    Batch = cMassFunctionBatch.FromMassFunctions( MFs )
+
+    Ladders = Batch.GetStarMasses( 8.0 )
+
+    assert 3 == len( Ladders )
+
+    for nMF in range( len( MFs ) ):
+        assert len( MFs[nMF].GetStarMasses( 8.0 ) ) == len( Ladders[nMF] )
+        assert MFs[nMF].GetStarMasses( 8.0 ) == pytest.approx( Ladders[nMF], rel = 1e-12 )
+
+    #the last cluster has no stars above 8 Msun
+    assert 0 == len( Ladders[2] )
+
+    Ladders = Batch.GetStarMasses( 0.3 )
+
+    for nMF in range( len( MFs ) ):
+        assert MFs[nMF].GetStarMasses( 0.3 ) == pytest.approx( Ladders[nMF], rel = 1e-10 )
+
+    Masses = Batch.GetMassStarMinX( [50.0,20.0,1.5], [3.5,1.0,0.2] )
+
+    assert MFs[0].GetMassStarMinX( 50.0, 3.5 ) == pytest.approx( Masses[0], rel = 1e-12 )
+    assert MFs[1].GetMassStarMinX( 20.0, 1.0 ) == pytest.approx( Masses[1], rel = 1e-12 )
+    assert MFs[2].GetMassStarMinX( 1.5, 0.2 ) == pytest.approx( Masses[2], rel = 1e-12 )
+
+    with pytest.raises( ValueError, match = "cMassFunctionBatch: GetMassStarMinX: mass out of bounds!" ):
+        Batch.GetMassStarMinX( [50.0,70.0,1.5], 1.0 )